@@ -1,5 +1,12 @@
-from gravrag_api import router as gravrag_router
-
 __all__ = [
     'gravrag_router',
 ]
+
+
+def __getattr__(name):
+    # Imported lazily so CLI and admin scripts can use the package without the API
+    # module connecting its MemoryManager to Qdrant at import time.
+    if name == 'gravrag_router':
+        from gravrag.gravrag_api import router
+        return router
+    raise AttributeError(f"module 'gravrag' has no attribute '{name}'")
@@ -0,0 +1,164 @@
+import argparse
+import contextlib
+import json
+import logging
+
+from qdrant_client import QdrantClient
+
+from gravrag import (
+    gravrag_io, gravrag_consolidate, gravrag_graph, gravrag_projection, gravrag_tiers, gravrag_aliases, gravrag_load
+)
+from gravrag.gravrag_projection import Projection, VectorLayout
+
+logging.basicConfig(level=logging.INFO)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="gravrag", description="GravRAG memory store administration")
+    parser.add_argument("--host", default="localhost", help="Qdrant host")
+    parser.add_argument("--port", type=int, default=6333, help="Qdrant port")
+    parser.add_argument("--collection", default="Mind", help="Collection name")
+    parser.add_argument("--projection", help="Projection file (.npz) of a projected collection; new collections use it")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subcommands.add_parser("export", help="Stream the collection into a Parquet file")
+    export_parser.add_argument("path")
+    export_parser.add_argument("--batch-size", type=int, default=gravrag_io.DEFAULT_BATCH_SIZE)
+
+    import_parser = subcommands.add_parser("import", help="Restore a Parquet export into the collection")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--batch-size", type=int, default=gravrag_io.DEFAULT_BATCH_SIZE)
+    import_parser.add_argument("--parallel", type=int, default=gravrag_io.DEFAULT_PARALLEL)
+    import_parser.add_argument("--bulk", action="store_true", help="Suspend HNSW indexing until the import is done")
+
+    consolidate_parser = subcommands.add_parser("consolidate", help="Compact cold memories into cluster summaries")
+    consolidate_parser.add_argument("--objective-id", help="Only this objective (default: all)")
+    consolidate_parser.add_argument("--spacetime-threshold", type=float,
+                                    default=gravrag_consolidate.DEFAULT_SPACETIME_THRESHOLD)
+    consolidate_parser.add_argument("--min-age-seconds", type=float, default=gravrag_consolidate.DEFAULT_MIN_AGE_SECONDS)
+    consolidate_parser.add_argument("--target-ratio", type=float, default=gravrag_consolidate.DEFAULT_TARGET_RATIO)
+    consolidate_parser.add_argument("--min-cluster-size", type=int, default=2)
+    consolidate_parser.add_argument("--eval-queries", type=int, default=50)
+    consolidate_parser.add_argument("-k", type=int, default=10)
+    consolidate_parser.add_argument("--dry-run", action="store_true")
+
+    graph_parser = subcommands.add_parser("graph-repair", help="Rebuild missing or stale memory graph neighbour lists")
+    graph_parser.add_argument("-k", type=int, default=gravrag_graph.DEFAULT_K, help="Neighbours per memory")
+    graph_parser.add_argument("--batch-size", type=int, default=gravrag_graph.DEFAULT_BATCH_SIZE)
+    graph_parser.add_argument("--full", action="store_true", help="Recompute every neighbour list")
+
+    tier_parser = subcommands.add_parser("tier-move", help="Demote decayed memories to the cold tier collection")
+    tier_parser.add_argument("--spacetime-threshold", type=float, default=gravrag_tiers.DEFAULT_SPACETIME_THRESHOLD)
+    tier_parser.add_argument("--min-age-seconds", type=float, default=gravrag_tiers.DEFAULT_MIN_AGE_SECONDS)
+    tier_parser.add_argument("--batch-size", type=int, default=gravrag_tiers.DEFAULT_BATCH_SIZE)
+
+    rebuild_parser = subcommands.add_parser("rebuild", help="Rebuild the collection behind its alias, optionally re-embedding")
+    rebuild_parser.add_argument("--model", help="SentenceTransformer model to re-embed content with")
+    rebuild_parser.add_argument("--batch-size", type=int, default=gravrag_aliases.DEFAULT_BATCH_SIZE)
+    rebuild_parser.add_argument("--keep-previous", action="store_true", help="Keep the old generation for rollback")
+
+    load_parser = subcommands.add_parser("load", help="Bulk-load a JSONL, CSV or Parquet file of memories, resumably")
+    load_parser.add_argument("path")
+    load_parser.add_argument("--format", choices=gravrag_load.SOURCE_FORMATS, help="Default: from the file extension")
+    load_parser.add_argument("--model", default="all-MiniLM-L6-v2", help="SentenceTransformer model to encode with")
+    load_parser.add_argument("--batch-size", type=int, default=gravrag_load.DEFAULT_BATCH_SIZE)
+    load_parser.add_argument("--workers", type=int, default=gravrag_load.DEFAULT_WORKERS,
+                             help="Encoder processes (0 encodes in this process)")
+    load_parser.add_argument("--parallel", type=int, default=gravrag_load.DEFAULT_PARALLEL, help="Concurrent upserts")
+    load_parser.add_argument("--checkpoint", help=f"Checkpoint file (default: <path>{gravrag_load.CHECKPOINT_SUFFIX})")
+    load_parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    load_parser.add_argument("--bulk", action="store_true", help="Suspend HNSW indexing until the load is done")
+    load_parser.add_argument("--content-field", default="content")
+    load_parser.add_argument("--metadata-field", default="metadata")
+
+    fit_parser = subcommands.add_parser("fit-projection", help="Fit a reduced-dimension projection on a sample")
+    fit_parser.add_argument("path", help="Output .npz file")
+    fit_parser.add_argument("--kind", choices=gravrag_projection.PROJECTION_KINDS, default="pca")
+    fit_parser.add_argument("--dim", type=int, default=64)
+    fit_parser.add_argument("--version", type=int, default=1)
+    fit_parser.add_argument("--sample-size", type=int, default=gravrag_projection.DEFAULT_SAMPLE_SIZE)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    client = QdrantClient(host=args.host, port=args.port)
+    projection = Projection.load(args.projection) if args.projection else None
+    layout = VectorLayout(projection)
+    if args.command != "import" and client.collection_exists(args.collection):
+        layout = VectorLayout.from_collection(client, args.collection, projection)
+
+    # Commands covering every memory include the cold tier when it exists
+    collections = [args.collection]
+    cold_collection = gravrag_tiers.cold_collection_name(args.collection)
+    if client.collection_exists(cold_collection):
+        collections.append(cold_collection)
+
+    if args.command == "export":
+        result = gravrag_io.export_memories(client, collections, args.path, args.batch_size)
+    elif args.command == "import":
+        result = gravrag_io.import_memories(
+            client, args.collection, args.path, args.batch_size, args.parallel, layout, args.bulk
+        )
+    elif args.command == "consolidate":
+        result = gravrag_consolidate.consolidate_memories(
+            client, collections, args.objective_id,
+            spacetime_threshold=args.spacetime_threshold,
+            min_age_seconds=args.min_age_seconds,
+            target_ratio=args.target_ratio,
+            min_cluster_size=args.min_cluster_size,
+            eval_queries=args.eval_queries,
+            k=args.k,
+            dry_run=args.dry_run,
+            layout=layout
+        )
+    elif args.command == "graph-repair":
+        result = gravrag_graph.repair_graph(client, args.collection, args.k, args.batch_size, args.full, layout)
+    elif args.command == "tier-move":
+        gravrag_tiers.ensure_cold_collection(
+            client, cold_collection, layout, gravrag_projection.collection_dim(client, args.collection)
+        )
+        result = gravrag_tiers.demote_memories(
+            client, args.collection, cold_collection, layout,
+            args.spacetime_threshold, args.min_age_seconds, args.batch_size
+        )
+    elif args.command == "rebuild":
+        encode, dim = None, None
+        if args.model:
+            from sentence_transformers import SentenceTransformer
+            model = SentenceTransformer(args.model)
+            encode = lambda texts: model.encode(texts, batch_size=args.batch_size)
+            dim = model.get_sentence_embedding_dimension()
+        job = gravrag_aliases.RebuildJob(collections, args.model)
+        result = gravrag_aliases.rebuild_collections(
+            client, collections, layout, job, encode, dim, args.batch_size, args.keep_previous
+        )
+    elif args.command == "load":
+        from sentence_transformers import SentenceTransformer
+        from gravrag.gravrag import MemoryManager
+        memory_manager = MemoryManager(
+            qdrant_host=args.host, qdrant_port=args.port, collection_name=args.collection,
+            model=SentenceTransformer(args.model), projection=projection
+        )
+        bulk_load = memory_manager.bulk_load() if args.bulk else contextlib.nullcontext()
+        with bulk_load:
+            result = gravrag_load.load_memories(
+                memory_manager.store_memories, args.path, args.format, args.model,
+                encode=lambda texts: memory_manager.model.encode(texts, batch_size=args.batch_size),
+                batch_size=args.batch_size, workers=args.workers, parallel=args.parallel,
+                checkpoint_path=args.checkpoint, restart=args.restart,
+                content_field=args.content_field, metadata_field=args.metadata_field
+            )
+        if args.bulk:
+            result["bulk_load"] = bulk_load.report()
+    elif args.command == "fit-projection":
+        sample = gravrag_projection.sample_vectors(client, args.collection, args.sample_size)
+        fitted = gravrag_projection.fit_projection(sample, args.kind, args.dim, args.version)
+        fitted.save(args.path)
+        result = {"path": args.path, "vector_name": fitted.vector_name, **fitted.info}
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
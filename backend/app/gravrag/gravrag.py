@@ -1,13 +1,31 @@
+import os
 import time
 import math
 import uuid
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+import contextlib
+from typing import List, Dict, Any, Optional, Tuple, Union
+import numpy as np
 from sentence_transformers import SentenceTransformer
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client.models import (
+    PointStruct, Filter, FieldCondition, MatchAny, MatchValue, PayloadSchemaType, SearchRequest,
+    RecommendRequest, Range, OrderBy, Direction, FilterSelector
+)
 from sklearn.metrics.pairwise import cosine_similarity
-from datetime import datetime
+from datetime import datetime, timezone
+from gravrag.gravrag_tags import TagIndex, normalize_tags
+from gravrag import gravrag_browse, gravrag_packing, gravrag_io, gravrag_consolidate, gravrag_graph, gravrag_tiers, gravrag_aliases
+from gravrag.gravrag_projection import Projection, VectorLayout, load_configured_projection
+from gravrag.gravrag_subscriptions import SubscriptionRegistry, Subscription
+from gravrag.gravrag_replicas import ReplicatedQdrantClient, configured_read_urls
+from gravrag.gravrag_bulk import BulkLoad
+from gravrag.gravrag_working_memory import WorkingMemory, WORKING, session_key
+from gravrag.gravrag_stats import StatsTable
+from gravrag.gravrag_content import content_payload, is_compressed, decompress, fetch_contents, SEARCH_PAYLOAD, COMPRESSED_FIELD
+from gravrag.gravrag_metrics import stage_timer, track_collection_size, MEMORIES_TOTAL, TIER_RECALLS
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -15,17 +33,55 @@ logger = logging.getLogger(__name__)
 
 # Gravitational constants and thresholds
 GRAVITATIONAL_THRESHOLD = 1e-5  # This can be adjusted based on system requirements
+WRITE_GATE_POLL_SECONDS = 0.05  # How often a write held back by a rebuild's alias swap checks the gate
+
+# Payload keys with a Qdrant payload index, so filters on them run server-side
+TAGS_FIELD = "metadata.tags"
+TIMESTAMP_FIELD = "metadata.timestamp"
+OBJECTIVE_FIELD = "metadata.objective_id"
+PAYLOAD_INDEXES = {
+    TAGS_FIELD: PayloadSchemaType.KEYWORD,
+    TIMESTAMP_FIELD: PayloadSchemaType.FLOAT,
+    OBJECTIVE_FIELD: PayloadSchemaType.KEYWORD,
+}
+TAG_MODES = ("boost", "filter")
+ORDER_BY_MODES = ("relevance", "recency")
+
+
+def normalize_timestamp(value: Any) -> float:
+    """
+    Coerce a timestamp (epoch seconds or ISO-8601 string) into epoch seconds, so the float
+    payload index can range-filter it. Missing timestamps default to now.
+    """
+    if value is None:
+        return time.time()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            return parsed.timestamp()
+    raise ValueError(f"Unsupported timestamp value: {value!r}")
 
 class MemoryPacket:
     def __init__(self, vector: List[float], content: str, metadata: Dict[str, Any]):
         self.vector = vector  # Semantic vector (numeric representation)
         self.content = content  # Original content (human-readable text)
         self.metadata = metadata or {}
+        self.point_id = None
+        self.tier = None  # "hot" or "cold" when recalled from a tiered store
+        self.compressed = None  # Compressed full content, when `content` is only its preview
+        self.content_pending = False  # True while `content` is a preview (see gravrag_content)
 
         # Metadata defaults
-        self.metadata.setdefault("timestamp", time.time())
+        self.metadata["timestamp"] = normalize_timestamp(self.metadata.get("timestamp"))
         self.metadata.setdefault("recall_count", 0)
-        self.metadata.setdefault("memetic_similarity", self.calculate_memetic_similarity())
+        if "memetic_similarity" not in self.metadata:
+            self.metadata["memetic_similarity"] = self.calculate_memetic_similarity()
         self.metadata.setdefault("semantic_relativity", 1.0)
         self.metadata.setdefault("gravitational_pull", self.calculate_gravitational_pull())
         self.metadata.setdefault("spacetime_coordinate", self.calculate_spacetime_coordinate())
@@ -53,16 +109,19 @@ class MemoryPacket:
         self.metadata["spacetime_coordinate"] = spacetime_coordinate
         return spacetime_coordinate
 
-    def update_relevance(self, query_vector: List[float]):
+    def update_relevance(self, query_vector: List[float], memetic_similarity: Optional[float] = None):
         """
         Update relevance when recalling a memory. This recalculates semantic relativity, memetic similarity,
         gravitational pull, and spacetime coordinate.
+        A precomputed memetic similarity (e.g. from a batched TagIndex pass) skips the per-packet Jaccard.
         """
         # Recalculate semantic similarity with the query vector (cosine similarity)
         self.metadata["semantic_relativity"] = self.calculate_cosine_similarity(self.vector, query_vector)
 
         # Recalculate memetic similarity based on dynamic contextual information
-        self.metadata["memetic_similarity"] = self.calculate_memetic_similarity()
+        if memetic_similarity is None:
+            memetic_similarity = self.calculate_memetic_similarity()
+        self.metadata["memetic_similarity"] = memetic_similarity
 
         # Update gravitational pull and spacetime coordinate
         self.calculate_gravitational_pull()
@@ -106,16 +165,16 @@ class MemoryPacket:
     def to_payload(self) -> Dict[str, Any]:
         """
         Convert the memory packet to a Qdrant-compatible payload for storage.
-        Store the vector and content separately.
+        Store the vector and content separately; large content is stored compressed behind a preview.
         """
         return {
             "vector": self.vector,  # Correctly storing the vector here
-            "content": self.content,  # Storing the original content here
+            **content_payload(self.content),  # Storing the original content (or its preview) here
             "metadata": self.metadata
         }
 
     @staticmethod
-    def from_payload(payload: Dict[str, Any]):
+    def from_payload(payload: Dict[str, Any], point_id: Any = None, tier: Optional[str] = None):
         """ Recreate a MemoryPacket from a payload, ensuring 'content' is handled correctly. """
         vector = payload.get("vector")
         content = payload.get("content", "")  # Ensure content is present, or provide a default value
@@ -125,77 +184,707 @@ class MemoryPacket:
         if not vector:
             raise ValueError("Vector data is missing in payload")
         
-        return MemoryPacket(vector=vector, content=content, metadata=metadata)
+        memory = MemoryPacket(vector=vector, content=content, metadata=metadata)
+        memory.point_id = point_id  # Qdrant point ID, when recreated from a stored point
+        memory.tier = tier
+        # Compressed content is only decompressed for the memories a recall returns (see _hydrate_contents)
+        memory.compressed = payload.get(COMPRESSED_FIELD)
+        memory.content_pending = is_compressed(payload)
+        return memory
 
 
 class MemoryManager:
-    def __init__(self, qdrant_host="localhost", qdrant_port=6333, collection_name="Mind"):
-        self.qdrant_client = QdrantClient(host=qdrant_host, port=qdrant_port)
+    def __init__(self, qdrant_host=None, qdrant_port=None, collection_name="Mind",
+                 qdrant_location: Optional[str] = None, model=None, graph_k: Optional[int] = None,
+                 projection: Optional[Projection] = None, tiering: Optional[bool] = None,
+                 read_urls: Optional[List[str]] = None):
+        """
+        Connect to Qdrant and load the embedding model.
+        `qdrant_location` (or QDRANT_LOCATION) accepts ":memory:" or a URL and takes precedence over host/port,
+        which default to QDRANT_HOST/QDRANT_PORT. `model` may be any object with SentenceTransformer's
+        encode()/get_sentence_embedding_dimension() interface. `graph_k` neighbours (GRAVRAG_GRAPH_K) are
+        linked to each new memory; 0, the default, leaves the memory graph to repair_graph, which then runs in
+        the background (see run_graph_repairer). `projection` (or the
+        file named by GRAVRAG_PROJECTION) adds a reduced-dimension vector for first-stage search to newly created
+        collections.
+        `tiering` (GRAVRAG_TIERING) adds an on-disk, quantized cold tier that decayed memories are demoted to.
+        `read_urls` (GRAVRAG_READ_URLS) are Qdrant read replicas that take the search and retrieve load, with
+        hedging and circuit breaking (see ReplicatedQdrantClient); writes keep going to the primary.
+        """
+        qdrant_location = qdrant_location or os.getenv("QDRANT_LOCATION")
+        # Local mode is not thread-safe, so upserts from loader threads take turns there
+        self.local = qdrant_location == ":memory:"
+        self._upsert_lock = threading.Lock() if self.local else contextlib.nullcontext()
+        if qdrant_location:
+            self.qdrant_client = QdrantClient(location=qdrant_location)
+        else:
+            self.qdrant_client = QdrantClient(
+                host=qdrant_host or os.getenv("QDRANT_HOST", "localhost"),
+                port=int(qdrant_port or os.getenv("QDRANT_PORT", 6333))
+            )
+        read_urls = configured_read_urls() if read_urls is None else read_urls
+        if read_urls:
+            self.qdrant_client = ReplicatedQdrantClient(
+                self.qdrant_client, [(url, QdrantClient(url=url)) for url in read_urls]
+            )
         self.collection_name = collection_name
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')  # Semantic vector model
+        self.model = model or SentenceTransformer('all-MiniLM-L6-v2')  # Semantic vector model
+        self.tag_index = TagIndex()  # Bitset packing for batched memetic similarity
+        self.token_counter = gravrag_packing.configured_token_counter(self.model)  # For token-budgeted recall
+        self.graph_k = gravrag_graph.GRAPH_K if graph_k is None else graph_k
+        self.unlinked_memories = 0  # Memories created since the last graph repair without insert-time links
+        self.projection = projection or load_configured_projection()
+        self.layout = VectorLayout()  # Replaced by the collection's actual layout in _setup_collection
+        self.tiering = gravrag_tiers.tiering_enabled() if tiering is None else tiering
+        self.cold_collection_name = gravrag_tiers.cold_collection_name(collection_name)
+        self.tier_confidence = gravrag_tiers.DEFAULT_CONFIDENCE
+        self.rebuild_job: Optional[gravrag_aliases.RebuildJob] = None
+        self.write_log = gravrag_aliases.WriteLog()  # IDs written while a rebuild runs, for its catch-up
+        self.write_gate = gravrag_aliases.WriteGate()  # Closed by a rebuild across its last catch-up and swap
+        self.subscriptions = SubscriptionRegistry()  # Standing queries matched against every new memory
+        self.working_memory = WorkingMemory()  # Recent memories per session, searched before Qdrant
+        self.stats = StatsTable()  # Per-objective and per-tag aggregates for /stats
+        self.stats_refresh: Optional[asyncio.Task] = None  # Background rescan of a stale stats table
         self._setup_collection()
+        track_collection_size(self.qdrant_client, self.collection_name)
+        if self.tiering:
+            track_collection_size(self.qdrant_client, self.cold_collection_name)
 
     def _setup_collection(self):
         """
-        Ensure that the Qdrant collection is set up for vectors with cosine distance.
+        Ensure that the Qdrant collection is set up for vectors with cosine distance, and adopt its vector layout.
+        New collections are created behind an alias named `collection_name`, so rebuilds can swap them atomically.
         """
-        try:
-            self.qdrant_client.get_collection(self.collection_name)
+        if self.qdrant_client.collection_exists(self.collection_name):
             logger.info(f"Collection '{self.collection_name}' exists.")
-        except Exception:
+            self.layout = VectorLayout.from_collection(self.qdrant_client, self.collection_name, self.projection)
+        else:
             logger.info(f"Creating collection '{self.collection_name}'.")
-            self.qdrant_client.create_collection(
-                collection_name=self.collection_name,
-                vectors_config=VectorParams(size=self.model.get_sentence_embedding_dimension(), distance=Distance.COSINE)
+            self.layout = VectorLayout(self.projection)
+            gravrag_aliases.create_aliased(
+                self.qdrant_client, self.collection_name,
+                vectors_config=self.layout.vectors_config(self.model.get_sentence_embedding_dimension())
+            )
+        self._setup_payload_indexes(self.collection_name)
+        if self.tiering:
+            gravrag_tiers.ensure_cold_collection(
+                self.qdrant_client, self.cold_collection_name, self.layout, self.model.get_sentence_embedding_dimension()
             )
+            self._setup_payload_indexes(self.cold_collection_name)
+
+    def _setup_payload_indexes(self, collection_name: str):
+        """
+        Create the payload indexes used for server-side filtering. Creating an existing index is a no-op.
+        """
+        for field_name, field_schema in PAYLOAD_INDEXES.items():
+            try:
+                self.qdrant_client.create_payload_index(
+                    collection_name=collection_name,
+                    field_name=field_name,
+                    field_schema=field_schema
+                )
+            except Exception as e:
+                logger.warning(f"Could not create payload index '{field_name}': {str(e)}")
+
+    @staticmethod
+    def _time_conditions(since: Optional[float] = None, until: Optional[float] = None) -> List[FieldCondition]:
+        """ Range condition on the indexed timestamp for a [since, until] window (either bound optional). """
+        if since is None and until is None:
+            return []
+        return [FieldCondition(key=TIMESTAMP_FIELD, range=Range(gte=since, lte=until))]
+
+    def _memetic_similarities(self, memories: List[MemoryPacket],
+                              query_tags: Optional[List[Optional[List[str]]]] = None) -> np.ndarray:
+        """
+        Memetic similarity of each memory in one vectorized pass. For a query with tags it is 1 plus the
+        Jaccard overlap between the memory's tags and the query's, so overlap boosts a memory and no overlap
+        is neutral (1.0), like an untagged memory. For a query without tags it is the Jaccard similarity
+        with the memory's own reference tags. `query_tags` holds one entry per memory.
+        """
+        tag_lists = [memory.metadata.get("tags") for memory in memories]
+        query_tags = query_tags or [None] * len(memories)
+        reference_tags = [
+            row_tags if row_tags else memory.metadata.get("reference_tags", [])
+            for memory, row_tags in zip(memories, query_tags)
+        ]
+
+        scores = self.tag_index.jaccard(tag_lists, reference_tags)
+        tagged = np.array([bool(tags) for tags in tag_lists], dtype=bool)
+        boosted = np.array([bool(row_tags) for row_tags in query_tags], dtype=bool)
+        scores[boosted] = 1.0 + np.where(tagged, scores, 0.0)[boosted]
+        # Memories without a tags key keep the default full similarity
+        scores[np.array([tags is None for tags in tag_lists], dtype=bool)] = 1.0
+        return scores
+
+    def _rerank(self, memory_lists: List[List[MemoryPacket]], query_vectors: List[List[float]],
+                query_tags: List[Optional[List[str]]]) -> List[List[MemoryPacket]]:
+        """
+        Apply the gravity re-ranking (MemoryPacket.update_relevance followed by sorting on
+        semantic_relativity * memetic_similarity * gravitational_pull) to the result lists of several
+        queries at once. All hits are scored in one vectorized pass; each list comes back sorted.
+        """
+        flat = [memory for memories in memory_lists for memory in memories]
+        if not flat:
+            return [[] for _ in memory_lists]
+        owner = np.repeat(np.arange(len(memory_lists)), [len(memories) for memories in memory_lists])
+
+        vectors = np.asarray([memory.vector for memory in flat], dtype=np.float64)
+        queries = np.asarray(query_vectors, dtype=np.float64)[owner]
+        magnitudes = np.linalg.norm(vectors, axis=1)
+        norms = magnitudes * np.linalg.norm(queries, axis=1)
+        dots = np.einsum("ij,ij->i", vectors, queries)
+        semantic = np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+
+        memetic = self._memetic_similarities(flat, [query_tags[row] for row in owner])
+        recall_counts = np.array([memory.metadata["recall_count"] for memory in flat], dtype=np.float64)
+        timestamps = np.array([memory.metadata["timestamp"] for memory in flat], dtype=np.float64)
+
+        pull = magnitudes * (1 + np.log1p(recall_counts)) * memetic * semantic
+        spacetime = pull / (1 + (time.time() - timestamps))
+        scores = semantic * memetic * pull
+
+        for row, memory in enumerate(flat):
+            memory.metadata["semantic_relativity"] = float(semantic[row])
+            memory.metadata["memetic_similarity"] = float(memetic[row])
+            memory.metadata["gravitational_pull"] = float(pull[row])
+            memory.metadata["spacetime_coordinate"] = float(spacetime[row])
+
+        ranked: List[List[MemoryPacket]] = [[] for _ in memory_lists]
+        for row in np.lexsort((-scores, owner)):
+            ranked[owner[row]].append(flat[row])
+        return ranked
+
+    def _search_requests(self, query_vector: List[float], limit: int, tags: Optional[List[str]] = None,
+                         tag_mode: str = "boost", conditions: Optional[List[FieldCondition]] = None) -> List[SearchRequest]:
+        """
+        Search requests for one query, applying `conditions` server-side and using the keyword-indexed tags
+        field for candidate selection. 'filter' only returns memories sharing at least one tag; 'boost' adds a
+        tag-filtered search next to the plain one so tag-overlapping memories always reach the re-ranking stage.
+        """
+        return [
+            self.layout.search_request(query_vector, query_filter, limit, with_payload=SEARCH_PAYLOAD)
+            for query_filter in self._candidate_filters(tags, tag_mode, conditions)
+        ]
+
+    @staticmethod
+    def _candidate_filters(tags: Optional[List[str]] = None, tag_mode: str = "boost",
+                           conditions: Optional[List[FieldCondition]] = None) -> List[Optional[Filter]]:
+        """ One Qdrant filter per candidate request of a query; see _search_requests. """
+        conditions = list(conditions or [])
+
+        def build_filter(*extra: FieldCondition) -> Optional[Filter]:
+            must = conditions + list(extra)
+            return Filter(must=must) if must else None
+
+        if not tags:
+            return [build_filter()]
+        tag_condition = FieldCondition(key=TAGS_FIELD, match=MatchAny(any=tags))
+        if tag_mode == "filter":
+            return [build_filter(tag_condition)]
+        return [build_filter(tag_condition), build_filter()]
+
+    @staticmethod
+    def _metadata_conditions(metadata: Optional[Dict[str, Any]] = None) -> List[FieldCondition]:
+        """ Exact-match conditions on nested metadata keys; a list value requires each of its elements. """
+        conditions = []
+        for key, value in (metadata or {}).items():
+            for item in (value if isinstance(value, list) else [value]):
+                conditions.append(FieldCondition(key=f"metadata.{key}", match=MatchValue(value=item)))
+        return conditions
+
+    def _run_searches(self, request_groups: List[List[SearchRequest]], collection_name: Optional[str] = None):
+        """
+        Run the search requests of several queries in a single Qdrant search_batch call and
+        return one de-duplicated hit list per group, in group order.
+        """
+        requests = [request for group in request_groups for request in group]
+        responses = self.layout.run_batch(self.qdrant_client, collection_name or self.collection_name, requests)
+
+        results, position = [], 0
+        for group in request_groups:
+            merged = {}
+            for hits in responses[position:position + len(group)]:
+                for hit in hits:
+                    merged.setdefault(hit.id, hit)
+            results.append(list(merged.values()))
+            position += len(group)
+        return results
+
+    def _run_tiered_searches(self, request_groups: List[List[SearchRequest]],
+                             limits: List[int]) -> List[List[Tuple[Any, Optional[str]]]]:
+        """
+        _run_searches returning (hit, tier) pairs. With tiering on, every query is answered from the hot tier,
+        and only the queries whose hot hits are too few or too weak (see gravrag_tiers.needs_cold) are also run
+        against the cold tier, in one more batch call. A memory found in both tiers mid-demotion counts as hot.
+        """
+        hit_lists = self._run_searches(request_groups)
+        if not self.tiering:
+            return [[(hit, None) for hit in hits] for hits in hit_lists]
+
+        fallback = [
+            row for row, (hits, limit) in enumerate(zip(hit_lists, limits))
+            if gravrag_tiers.needs_cold(hits, limit, self.tier_confidence)
+        ]
+        TIER_RECALLS.labels(tier=gravrag_tiers.HOT).inc(len(hit_lists) - len(fallback))
+        TIER_RECALLS.labels(tier=gravrag_tiers.COLD).inc(len(fallback))
+        results = [[(hit, gravrag_tiers.HOT) for hit in hits] for hits in hit_lists]
+        if fallback:
+            cold_lists = self._run_searches([request_groups[row] for row in fallback], self.cold_collection_name)
+            for row, cold_hits in zip(fallback, cold_lists):
+                hot_ids = {hit.id for hit in hit_lists[row]}
+                results[row].extend((hit, gravrag_tiers.COLD) for hit in cold_hits if hit.id not in hot_ids)
+        return results
+
+    def _retrieve_tiered(self, ids: List[Any], with_payload: Any = SEARCH_PAYLOAD) -> List[Tuple[Any, Optional[str]]]:
+        """
+        Retrieve points by ID as (point, tier) pairs: from the hot tier, then the IDs it lacks from the cold tier
+        when tiering is on. A memory found in both tiers mid-demotion counts as hot.
+        """
+        points = self.qdrant_client.retrieve(collection_name=self.collection_name, ids=ids, with_payload=with_payload)
+        if not self.tiering:
+            return [(point, None) for point in points]
+        found = {point.id for point in points}
+        missing = [point_id for point_id in ids if point_id not in found]
+        cold = self.qdrant_client.retrieve(
+            collection_name=self.cold_collection_name, ids=missing, with_payload=with_payload
+        ) if missing else []
+        return [(point, gravrag_tiers.HOT) for point in points] + [(point, gravrag_tiers.COLD) for point in cold]
+
+    def _run_session_searches(self, request_groups: List[List[SearchRequest]], limits: List[int],
+                              query_vectors, sessions: List[Optional[str]],
+                              filters: List[Dict[str, Any]]) -> List[List[Tuple[Any, Optional[str]]]]:
+        """
+        _run_tiered_searches for queries that may name a session. A session's working memory is searched first
+        (with each query's `filters`: tags, since, until); when it is confident (see WorkingMemory.confident)
+        the query skips Qdrant entirely, otherwise its Qdrant hits are merged behind the working-memory ones.
+        """
+        working = [
+            self.working_memory.search(session, vector, limit, **query_filters) if session else []
+            for session, vector, limit, query_filters in zip(sessions, query_vectors, limits, filters)
+        ]
+        remote = [row for row, hits in enumerate(working) if not self.working_memory.confident(hits, limits[row])]
+        TIER_RECALLS.labels(tier=WORKING).inc(len(working) - len(remote))
+        results = [[(hit, WORKING) for hit in hits] for hits in working]
+        if remote:
+            remote_results = self._run_tiered_searches([request_groups[row] for row in remote],
+                                                       [limits[row] for row in remote])
+            for row, hits in zip(remote, remote_results):
+                seen = {hit.id for hit, _ in results[row]}
+                results[row].extend((hit, tier) for hit, tier in hits if hit.id not in seen)
+        return results
+
+    async def _encode(self, texts):
+        """ Run the embedding model in a worker thread so encoding never stalls the event loop. """
+        return await asyncio.to_thread(self.model.encode, texts)
+
+    @contextlib.asynccontextmanager
+    async def _writing(self):
+        """
+        Hold the write gate for a write. While a rebuild has it closed for its alias swap, the write waits on
+        the event loop, so it is encoded and stored with the model of the generation it lands in.
+        """
+        while not self.write_gate.enter(blocking=False):
+            await asyncio.sleep(WRITE_GATE_POLL_SECONDS)
+        try:
+            yield
+        finally:
+            self.write_gate.leave()
+
+    def ensure_not_rebuilding(self, operation: str):
+        """ Raise RuntimeError for maintenance whose writes a running rebuild's catch-up would not see. """
+        if self.rebuild_job is not None and self.rebuild_job.running:
+            raise RuntimeError(f"Cannot {operation} while a rebuild is {self.rebuild_job.status}")
 
     async def create_memory(self, content: str, metadata: Dict[str, Any]):
         """
         Create a memory from content, vectorize it, and store in Qdrant asynchronously.
         """
-        vector = self.model.encode(content).tolist()
-        memory_packet = MemoryPacket(vector=vector, content=content, metadata=metadata)
-        point_id = str(uuid.uuid4())
-        
-        # Insert the memory packet into the Qdrant collection
-        self.qdrant_client.upsert(
-            collection_name=self.collection_name,
-            points=[PointStruct(id=point_id, vector=vector, payload=memory_packet.to_payload())]
-        )
+        async with self._writing():
+            with stage_timer("encode"):
+                vector = (await self._encode(content)).tolist()
+            if metadata and "tags" in metadata:
+                metadata["tags"] = normalize_tags(metadata["tags"])  # Keyword index only covers strings
+            memory_packet = MemoryPacket(vector=vector, content=content, metadata=metadata)
+            point_id = str(uuid.uuid4())
+            payload = memory_packet.to_payload()
+
+            # Nearest existing memories become the new memory's graph neighbours
+            hits = []
+            if self.graph_k:
+                with stage_timer("qdrant_search"):
+                    hits = self.layout.run_batch(self.qdrant_client, self.collection_name, [self.layout.search_request(
+                        vector, None, self.graph_k,
+                        with_payload=[gravrag_graph.NEIGHBORS_FIELD, gravrag_graph.NEIGHBOR_SCORES_FIELD]
+                    )])[0]
+                payload.update(gravrag_graph.neighbor_payload(hits, self.graph_k))
+
+            # Insert the memory packet into the Qdrant collection
+            with stage_timer("qdrant_upsert"):
+                self.qdrant_client.upsert(
+                    collection_name=self.collection_name,
+                    points=[PointStruct(id=point_id, vector=self.layout.point_vector(vector), payload=payload)]
+                )
+            if hits:
+                with stage_timer("graph_link"):
+                    gravrag_graph.link_new_point(self.qdrant_client, self.collection_name, point_id, hits, self.graph_k)
+            self.write_log.record(self.collection_name, [point_id] + [hit.id for hit in hits])
+            # Published before the gate opens, so the vector is in the same space as the standing queries
+            if len(self.subscriptions):
+                try:
+                    with stage_timer("subscriptions"):
+                        self.subscriptions.publish(vector, point_id, content, memory_packet.metadata)
+                except Exception as e:
+                    logger.error(f"Error publishing memory {point_id} to subscriptions: {str(e)}", exc_info=True)
+        if not self.graph_k:
+            self.unlinked_memories += 1
+        self.working_memory.add(session_key(memory_packet.metadata), point_id, payload)
+        self.stats.add(memory_packet.metadata)
+        MEMORIES_TOTAL.labels(event="created").inc()
         logger.info(f"Memory created successfully with ID: {point_id}")
 
-    async def recall_memory(self, query_content: str, top_k: int = 5):
-        """ Recall a memory based on query content and return the original content along with metadata. """
-        query_vector = self.model.encode(query_content).tolist()
+    def store_memories(self, point_ids: List[Any], contents: List[str], vectors: np.ndarray,
+                       metadatas: List[Dict[str, Any]]) -> int:
+        """
+        Store a batch of already-encoded memories in one upsert, for bulk loads (see gravrag_load). Existing IDs
+        are overwritten. Graph neighbours are not linked and subscriptions are not notified; run graph-repair
+        after a load when the memory graph is on. Safe to call from several threads at once: their upserts run
+        concurrently against a Qdrant server and one at a time in local mode.
+        """
+        points = []
+        for point_id, content, vector, point_vector, metadata in zip(
+            point_ids, contents, vectors, self.layout.point_vectors(vectors), metadatas
+        ):
+            if "tags" in metadata:
+                metadata["tags"] = normalize_tags(metadata["tags"])
+            memory_packet = MemoryPacket(vector=vector.tolist(), content=content, metadata=metadata)
+            points.append(PointStruct(id=point_id, vector=point_vector, payload=memory_packet.to_payload()))
+        with self.write_gate.write(), self._upsert_lock, stage_timer("qdrant_upsert"):
+            self.qdrant_client.upsert(collection_name=self.collection_name, points=points, wait=True)
+            self.write_log.record(self.collection_name, list(point_ids))
+        self.stats.invalidate()  # Loads may overwrite existing IDs, so they cannot be counted as additions
+        self.unlinked_memories += len(points)
+        MEMORIES_TOTAL.labels(event="created").inc(len(points))
+        return len(points)
+
+    async def subscribe(self, query_content: str, threshold: float, tags: Optional[List[str]] = None) -> Subscription:
+        """
+        Register a standing query: its vector is encoded once, and every memory created afterwards whose cosine
+        similarity reaches `threshold` (and that shares a tag, when `tags` are given) is queued for the subscriber.
+        """
+        async with self._writing():  # Encoded with the model the registry is in, see _reencode_subscriptions
+            with stage_timer("encode"):
+                query_vector = await self._encode(query_content)
+            return self.subscriptions.add(query_content, query_vector, threshold, normalize_tags(tags))
+
+    async def _reencode_subscriptions(self, model):
+        """ Move the standing queries into `model`'s vector space once the encoder switched to it. """
+        queries = {subscription_id: subscription.query
+                   for subscription_id, subscription in self.subscriptions.subscriptions.items()}
+        if queries:
+            vectors = await asyncio.to_thread(model.encode, list(queries.values()))
+            self.subscriptions.reencode(dict(zip(queries, vectors)))
+
+    async def recall_memory(self, query_content: Optional[str], top_k: int = 5, tags: Optional[List[str]] = None,
+                            tag_mode: str = "boost", since: Optional[float] = None, until: Optional[float] = None,
+                            order_by: str = "relevance", session_id: Optional[str] = None,
+                            token_budget: Optional[int] = None, mmr_lambda: Optional[float] = None):
+        """
+        Recall a memory based on query content and return the original content along with metadata.
+        Optional tags either boost memories sharing them (tag_mode='boost') or restrict recall to them ('filter').
+        `since`/`until` restrict recall to a timestamp window server-side. Without a query, a time window
+        ordered by recency is served straight from the timestamp index, skipping encoding and vector search.
+        With `session_id` (a memory's session_id or objective_id), the session's working memory is searched
+        first and answers alone when it is confident.
+        With `token_budget`, up to top_k memories are packed into a context of at most that many tokens
+        instead (see _pack_results), and a dict with the memories and the context is returned.
+        """
+        if token_budget is not None and token_budget < 1:
+            raise ValueError("token_budget must be positive")
+        if tag_mode not in TAG_MODES:
+            raise ValueError(f"tag_mode must be one of {TAG_MODES}, got '{tag_mode}'")
+        if order_by not in ORDER_BY_MODES:
+            raise ValueError(f"order_by must be one of {ORDER_BY_MODES}, got '{order_by}'")
+        tags = normalize_tags(tags)
+        conditions = self._time_conditions(since, until)
+
+        if not (query_content or "").strip():
+            if order_by != "recency" or not conditions:
+                raise ValueError("A query is required unless recalling a time window ordered by recency")
+            if token_budget is not None:
+                raise ValueError("A token-budgeted recall needs a query")
+            return self._recall_recent(top_k, tags, conditions)
+
+        with stage_timer("encode"):
+            query_vector = (await self._encode(query_content)).tolist()
 
         # Perform semantic search with Qdrant (using the query vector and top_k limit)
-        results = self.qdrant_client.search(
-            collection_name=self.collection_name,
-            query_vector=query_vector,
-            limit=top_k
-        )
+        limit = self._candidate_limit(top_k, token_budget)
+        with stage_timer("qdrant_search"):
+            requests = self._search_requests(query_vector, limit, tags, tag_mode, conditions)
+            results = self._run_session_searches(
+                [requests], [limit], [query_vector], [session_id],
+                [{"tags": tags if tag_mode == "filter" else None, "since": since, "until": until}]
+            )[0]
+
+        with stage_timer("rerank"):
+            # Recreate MemoryPacket objects from the search results
+            memories = [MemoryPacket.from_payload(hit.payload, hit.id, tier) for hit, tier in results]
+
+            # Rank memories based on combined relevance factors
+            ranked_memories = self._rerank([memories], [query_vector], [tags])[0]
+
+        if token_budget is not None:
+            return self._pack_results(ranked_memories, top_k, token_budget, order_by, mmr_lambda)
+        return self._format_results(ranked_memories, top_k, order_by)
+
+    @staticmethod
+    def _candidate_limit(top_k: int, token_budget: Optional[int] = None) -> int:
+        """ Memories to search for a recall; packing searches more so diversity selection has room. """
+        return top_k * gravrag_packing.PACK_OVERSAMPLE if token_budget is not None else top_k
 
-        # Recreate MemoryPacket objects from the search results
-        memories = [MemoryPacket.from_payload(hit.payload) for hit in results]
+    def _pack_results(self, ranked_memories: List[MemoryPacket], top_k: int, token_budget: int,
+                      order_by: str = "relevance", mmr_lambda: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Pack re-ranked candidates into a context of at most `token_budget` tokens. Candidates are ordered by
+        maximal marginal relevance over their vectors, with gravity scores as relevance, so near-duplicates are
+        dropped and similar memories move back; then up to top_k are taken in that order while they fit (see
+        gravrag_packing.pack). Returns the packed memories with their token counts, the context (their contents
+        joined by blank lines), its token count and what was left out.
+        """
+        mmr_lambda = gravrag_packing.MMR_LAMBDA if mmr_lambda is None else mmr_lambda
+        with stage_timer("pack"):
+            relevance = np.array([
+                memory.metadata["semantic_relativity"] * memory.metadata["memetic_similarity"]
+                * memory.metadata["gravitational_pull"]
+                for memory in ranked_memories
+            ])
+            order, duplicates = gravrag_packing.mmr_order(
+                [memory.vector for memory in ranked_memories], relevance, mmr_lambda
+            )
+            candidates = [ranked_memories[row] for row in order]
+            with stage_timer("decompress"):
+                self._hydrate_contents(candidates)
+            token_counts = self.token_counter.count_many(
+                [gravrag_packing.SEPARATOR] + [memory.content for memory in candidates]
+            )
+            separator_tokens, token_counts = token_counts[0], token_counts[1:]
+            taken, used = gravrag_packing.pack(token_counts, token_budget, top_k, separator_tokens)
+
+        packed = [(candidates[index], token_counts[index]) for index in taken]
+        if order_by == "recency":
+            packed.sort(key=lambda item: item[0].metadata["timestamp"], reverse=True)
+        memories = self._format_results([memory for memory, _ in packed], top_k)
+        for result, (_, tokens) in zip(memories, packed):
+            result["tokens"] = tokens
+        return {
+            "memories": memories,
+            "context": gravrag_packing.SEPARATOR.join(result["content"] for result in memories),
+            "context_tokens": used,
+            "token_budget": token_budget,
+            "candidates": len(ranked_memories),
+            "duplicates_dropped": len(duplicates),
+            "left_out": len(candidates) - len(taken),
+        }
 
-        # Update relevance for each memory
+    def _hydrate_contents(self, memories: List[MemoryPacket]):
+        """
+        Replace content previews with the full content. Searches leave compressed content out of the payload,
+        so it is fetched here for the returned memories only, with one retrieve per collection.
+        """
+        missing: Dict[str, List[MemoryPacket]] = {}
         for memory in memories:
-            memory.update_relevance(query_vector)
-
-        # Rank memories based on combined relevance factors
-        ranked_memories = sorted(
-            memories,
-            key=lambda mem: (
-                mem.metadata['semantic_relativity'] * mem.metadata['memetic_similarity'] * mem.metadata['gravitational_pull']
-            ),
-            reverse=True
-        )
+            if not memory.content_pending:
+                continue
+            if memory.compressed is not None:
+                memory.content, memory.compressed, memory.content_pending = decompress(memory.compressed), None, False
+            elif memory.point_id is not None:
+                collection = self.cold_collection_name if memory.tier == gravrag_tiers.COLD else self.collection_name
+                missing.setdefault(collection, []).append(memory)
+        for collection, pending in missing.items():
+            contents = fetch_contents(self.qdrant_client, collection, [memory.point_id for memory in pending])
+            for memory in pending:
+                if memory.point_id in contents:
+                    memory.content, memory.content_pending = contents[memory.point_id], False
+                else:  # Moved or deleted since the search; the preview is all there is
+                    logger.warning(f"Full content of memory {memory.point_id} not found in '{collection}'.")
+
+    def _format_results(self, ranked_memories: List[MemoryPacket], top_k: int, order_by: str = "relevance"):
+        """ Cut a ranked list to top_k and return original content and metadata for each memory. """
+        ranked_memories = ranked_memories[:top_k]
+        if order_by == "recency":
+            ranked_memories.sort(key=lambda mem: mem.metadata["timestamp"], reverse=True)
+        with stage_timer("decompress"):
+            self._hydrate_contents(ranked_memories)
 
-        # Return original content and metadata for top K results
-        return [{
+        results = [{
+            "id": str(memory.point_id) if memory.point_id is not None else None,  # Usable with /related/{point_id}
             "content": memory.content,  # Return the original content
             "metadata": memory.metadata
-        } for memory in ranked_memories[:top_k]]
+        } for memory in ranked_memories]
+        for result, memory in zip(results, ranked_memories):
+            if memory.tier is not None:
+                result["tier"] = memory.tier  # Which tier served the memory
+        return results
+
+    async def recall_many(self, queries: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Recall for several queries at once: one batched encoder forward pass, one Qdrant search_batch
+        call and one vectorized re-rank over every result list. Each query is a dict with 'query' and
+        optionally 'top_k', 'tags', 'tag_mode', 'since', 'until', 'order_by', 'session_id', 'token_budget' and
+        'mmr_lambda', as for recall_memory.
+        Results are returned in request order; a query with a token budget gets a packed-context dict.
+        """
+        if not queries:
+            return []
+        for query in queries:
+            if not (query.get("query") or "").strip():
+                raise ValueError("Every batched recall needs a non-empty query")
+            if query.get("tag_mode", "boost") not in TAG_MODES:
+                raise ValueError(f"tag_mode must be one of {TAG_MODES}, got '{query.get('tag_mode')}'")
+            if query.get("order_by", "relevance") not in ORDER_BY_MODES:
+                raise ValueError(f"order_by must be one of {ORDER_BY_MODES}, got '{query.get('order_by')}'")
+            if query.get("token_budget") is not None and query["token_budget"] < 1:
+                raise ValueError("token_budget must be positive")
+
+        with stage_timer("encode"):
+            query_vectors = np.asarray(await self._encode([query["query"] for query in queries]))
+
+        limits = [self._candidate_limit(query.get("top_k", 5), query.get("token_budget")) for query in queries]
+
+        tags_per_query = [normalize_tags(query.get("tags")) for query in queries]
+        request_groups = [
+            self._search_requests(
+                query_vectors[index].tolist(),
+                limits[index],
+                tags_per_query[index],
+                query.get("tag_mode", "boost"),
+                self._time_conditions(query.get("since"), query.get("until"))
+            )
+            for index, query in enumerate(queries)
+        ]
+        with stage_timer("qdrant_search"):
+            hit_lists = self._run_session_searches(
+                request_groups, limits, query_vectors,
+                [query.get("session_id") for query in queries],
+                [
+                    {"tags": tags if query.get("tag_mode", "boost") == "filter" else None,
+                     "since": query.get("since"), "until": query.get("until")}
+                    for tags, query in zip(tags_per_query, queries)
+                ]
+            )
+
+        with stage_timer("rerank"):
+            memory_lists = [
+                [MemoryPacket.from_payload(hit.payload, hit.id, tier) for hit, tier in hits] for hits in hit_lists
+            ]
+            ranked_lists = self._rerank(memory_lists, query_vectors, tags_per_query)
+
+        return [
+            self._pack_results(ranked, query.get("top_k", 5), query["token_budget"], query.get("order_by", "relevance"),
+                               query.get("mmr_lambda"))
+            if query.get("token_budget") is not None
+            else self._format_results(ranked, query.get("top_k", 5), query.get("order_by", "relevance"))
+            for ranked, query in zip(ranked_lists, queries)
+        ]
+
+    async def related_memories(self, point_id: Any, top_k: int = 5, positive_ids: Optional[List[Any]] = None,
+                               negative_ids: Optional[List[Any]] = None, tags: Optional[List[str]] = None,
+                               tag_mode: str = "boost", since: Optional[float] = None, until: Optional[float] = None,
+                               metadata: Optional[Dict[str, Any]] = None, order_by: str = "relevance"):
+        """
+        Memories similar to a stored one ("more like this"), found with Qdrant recommend from the stored
+        vectors of the example points, so the embedding model never runs. Extra positive examples pull
+        results towards them and negative examples push results away. Candidates get the same gravity
+        re-ranking as recall_memory, measured against the recommend target vector and the source memory's tags.
+        With tiering on, examples may be demoted memories, and the cold tier is consulted like recall_memory
+        does, or always when a positive example is itself cold. Raises KeyError when an example point does not
+        exist.
+        """
+        if tag_mode not in TAG_MODES:
+            raise ValueError(f"tag_mode must be one of {TAG_MODES}, got '{tag_mode}'")
+        if order_by not in ORDER_BY_MODES:
+            raise ValueError(f"order_by must be one of {ORDER_BY_MODES}, got '{order_by}'")
+        positive_ids = [point_id] + [pid for pid in (positive_ids or []) if pid != point_id]
+        negative_ids = list(negative_ids or [])
+        tags = normalize_tags(tags)
+        conditions = self._time_conditions(since, until) + self._metadata_conditions(metadata)
+
+        with stage_timer("qdrant_retrieve"):
+            examples = self._retrieve_tiered(positive_ids + negative_ids)
+        examples_by_id = {point.id: point for point, _ in examples}
+        example_tiers = {point.id: tier for point, tier in examples}
+        missing = [pid for pid in positive_ids + negative_ids if pid not in examples_by_id]
+        if missing:
+            raise KeyError(f"Memories not found: {missing}")
+
+        def example_vectors(ids: List[Any]) -> np.ndarray:
+            # Prefer the raw embedding kept in the payload; Qdrant stores a normalized copy for cosine
+            return np.asarray([examples_by_id[pid].payload["vector"] for pid in ids], dtype=np.float64)
+
+        # Qdrant's average_vector strategy: mean(positive) + (mean(positive) - mean(negative))
+        target = example_vectors(positive_ids).mean(axis=0)
+        if negative_ids:
+            target = 2 * target - example_vectors(negative_ids).mean(axis=0)
+        source_tags = tags or normalize_tags(examples_by_id[point_id].payload.get("metadata", {}).get("tags"))
+
+        def recommend(collection_name: str, tier: Optional[str]) -> List[Any]:
+            # Examples stored in the other tier are passed as vectors; Qdrant only resolves IDs of its own collection
+            def example(pid):
+                if example_tiers[pid] == tier:
+                    return pid
+                return self.layout.search_vector(examples_by_id[pid].payload["vector"])
+
+            by_vector = sum(1 for pid in examples_by_id if example_tiers[pid] != tier)  # Not excluded from hits
+            requests = [
+                RecommendRequest(positive=[example(pid) for pid in positive_ids],
+                                 negative=[example(pid) for pid in negative_ids], filter=query_filter,
+                                 limit=top_k + by_vector, with_payload=SEARCH_PAYLOAD, using=self.layout.search_name)
+                for query_filter in self._candidate_filters(tags, tag_mode, conditions)
+            ]
+            responses = self.qdrant_client.recommend_batch(collection_name=collection_name, requests=requests)
+            merged = {}
+            for hits in responses:
+                for hit in hits:
+                    if hit.id not in examples_by_id:
+                        merged.setdefault(hit.id, hit)
+            return list(merged.values())
+
+        with stage_timer("qdrant_search"):
+            hot_tier = gravrag_tiers.HOT if self.tiering else None
+            hits = [(hit, hot_tier) for hit in recommend(self.collection_name, hot_tier)]
+            cold_example = any(example_tiers[pid] == gravrag_tiers.COLD for pid in positive_ids)
+            if self.tiering and (cold_example or gravrag_tiers.needs_cold([hit for hit, _ in hits], top_k,
+                                                                           self.tier_confidence)):
+                TIER_RECALLS.labels(tier=gravrag_tiers.COLD).inc()
+                hot_ids = {hit.id for hit, _ in hits}
+                hits += [(hit, gravrag_tiers.COLD) for hit in recommend(self.cold_collection_name, gravrag_tiers.COLD)
+                         if hit.id not in hot_ids]
+            elif self.tiering:
+                TIER_RECALLS.labels(tier=gravrag_tiers.HOT).inc()
+
+        with stage_timer("rerank"):
+            memories = [MemoryPacket.from_payload(hit.payload, hit.id, tier) for hit, tier in hits]
+            ranked_memories = self._rerank([memories], [target.tolist()], [source_tags])[0]
+
+        return self._format_results(ranked_memories, top_k, order_by)
+
+    def _recall_recent(self, top_k: int, tags: List[str], conditions: List[FieldCondition]):
+        """
+        Most recent memories inside a time window, read in timestamp order from the payload index.
+        Tags act as a filter here since there is no query to rank against.
+        """
+        if tags:
+            conditions = conditions + [FieldCondition(key=TAGS_FIELD, match=MatchAny(any=tags))]
+        with stage_timer("qdrant_scroll"):
+            points, _ = self.qdrant_client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=Filter(must=conditions),
+                limit=top_k,
+                order_by=OrderBy(key=TIMESTAMP_FIELD, direction=Direction.DESC),
+                with_payload=SEARCH_PAYLOAD
+            )
+        memories = [MemoryPacket.from_payload(point.payload, point.id) for point in points]
+        return self._format_results(memories, top_k, "recency")
 
     async def prune_memories(self):
         """
@@ -203,43 +892,385 @@ class MemoryManager:
         """
         total_points = self.qdrant_client.count(self.collection_name).count
         if total_points > 1000000:  # Arbitrary limit
-            points = self.qdrant_client.scroll(self.collection_name, limit=1000)
+            points, _ = self.qdrant_client.scroll(self.collection_name, limit=1000)
             low_relevance_points = [
                 p.id for p in points if p.payload['metadata']['gravitational_pull'] < GRAVITATIONAL_THRESHOLD
             ]
             if low_relevance_points:
-                self.qdrant_client.delete(self.collection_name, points_selector=low_relevance_points)
+                async with self._writing():
+                    self.qdrant_client.delete(self.collection_name, points_selector=low_relevance_points)
+                    self.write_log.record(self.collection_name, low_relevance_points)
+                self.working_memory.discard(low_relevance_points)
+                self.stats.invalidate()
+                MEMORIES_TOTAL.labels(event="pruned").inc(len(low_relevance_points))
     
+    def _tier_aliases(self) -> List[str]:
+        """ Aliases of every collection holding memories: the hot collection, plus the cold tier when tiering. """
+        return [self.collection_name] + ([self.cold_collection_name] if self.tiering else [])
+
     async def purge_all_memories(self):
         """
         Deletes all memories from the Qdrant collection.
+        Each collection is swapped for an empty clone behind its alias, so concurrent recalls never miss a collection.
         """
         try:
-            # Delete the entire collection (and all memories within it)
-            self.qdrant_client.delete_collection(self.collection_name)
-            
-            # Re-create the collection after purging
-            self._setup_collection()
+            self.ensure_not_rebuilding("purge memories")
+            aliases = self._tier_aliases()
+            purged = sum(self.qdrant_client.count(alias).count for alias in aliases)
+            await asyncio.to_thread(gravrag_aliases.replace_with_empty, self.qdrant_client, aliases)
+            self.working_memory.clear()
+            self.stats.reset()
+            MEMORIES_TOTAL.labels(event="deleted").inc(purged)
             logger.info(f"Purged all memories in the collection '{self.collection_name}'.")
         except Exception as e:
             logger.error(f"Error purging all memories: {str(e)}")
             raise e
 
+    async def memory_stats(self, objective_id: Optional[str] = None, tag: Optional[str] = None,
+                           refresh: bool = False, limit: int = 100) -> Dict[str, Any]:
+        """
+        Memory counts and average gravitational pull, in total and for the `limit` largest objectives and tags,
+        served from the cached StatsTable. A table gone stale (after bulk writes) or old is rescanned in the
+        background while the last snapshot keeps being served; only the first call and `refresh` wait for a
+        rescan. With `objective_id` and/or `tag`, 'match' adds an exact count of the memories matching both, from
+        a Qdrant count over the indexed payload keys; an integer-looking objective_id also matches integer IDs.
+        """
+        if refresh:
+            self.stats.invalidate()
+        if self.stats.needs_rebuild():
+            if refresh or self.stats.built_at is None:
+                await self._rebuild_stats()
+            elif self.stats_refresh is None or self.stats_refresh.done():
+                self.stats_refresh = asyncio.create_task(self._rebuild_stats(background=True))
+        result = self.stats.snapshot(limit)
+        if objective_id is not None or tag is not None:
+            conditions = []
+            if objective_id is not None:
+                conditions.append(self._objective_condition(objective_id))
+            if tag is not None:
+                conditions.append(FieldCondition(key=TAGS_FIELD, match=MatchValue(value=tag)))
+            with stage_timer("qdrant_count"):
+                count = self._count_matching(Filter(must=conditions))
+            result["match"] = {"objective_id": objective_id, "tag": tag, "count": count}
+        return result
+
+    async def _rebuild_stats(self, background: bool = False):
+        try:
+            with stage_timer("qdrant_scroll"):
+                await asyncio.to_thread(self.stats.rebuild, self.qdrant_client, self._tier_aliases())
+        except Exception as e:
+            if not background:
+                raise
+            logger.error(f"Error rebuilding memory stats: {str(e)}", exc_info=True)
+
+    @staticmethod
+    def _objective_condition(objective_id: Union[int, str]):
+        """ Exact match on objective_id; "42" matches both the string and the integer 42, as the stats table does. """
+        values = [objective_id]
+        if isinstance(objective_id, str) and objective_id.lstrip("-").isdigit():
+            values.append(int(objective_id))
+        elif isinstance(objective_id, int) and not isinstance(objective_id, bool):
+            values.append(str(objective_id))
+        if len(values) == 1:
+            return FieldCondition(key=OBJECTIVE_FIELD, match=MatchValue(value=objective_id))
+        return Filter(should=[FieldCondition(key=OBJECTIVE_FIELD, match=MatchValue(value=value)) for value in values])
+
+    async def list_memories(self, cursor: Optional[str] = None, limit: int = gravrag_browse.DEFAULT_PAGE_SIZE,
+                            metadata: Optional[Dict[str, Any]] = None, tags: Optional[List[str]] = None,
+                            since: Optional[float] = None, until: Optional[float] = None,
+                            fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Browse memories page by page with Qdrant scroll, in ID order, hot tier first. `metadata` (exact match),
+        `tags` (any of them) and `since`/`until` filter server-side; `fields` picks what each memory carries (see
+        gravrag_browse.payload_selector). `limit` is capped at GRAVRAG_MAX_PAGE_SIZE. Returns the page and an
+        opaque `next_cursor` to pass back, None after the last page. Raises ValueError for bad cursors or fields.
+        """
+        limit = max(1, min(limit, gravrag_browse.MAX_PAGE_SIZE))
+        tags = normalize_tags(tags)
+        fields = list(fields or gravrag_browse.DEFAULT_FIELDS)
+        fingerprint = gravrag_browse.filter_fingerprint(metadata=metadata, tags=tags, since=since, until=until)
+        start = gravrag_browse.decode_cursor(cursor, fingerprint)
+        conditions = self._time_conditions(since, until) + self._metadata_conditions(metadata)
+        if tags:
+            conditions.append(FieldCondition(key=TAGS_FIELD, match=MatchAny(any=tags)))
+        collections = [(self.collection_name, gravrag_tiers.HOT if self.tiering else None)]
+        if self.tiering:
+            collections.append((self.cold_collection_name, gravrag_tiers.COLD))
+        with stage_timer("qdrant_scroll"):
+            page = gravrag_browse.list_page(
+                self.qdrant_client, collections, Filter(must=conditions) if conditions else None, fields, limit,
+                start, fingerprint
+            )
+        return {**page, "limit": limit}
+
+    async def export_memories(self, path: str, batch_size: int = gravrag_io.DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+        """
+        Stream every memory, of both tiers when tiering, into a Parquet file without touching the live data.
+        """
+        return await asyncio.to_thread(
+            gravrag_io.export_memories, self.qdrant_client, self._tier_aliases(), path, batch_size
+        )
+
+    async def import_memories(self, path: str, batch_size: int = gravrag_io.DEFAULT_BATCH_SIZE,
+                              parallel: int = gravrag_io.DEFAULT_PARALLEL, bulk: bool = False) -> Dict[str, Any]:
+        """
+        Restore memories from a Parquet export with parallel batched upserts. Existing IDs are overwritten.
+        `bulk` suspends HNSW indexing until the import is done (see gravrag_bulk.BulkLoad). Local mode imports
+        with one upsert at a time.
+        """
+        self.ensure_not_rebuilding("import memories")
+        try:
+            return await asyncio.to_thread(
+                gravrag_io.import_memories, self.qdrant_client, self.collection_name, path, batch_size,
+                1 if self.local else parallel,
+                self.layout, bulk
+            )
+        finally:
+            self.stats.invalidate()  # Also after a partial import
+
+    def bulk_load(self, **options) -> BulkLoad:
+        """ Bulk-load mode for the memory collection, for ingests through store_memories (see BulkLoad). """
+        return BulkLoad(self.qdrant_client, [self.collection_name], **options)
+
+    async def consolidate_memories(self, objective_id: Optional[Union[int, str]] = None, **options) -> Dict[str, Any]:
+        """
+        Replace cold memories with cluster summaries (see gravrag_consolidate.consolidate_objective), in the hot
+        tier and, when tiering, in the cold tier. Merged memories also leave working memory.
+        """
+        if not options.get("dry_run"):
+            self.ensure_not_rebuilding("consolidate memories")
+        report = await asyncio.to_thread(
+            gravrag_consolidate.consolidate_memories, self.qdrant_client, self._tier_aliases(), objective_id,
+            layout=self.layout, on_delete=self.working_memory.discard, **options
+        )
+        if not options.get("dry_run"):
+            merged = sum(item["points_removed"] - item["summaries_written"] for item in report["objectives"])
+            MEMORIES_TOTAL.labels(event="consolidated").inc(merged)
+            self.stats.invalidate()
+        return report
+
+    def start_rebuild(self, model_name: Optional[str] = None) -> gravrag_aliases.RebuildJob:
+        """
+        Register a rebuild job for rebuild_memories; raises RuntimeError while another rebuild is running.
+        """
+        if self.rebuild_job is not None and self.rebuild_job.running:
+            raise RuntimeError(f"A rebuild is already {self.rebuild_job.status}")
+        if model_name and self.layout.projection is not None:
+            raise ValueError("Projected collections cannot be re-embedded in place; fit a projection for the new "
+                             "model and import into a new collection")
+        self.rebuild_job = gravrag_aliases.RebuildJob(self._tier_aliases(), model_name)
+        return self.rebuild_job
+
+    async def rebuild_memories(self, job: Optional[gravrag_aliases.RebuildJob] = None, model_name: Optional[str] = None,
+                               batch_size: int = gravrag_aliases.DEFAULT_BATCH_SIZE,
+                               keep_previous: bool = False) -> Dict[str, Any]:
+        """
+        Blue/green rebuild of every memory collection behind its alias (see gravrag_aliases.rebuild_collections),
+        re-embedding all content with the SentenceTransformer `model_name` when given. Recalls and writes keep
+        being served from the live collections and are caught up from the write log; writes wait briefly while
+        the aliases swap, the encoder switches to the new model together with the swap, and the memory graph of
+        a re-embedded collection is recomputed before it goes live. Graph repair, demotion, consolidation,
+        purges and imports are refused while a rebuild runs.
+        """
+        job = job or self.start_rebuild(model_name)
+        loop = asyncio.get_running_loop()
+        new_model, encode, dim = None, None, None
+        if job.model:
+            new_model = await asyncio.to_thread(SentenceTransformer, job.model)
+            encode = lambda texts: new_model.encode(texts, batch_size=batch_size)
+            dim = new_model.get_sentence_embedding_dimension()
+
+        def before_swap(targets: Dict[str, str]):
+            if encode is not None and self.graph_k:
+                job.status = "repairing_graph"
+                gravrag_graph.repair_graph(self.qdrant_client, targets[self.collection_name], self.graph_k,
+                                           gravrag_graph.DEFAULT_BATCH_SIZE, True, self.layout)
+
+        def on_swap():
+            if new_model is not None:
+                self.model = new_model
+                # Writes, and so subscribes and publishes, are held back until the registry is re-encoded
+                asyncio.run_coroutine_threadsafe(self._reencode_subscriptions(new_model), loop).result()
+                self.working_memory.clear()  # Its vectors came from the old model
+                if not gravrag_packing.TOKENIZER_NAME:
+                    self.token_counter = gravrag_packing.configured_token_counter(new_model)
+
+        return await asyncio.to_thread(
+            gravrag_aliases.rebuild_collections, self.qdrant_client, job.aliases, self.layout, job, encode, dim,
+            batch_size, keep_previous, self.write_log, self.write_gate, before_swap, on_swap
+        )
+
+    async def demote_memories(self, spacetime_threshold: float = gravrag_tiers.DEFAULT_SPACETIME_THRESHOLD,
+                              min_age_seconds: float = gravrag_tiers.DEFAULT_MIN_AGE_SECONDS) -> Dict[str, Any]:
+        """
+        Move decayed memories from the hot tier to the cold tier (see gravrag_tiers.demote_memories).
+        """
+        if not self.tiering:
+            raise ValueError("Tiering is disabled; set GRAVRAG_TIERING=1 to enable the cold tier")
+        self.ensure_not_rebuilding("demote memories")
+        result = await asyncio.to_thread(
+            gravrag_tiers.demote_memories, self.qdrant_client, self.collection_name, self.cold_collection_name,
+            self.layout, spacetime_threshold, min_age_seconds
+        )
+        MEMORIES_TOTAL.labels(event="demoted").inc(result["demoted"])
+        return result
+
+    async def run_tier_mover(self, interval_seconds: float = gravrag_tiers.DEFAULT_INTERVAL_SECONDS):
+        """
+        Background loop demoting decayed memories every `interval_seconds` until cancelled.
+        """
+        while True:
+            if self.rebuild_job is not None and self.rebuild_job.running:
+                await asyncio.sleep(interval_seconds)
+                continue
+            try:
+                result = await self.demote_memories()
+                if result["demoted"]:
+                    logger.info(f"Tier mover demoted {result['demoted']} of {result['scanned']} scanned memories.")
+            except Exception as e:
+                logger.error(f"Tier mover failed: {str(e)}", exc_info=True)
+            await asyncio.sleep(interval_seconds)
+
+    async def repair_graph(self, full: bool = False) -> Dict[str, Any]:
+        """
+        Rebuild missing, short or stale neighbour lists of the memory graph (see gravrag_graph.repair_graph).
+        """
+        self.ensure_not_rebuilding("repair the memory graph")
+        unlinked = self.unlinked_memories
+        result = await asyncio.to_thread(
+            gravrag_graph.repair_graph, self.qdrant_client, self.collection_name, self.graph_k or gravrag_graph.DEFAULT_K,
+            gravrag_graph.DEFAULT_BATCH_SIZE, full, self.layout
+        )
+        self.unlinked_memories = max(self.unlinked_memories - unlinked, 0)  # Those created during the scan may be missed
+        return result
+
+    async def run_graph_repairer(self, interval_seconds: float = gravrag_graph.REPAIR_INTERVAL_SECONDS):
+        """
+        Background loop linking new memories into the graph every `interval_seconds` until cancelled, for
+        when insert-time maintenance is off. After the first pass, passes run only once memories were created.
+        """
+        first = True
+        while True:
+            rebuilding = self.rebuild_job is not None and self.rebuild_job.running
+            if (first or self.unlinked_memories) and not rebuilding:
+                try:
+                    result = await self.repair_graph()
+                    first = False
+                    if result["repaired"]:
+                        logger.info(f"Graph repairer linked {result['repaired']} of {result['scanned']} scanned memories.")
+                except Exception as e:
+                    logger.error(f"Graph repairer failed: {str(e)}", exc_info=True)
+            await asyncio.sleep(interval_seconds)
+
+    def _score_nodes(self, nodes: List[Tuple[Any, Optional[str]]], path_scores: np.ndarray, origin_vector: List[float],
+                     reference_tags: List[str]) -> Tuple[List[MemoryPacket], np.ndarray]:
+        """
+        Gravity re-rank graph nodes, (point, tier) pairs, against the traversal origin and weight them by
+        their path scores.
+        """
+        memories = [MemoryPacket.from_payload(point.payload, point.id, tier) for point, tier in nodes]
+        if not memories:
+            return memories, np.zeros(0)
+        self._rerank([memories], [origin_vector], [reference_tags])
+        gravity = np.array([
+            memory.metadata["semantic_relativity"] * memory.metadata["memetic_similarity"]
+            * memory.metadata["gravitational_pull"]
+            for memory in memories
+        ])
+        return memories, path_scores * gravity
+
+    async def traverse_memories(self, point_id: Any = None, query_content: Optional[str] = None, hops: int = 2,
+                                beam_width: int = 8, top_k: int = 10, tags: Optional[List[str]] = None):
+        """
+        Multi-hop associative recall over the stored kNN graph in one call. Starting from a memory (`point_id`)
+        or from the best matches of `query_content`, each hop follows stored neighbour edges, scores every newly
+        reached memory by path strength (product of edge similarities) times its gravity score against the
+        origin, and keeps the `beam_width` best as the next frontier. Each hop costs one Qdrant retrieve and no
+        vector search. Returns the `top_k` best memories reached, with the hop and path that reached them.
+        With tiering on, demoted memories are reached too: query seeds come from the tiered search, neighbours
+        missing from the hot tier are looked up in the cold one, and a demoted source memory, which keeps no
+        edges, starts from its nearest hot memories. Raises KeyError when `point_id` does not exist.
+        """
+        tags = normalize_tags(tags)
+        if point_id is not None:
+            with stage_timer("qdrant_retrieve"):
+                seed_nodes = self._retrieve_tiered([point_id])
+            if not seed_nodes:
+                raise KeyError(f"Memory not found: {point_id}")
+            seed, tier = seed_nodes[0]
+            origin_vector = seed.payload["vector"]
+            tags = tags or normalize_tags(seed.payload.get("metadata", {}).get("tags"))
+            seed_scores = np.ones(1)
+            if tier == gravrag_tiers.COLD:
+                k = self.graph_k or gravrag_graph.DEFAULT_K
+                with stage_timer("qdrant_search"):
+                    hits = self.layout.run_batch(self.qdrant_client, self.collection_name, [
+                        self.layout.search_request(origin_vector, None, k, with_payload=False)
+                    ])[0]
+                seed.payload.update(gravrag_graph.neighbor_payload(hits, k, seed.id))
+        else:
+            if not (query_content or "").strip():
+                raise ValueError("Either a point_id or a query is required")
+            with stage_timer("encode"):
+                origin_vector = (await self._encode(query_content)).tolist()
+            with stage_timer("qdrant_search"):
+                seed_nodes = self._run_tiered_searches([self._search_requests(origin_vector, beam_width, tags)],
+                                                       [beam_width])[0]
+            seed_scores = np.array([max(float(hit.score), 0.0) for hit, _ in seed_nodes])
+
+        seeds = [seed for seed, _ in seed_nodes]
+        payloads = {seed.id: seed.payload for seed in seeds}
+        frontier = [(seed.id, float(score), [seed.id]) for seed, score in zip(seeds, seed_scores)]
+        visited = set(payloads)
+        results: Dict[Any, Tuple[MemoryPacket, int, List[Any], float]] = {}
+        if point_id is None:  # Query seeds are results too; a source memory is not
+            with stage_timer("rerank"):
+                memories, scores = self._score_nodes(seed_nodes, seed_scores, origin_vector, tags)
+            for memory, score, (_, _, path) in zip(memories, scores, frontier):
+                results[memory.point_id] = (memory, 0, path, float(score))
+
+        for hop in range(1, hops + 1):
+            candidates = gravrag_graph.beam_step(frontier, payloads, visited)
+            if not candidates:
+                break
+            visited.update(candidates)
+            with stage_timer("qdrant_retrieve"):
+                nodes = self._retrieve_tiered(list(candidates))
+            nodes = [(point, tier) for point, tier in nodes if (point.payload or {}).get("vector")]
+            if not nodes:
+                break
+            points = [point for point, _ in nodes]
+            path_scores = np.array([candidates[point.id][0] for point in points])
+            with stage_timer("rerank"):
+                memories, scores = self._score_nodes(nodes, path_scores, origin_vector, tags)
+
+            for point, memory, score in zip(points, memories, scores):
+                payloads[point.id] = point.payload
+                results[point.id] = (memory, hop, candidates[point.id][1], float(score))
+            frontier = [
+                (points[row].id, float(path_scores[row]), candidates[points[row].id][1])
+                for row in gravrag_graph.top_beam(scores, beam_width)
+            ]
+
+        ranked = sorted(results.values(), key=lambda item: item[3], reverse=True)[:top_k]
+        formatted = self._format_results([memory for memory, _, _, _ in ranked], top_k)
+        for item, (_, hop, path, score) in zip(formatted, ranked):
+            item.update({"hop": hop, "path": [str(node) for node in path], "score": score})
+        return formatted
+
     async def recall_memory_with_metadata(self, query_content: str, search_metadata: Dict[str, Any], top_k: int = 10):
         """
         Recall memories based on query content, and further filter by matching metadata.
         """
         try:
             # Step 1: Vector search for the top K most relevant memories based on semantic similarity
-            query_vector = self.model.encode(query_content).tolist()
-            results = self.qdrant_client.search(
-                collection_name=self.collection_name,
-                query_vector=query_vector,
-                limit=top_k
-            )
+            with stage_timer("encode"):
+                query_vector = (await self._encode(query_content)).tolist()
+            with stage_timer("qdrant_search"):
+                results = self._run_tiered_searches([self._search_requests(query_vector, top_k)], [top_k])[0]
 
             # Step 2: Recreate MemoryPacket objects from the search results
-            memories = [MemoryPacket.from_payload(hit.payload) for hit in results]
+            memories = [MemoryPacket.from_payload(hit.payload, hit.id, tier) for hit, tier in results]
 
             # Step 3: Filter the top K results based on metadata
             matching_memories = []
@@ -248,10 +1279,9 @@ class MemoryManager:
 
                 # Check if all search metadata keys/values match the memory metadata
                 if all(memory_metadata.get(key) == value for key, value in search_metadata.items()):
-                    matching_memories.append({
-                        "content": memory.content,
-                        "metadata": memory_metadata
-                    })
+                    matching_memories.append(memory)
+            self._hydrate_contents(matching_memories)
+            matching_memories = [{"content": memory.content, "metadata": memory.metadata} for memory in matching_memories]
 
             if not matching_memories:
                 return {"message": "No matching memories found"}
@@ -263,37 +1293,82 @@ class MemoryManager:
             raise e
 
 
-    async def delete_memories_by_metadata(self, metadata: Dict[str, Any]):
+    def _matching_filter(self, metadata: Dict[str, Any]) -> Filter:
+        """ Server-side filter for memories whose metadata matches `metadata` (see _metadata_conditions). """
+        if not metadata:
+            raise ValueError("A metadata filter is required")
+        return Filter(must=self._metadata_conditions(metadata))
+
+    def _count_matching(self, query_filter: Filter) -> int:
+        return sum(
+            self.qdrant_client.count(alias, count_filter=query_filter, exact=True).count for alias in self._tier_aliases()
+        )
+
+    def _log_matching(self, query_filter: Filter):
+        """ Record the memories matching `query_filter` in the write log while a rebuild runs. """
+        if not self.write_log.active:
+            return
+        for alias in self._tier_aliases():
+            offset = None
+            while True:
+                points, offset = self.qdrant_client.scroll(
+                    alias, scroll_filter=query_filter, limit=gravrag_aliases.DEFAULT_BATCH_SIZE, offset=offset,
+                    with_payload=False, with_vectors=False
+                )
+                self.write_log.record(alias, [point.id for point in points])
+                if offset is None:
+                    break
+
+    async def update_metadata(self, metadata: Dict[str, Any], patch: Dict[str, Any]) -> int:
         """
-        Delete memories where the metadata matches the given metadata criteria.
+        Merge `patch` into the metadata of every memory matching `metadata`, in place with a filtered Qdrant
+        set_payload per collection: no vectors are touched and nothing is re-encoded. Returns how many memories
+        matched. Matching memories leave the working memory so their next recall reads the patched metadata.
         """
-        try:
-            # Scroll through all memories in the collection
-            scroll_result = self.qdrant_client.scroll(self.collection_name, limit=1000)
+        if not patch:
+            raise ValueError("The metadata patch is empty")
+        patch = dict(patch)
+        if "tags" in patch:
+            patch["tags"] = normalize_tags(patch["tags"])
+        if "timestamp" in patch:
+            patch["timestamp"] = normalize_timestamp(patch["timestamp"])
+        query_filter = self._matching_filter(metadata)
+        with stage_timer("qdrant_update"):
+            updated = self._count_matching(query_filter)
+            if updated:
+                async with self._writing():
+                    self._log_matching(query_filter)
+                    for alias in self._tier_aliases():
+                        self.qdrant_client.set_payload(
+                            collection_name=alias, payload=patch, points=query_filter, key="metadata", wait=True
+                        )
+        self.working_memory.discard_matching(metadata)
+        if updated:
+            self.stats.invalidate()
+        MEMORIES_TOTAL.labels(event="updated").inc(updated)
+        logger.info(f"Updated the metadata of {updated} memories matching {metadata}.")
+        return updated
 
-            # Check if result is a list of points, otherwise handle it as a tuple
-            if isinstance(scroll_result, tuple):
-                points = scroll_result[0]
-            else:
-                points = scroll_result
-            
-            # List to store the IDs of memories to be deleted
-            memories_to_delete = []
-            
-            for point in points:
-                if isinstance(point, dict) and 'payload' in point:
-                    point_metadata = point['payload']['metadata']
-                    
-                    # Check if the point's metadata matches the provided metadata
-                    if all(point_metadata.get(key) == value for key, value in metadata.items()):
-                        memories_to_delete.append(point["id"])
-            
-            # Delete the memories that match the metadata criteria
-            if memories_to_delete:
-                self.qdrant_client.delete(self.collection_name, points_selector=memories_to_delete)
-                logger.info(f"Deleted {len(memories_to_delete)} memories matching the metadata.")
+    async def delete_memories_by_metadata(self, metadata: Dict[str, Any]) -> int:
+        """
+        Delete memories where the metadata matches the given metadata criteria, with a filtered Qdrant delete
+        per collection. Returns how many memories were deleted.
+        """
+        try:
+            query_filter = self._matching_filter(metadata)
+            deleted = self._count_matching(query_filter)
+            if deleted:
+                async with self._writing():
+                    self._log_matching(query_filter)
+                    for alias in self._tier_aliases():
+                        self.qdrant_client.delete(alias, points_selector=FilterSelector(filter=query_filter), wait=True)
+                self.working_memory.discard_matching(metadata)
+                self.stats.invalidate()
+                MEMORIES_TOTAL.labels(event="deleted").inc(deleted)
+                logger.info(f"Deleted {deleted} memories matching the metadata.")
             else:
                 logger.info("No memories found matching the specified metadata.")
+            return deleted
         except Exception as e:
             logger.error(f"Error deleting memories by metadata: {str(e)}")
-            raise e
\ No newline at end of file
+            raise e
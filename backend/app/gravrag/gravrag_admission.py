@@ -0,0 +1,102 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Optional
+
+from fastapi import HTTPException
+from prometheus_client import Counter
+
+from gravrag.gravrag_metrics import POOL_QUEUE_DEPTH
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_REJECTED = Counter(
+    "gravrag_admission_rejected_total",
+    "Requests turned away by admission control, by pool and reason (queue_full, queue_timeout).",
+    ["pool", "reason"],
+)
+
+
+class AdmissionController:
+    """
+    Concurrency limiter for one class of GravRAG work, used as a FastAPI router dependency.
+
+    Up to `max_concurrency` requests run at once and up to `max_queue` more wait for a slot.
+    A request arriving to a full queue is rejected immediately with 429; one that waits longer
+    than `queue_timeout` seconds is rejected with 503. Both carry a Retry-After header, so a burst
+    degrades into fast, retryable rejections instead of every request timing out.
+    """
+
+    def __init__(self, pool: str, max_concurrency: int, max_queue: int, queue_timeout: float, retry_after: int = 1):
+        self.pool = pool
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.active = 0
+        self.waiting = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._active_gauge = POOL_QUEUE_DEPTH.labels(pool=pool)
+        self._waiting_gauge = POOL_QUEUE_DEPTH.labels(pool=f"{pool}_queued")
+
+    def _reject(self, status_code: int, reason: str, detail: str):
+        ADMISSION_REJECTED.labels(pool=self.pool, reason=reason).inc()
+        logger.warning(f"Admission '{self.pool}' rejected a request ({reason}): {self.active} active, {self.waiting} queued.")
+        raise HTTPException(status_code=status_code, detail=detail, headers={"Retry-After": str(self.retry_after)})
+
+    async def __call__(self):
+        # Created on first use so the semaphore binds to the serving event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        if self._semaphore.locked():
+            if self.waiting >= self.max_queue:
+                self._reject(429, "queue_full", f"Too many {self.pool} requests queued, retry shortly.")
+            self.waiting += 1
+            self._waiting_gauge.inc()
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._reject(503, "queue_timeout", f"Timed out after {time.perf_counter() - start:.1f}s waiting for a {self.pool} slot.")
+            finally:
+                self.waiting -= 1
+                self._waiting_gauge.dec()
+        else:
+            await self._semaphore.acquire()
+
+        self.active += 1
+        self._active_gauge.inc()
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._active_gauge.dec()
+            self._semaphore.release()
+
+
+# Writes pay for encoding and upserts; keep them from starving cheap recalls
+ingest_admission = AdmissionController(
+    "ingest",
+    max_concurrency=int(os.getenv("GRAVRAG_INGEST_CONCURRENCY", 4)),
+    max_queue=int(os.getenv("GRAVRAG_INGEST_QUEUE", 32)),
+    queue_timeout=float(os.getenv("GRAVRAG_QUEUE_TIMEOUT", 5.0)),
+    retry_after=int(os.getenv("GRAVRAG_RETRY_AFTER", 1)),
+)
+recall_admission = AdmissionController(
+    "recall",
+    max_concurrency=int(os.getenv("GRAVRAG_RECALL_CONCURRENCY", 16)),
+    max_queue=int(os.getenv("GRAVRAG_RECALL_QUEUE", 128)),
+    queue_timeout=float(os.getenv("GRAVRAG_QUEUE_TIMEOUT", 5.0)),
+    retry_after=int(os.getenv("GRAVRAG_RETRY_AFTER", 1)),
+)
+# Imports, exports, rebuilds and other maintenance run for minutes; give them their own slots so they
+# never hold ingest slots, and turn extra ones away at once rather than queueing them
+admin_admission = AdmissionController(
+    "admin",
+    max_concurrency=int(os.getenv("GRAVRAG_ADMIN_CONCURRENCY", 2)),
+    max_queue=int(os.getenv("GRAVRAG_ADMIN_QUEUE", 0)),
+    queue_timeout=float(os.getenv("GRAVRAG_QUEUE_TIMEOUT", 5.0)),
+    retry_after=int(os.getenv("GRAVRAG_ADMIN_RETRY_AFTER", 30)),
+)
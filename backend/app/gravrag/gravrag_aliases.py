@@ -0,0 +1,421 @@
+import time
+import logging
+import threading
+import contextlib
+from typing import List, Dict, Any, Optional, Callable, Set
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    CreateAlias, CreateAliasOperation, DeleteAlias, DeleteAliasOperation, HnswConfigDiff, OptimizersConfigDiff,
+    WalConfigDiff, Filter, FieldCondition, Range, HasIdCondition, PointStruct, PointIdsList
+)
+
+from gravrag.gravrag_projection import VectorLayout
+from gravrag.gravrag_graph import NEIGHBORS_FIELD, NEIGHBOR_SCORES_FIELD
+from gravrag.gravrag_content import full_content
+
+logger = logging.getLogger(__name__)
+
+GENERATION_SEPARATOR = "__"  # Physical collections are named "<alias>__<generation>"
+DEFAULT_BATCH_SIZE = 256
+MAX_CATCH_UP_ROUNDS = 5
+WATERMARK_SKEW_SECONDS = 5.0  # Watermark margin for clock skew between writers and the rebuild
+
+
+def physical_name(qdrant_client: QdrantClient, name: str) -> Optional[str]:
+    """ The collection behind `name`: the alias target, `name` itself for a plain collection, or None. """
+    aliases = {alias.alias_name: alias.collection_name for alias in qdrant_client.get_aliases().aliases}
+    if name in aliases:
+        return aliases[name]
+    return name if qdrant_client.collection_exists(name) else None
+
+
+def generation_name(alias: str) -> str:
+    return f"{alias}{GENERATION_SEPARATOR}{time.strftime('%Y%m%d%H%M%S')}{int(time.time() * 1000) % 1000:03d}"
+
+
+def create_aliased(qdrant_client: QdrantClient, alias: str, **create_options) -> str:
+    """ Create a new generation collection and point `alias` at it, so it can later be swapped out without downtime. """
+    collection_name = generation_name(alias)
+    qdrant_client.create_collection(collection_name=collection_name, **create_options)
+    qdrant_client.update_collection_aliases(change_aliases_operations=[
+        CreateAliasOperation(create_alias=CreateAlias(collection_name=collection_name, alias_name=alias))
+    ])
+    return collection_name
+
+
+def clone_collection(qdrant_client: QdrantClient, source: str, target: str, dim: Optional[int] = None):
+    """
+    Create an empty `target` with the vector, HNSW, quantization and storage settings and the payload indexes
+    of `source`. `dim` changes the size of a single unnamed vector (re-embedding with another model).
+    """
+    info = qdrant_client.get_collection(source)
+    params = info.config.params
+    vectors_config = params.vectors
+    if dim is not None:
+        if isinstance(vectors_config, dict):
+            raise ValueError(f"Collection '{source}' has named vectors; re-embedding it to another size is not supported")
+        vectors_config = vectors_config.model_copy(update={"size": dim})
+    qdrant_client.create_collection(
+        collection_name=target,
+        vectors_config=vectors_config,
+        on_disk_payload=params.on_disk_payload,
+        hnsw_config=HnswConfigDiff(**info.config.hnsw_config.model_dump()) if info.config.hnsw_config else None,
+        optimizers_config=OptimizersConfigDiff(**info.config.optimizer_config.model_dump())
+        if info.config.optimizer_config else None,
+        wal_config=WalConfigDiff(**info.config.wal_config.model_dump()) if info.config.wal_config else None,
+        quantization_config=info.config.quantization_config
+    )
+    for field_name, field_info in (info.payload_schema or {}).items():
+        qdrant_client.create_payload_index(collection_name=target, field_name=field_name, field_schema=field_info.data_type)
+
+
+def swap_aliases(qdrant_client: QdrantClient, targets: Dict[str, str]) -> Dict[str, Optional[str]]:
+    """
+    Point every alias in `targets` at its new collection in one atomic alias update and return the collections
+    they pointed at before. A plain collection still carrying an alias's name (created before aliases were used)
+    has to be dropped first, so readers briefly see no collection during that one-time migration.
+    """
+    previous = {alias: physical_name(qdrant_client, alias) for alias in targets}
+    aliases = {alias.alias_name for alias in qdrant_client.get_aliases().aliases}
+    operations = []
+    for alias, collection_name in targets.items():
+        if alias in aliases:
+            operations.append(DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias)))
+        elif previous[alias] is not None:
+            logger.warning(f"Replacing plain collection '{alias}' with an alias; it is unavailable until the swap.")
+            qdrant_client.delete_collection(alias)
+            previous[alias] = None
+        operations.append(CreateAliasOperation(create_alias=CreateAlias(collection_name=collection_name, alias_name=alias)))
+    qdrant_client.update_collection_aliases(change_aliases_operations=operations)
+    return previous
+
+
+class RebuildJob:
+    """ Progress of a blue/green rebuild, readable while it runs. """
+
+    def __init__(self, aliases: List[str], model: Optional[str] = None):
+        self.aliases = aliases
+        self.model = model
+        self.status = "pending"  # pending, copying, catching_up, repairing_graph, swapping, completed, failed
+        self.targets: Dict[str, str] = {}
+        self.total = 0
+        self.copied = 0
+        self.caught_up = 0
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @property
+    def running(self) -> bool:
+        return self.status not in ("completed", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        rate = self.copied / elapsed if elapsed > 0 else 0.0
+        remaining = max(self.total - self.copied, 0)
+        return {
+            "status": self.status,
+            "aliases": self.aliases,
+            "targets": self.targets,
+            "model": self.model,
+            "total": self.total,
+            "copied": self.copied,
+            "caught_up": self.caught_up,
+            "progress": round(self.copied / self.total, 4) if self.total else None,
+            "points_per_second": round(rate, 1),
+            "eta_seconds": round(remaining / rate, 1) if rate > 0 and self.running else None,
+            "elapsed_seconds": round(elapsed, 3),
+            "error": self.error,
+        }
+
+
+class WriteLog:
+    """
+    IDs of the points written or deleted through this process while a rebuild runs, per alias, so catch-up
+    copies only those instead of comparing whole collections. Recording is a no-op while no rebuild runs.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids: Optional[Dict[str, Set[Any]]] = None
+
+    @property
+    def active(self) -> bool:
+        return self._ids is not None
+
+    def start(self, aliases: List[str]):
+        with self._lock:
+            self._ids = {alias: set() for alias in aliases}
+
+    def stop(self):
+        with self._lock:
+            self._ids = None
+
+    def record(self, alias: str, point_ids: List[Any]):
+        with self._lock:
+            if self._ids is not None and alias in self._ids:
+                self._ids[alias].update(point_ids)
+
+    def drain(self, alias: str) -> Set[Any]:
+        """ The IDs recorded for `alias` since the last drain. """
+        with self._lock:
+            if self._ids is None:
+                return set()
+            drained, self._ids[alias] = self._ids[alias], set()
+            return drained
+
+
+class WriteGate:
+    """
+    Lets writes through concurrently until closed: close() waits for the writes in flight and holds new ones
+    back until open(). A rebuild closes it across its last catch-up and the alias swap, so no write lands in
+    the new generation encoded with the old model or is left behind in the old generation.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._writers = 0
+        self._closed = False
+
+    def enter(self, blocking: bool = True) -> bool:
+        with self._condition:
+            if self._closed and not blocking:
+                return False
+            while self._closed:
+                self._condition.wait()
+            self._writers += 1
+            return True
+
+    def leave(self):
+        with self._condition:
+            self._writers -= 1
+            self._condition.notify_all()
+
+    @contextlib.contextmanager
+    def write(self):
+        self.enter()
+        try:
+            yield
+        finally:
+            self.leave()
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            while self._writers:
+                self._condition.wait()
+
+    def open(self):
+        with self._condition:
+            self._closed = False
+            self._condition.notify_all()
+
+
+def copy_points(qdrant_client: QdrantClient, source: str, target: str, layout: VectorLayout,
+                encode: Optional[Callable[[List[str]], np.ndarray]] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                ids: Optional[List[Any]] = None, on_batch: Optional[Callable[[int], None]] = None) -> int:
+    """
+    Stream points (all, or only `ids`) from `source` into `target` page by page. With `encode`, each page's
+    content is re-embedded in one batch and the new vector replaces the stored one; the old neighbour lists are
+    dropped since their similarities no longer apply. Returns the number of points written.
+    """
+    scroll_filter = Filter(must=[HasIdCondition(has_id=list(ids))]) if ids is not None else None
+    copied, offset = 0, None
+    while True:
+        points, offset = qdrant_client.scroll(
+            collection_name=source, scroll_filter=scroll_filter, limit=batch_size, offset=offset,
+            with_payload=True, with_vectors=False
+        )
+        points = [point for point in points if (point.payload or {}).get("vector")]
+        if points:
+            payloads = [dict(point.payload) for point in points]
+            if encode is not None:
+                vectors = np.asarray(encode([full_content(payload) for payload in payloads]), dtype=np.float32)
+                for payload, vector in zip(payloads, vectors):
+                    payload["vector"] = vector.tolist()
+                    payload.pop(NEIGHBORS_FIELD, None)
+                    payload.pop(NEIGHBOR_SCORES_FIELD, None)
+            else:
+                vectors = np.asarray([payload["vector"] for payload in payloads], dtype=np.float32)
+            qdrant_client.upsert(collection_name=target, wait=True, points=[
+                PointStruct(id=point.id, vector=vector, payload=payload)
+                for point, vector, payload in zip(points, layout.point_vectors(vectors), payloads)
+            ])
+            copied += len(points)
+            if on_batch is not None:
+                on_batch(len(points))
+        if offset is None:
+            return copied
+
+
+def _created_since(qdrant_client: QdrantClient, collection_name: str, since: float,
+                   batch_size: int = DEFAULT_BATCH_SIZE) -> Set[Any]:
+    """ IDs of the points whose metadata timestamp is at or after `since`, read from the timestamp index. """
+    scroll_filter = Filter(must=[FieldCondition(key="metadata.timestamp", range=Range(gte=since))])
+    ids, offset = set(), None
+    while True:
+        points, offset = qdrant_client.scroll(
+            collection_name=collection_name, scroll_filter=scroll_filter, limit=batch_size, offset=offset,
+            with_payload=False, with_vectors=False
+        )
+        ids.update(point.id for point in points)
+        if offset is None:
+            return ids
+
+
+def catch_up(qdrant_client: QdrantClient, source: str, target: str, layout: VectorLayout, point_ids: Set[Any],
+             encode: Optional[Callable[[List[str]], np.ndarray]] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+             keep_existing: bool = False) -> int:
+    """
+    Bring `target` level with the writes `source` took since the copy started: `point_ids` (from a WriteLog
+    or a creation-time watermark) are copied again when still in `source` and deleted from `target` otherwise.
+    `keep_existing` skips points already in `target` and never deletes, for a pass made after the swap, when
+    `target` takes writes of its own. Costs one retrieve per `batch_size` IDs; nothing is scanned in full.
+    Returns the number of points changed.
+    """
+    def existing(collection_name: str, point_ids: List[Any]) -> Set[Any]:
+        return {point.id for point in qdrant_client.retrieve(
+            collection_name=collection_name, ids=point_ids, with_payload=False, with_vectors=False
+        )} if point_ids else set()
+
+    ids = list(point_ids)
+    changed = 0
+    for start in range(0, len(ids), batch_size):
+        chunk = ids[start:start + batch_size]
+        present = existing(source, chunk)
+        if keep_existing:
+            present -= existing(target, list(present))
+        if present:
+            changed += copy_points(qdrant_client, source, target, layout, encode, batch_size, list(present))
+        if keep_existing:
+            continue
+        gone = list(existing(target, [point_id for point_id in chunk if point_id not in present]))
+        if gone:
+            qdrant_client.delete(collection_name=target, points_selector=PointIdsList(points=gone))
+            changed += len(gone)
+    return changed
+
+
+def rebuild_collections(qdrant_client: QdrantClient, aliases: List[str], layout: VectorLayout,
+                        job: RebuildJob, encode: Optional[Callable[[List[str]], np.ndarray]] = None,
+                        dim: Optional[int] = None, batch_size: int = DEFAULT_BATCH_SIZE, keep_previous: bool = False,
+                        write_log: Optional[WriteLog] = None, write_gate: Optional[WriteGate] = None,
+                        before_swap: Optional[Callable[[Dict[str, str]], None]] = None,
+                        on_swap: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    """
+    Blue/green rebuild of the collections behind `aliases` while they keep serving reads and writes.
+
+    Each live collection is streamed into a new shadow generation (re-embedded with `encode` into `dim`
+    dimensions when given), then caught up (see catch_up) from `write_log` and a creation-time watermark until
+    a round finds fewer than `batch_size` changes. `before_swap` runs on the finished shadows. `write_gate` is
+    then closed for one last round, the atomic alias swap and `on_swap` (e.g. to switch the query encoder), so
+    every write lands either before the last round or in the new generation with the new model. Points other
+    processes created in the old generations after that round are copied once more before the old generations
+    are dropped (unless `keep_previous`); their updates and deletes are only caught by writers sharing
+    `write_log`.
+    """
+    write_log = write_log if write_log is not None else WriteLog()
+    write_gate = write_gate if write_gate is not None else WriteGate()
+    sources = {}
+    try:
+        for alias in aliases:
+            source = physical_name(qdrant_client, alias)
+            if source is None:
+                raise ValueError(f"Collection '{alias}' does not exist")
+            sources[alias] = source
+            job.targets[alias] = generation_name(alias)
+            job.total += qdrant_client.count(source, exact=True).count
+
+        def count_copied(count: int):
+            job.copied += count
+
+        write_gate.close()  # Writes already in flight finish before the log starts, so none goes unrecorded
+        write_log.start(aliases)
+        write_gate.open()
+        watermark = time.time() - WATERMARK_SKEW_SECONDS
+        job.status = "copying"
+        for alias, source in sources.items():
+            clone_collection(qdrant_client, source, job.targets[alias], dim)
+            copy_points(qdrant_client, source, job.targets[alias], layout, encode, batch_size, on_batch=count_copied)
+            logger.info(f"Rebuild: copied '{source}' into '{job.targets[alias]}' ({job.copied}/{job.total}).")
+
+        # Creates found through the watermark, copied once: the skew margin would otherwise repeat them each round
+        created: Dict[str, Set[Any]] = {alias: set() for alias in aliases}
+
+        def new_creates(alias: str, source: str) -> Set[Any]:
+            ids = _created_since(qdrant_client, source, watermark, batch_size) - created[alias]
+            created[alias] |= ids
+            return ids
+
+        def catch_up_round() -> int:
+            nonlocal watermark
+            round_started = time.time() - WATERMARK_SKEW_SECONDS
+            changed = sum(
+                catch_up(qdrant_client, source, job.targets[alias], layout,
+                         write_log.drain(alias) | new_creates(alias, source), encode, batch_size)
+                for alias, source in sources.items()
+            )
+            watermark = round_started
+            job.caught_up += changed
+            return changed
+
+        job.status = "catching_up"
+        for _ in range(MAX_CATCH_UP_ROUNDS):
+            if catch_up_round() < batch_size:
+                break
+
+        if before_swap is not None:
+            before_swap(job.targets)
+
+        job.status = "swapping"
+        write_gate.close()
+        try:
+            catch_up_round()
+            write_log.stop()
+            previous = swap_aliases(qdrant_client, job.targets)
+            if on_swap is not None:
+                on_swap()
+        finally:
+            write_gate.open()
+        for alias, old in previous.items():
+            if old is None:
+                continue
+            job.caught_up += catch_up(
+                qdrant_client, old, job.targets[alias], layout, new_creates(alias, old), encode, batch_size,
+                keep_existing=True
+            )
+            if not keep_previous:
+                qdrant_client.delete_collection(old)
+
+        job.status = "completed"
+        job.finished_at = time.time()
+        logger.info(f"Rebuild completed: {job.to_dict()}")
+        return {**job.to_dict(), "previous": previous}
+    except Exception as e:
+        job.status = "failed"
+        job.error = str(e)
+        job.finished_at = time.time()
+        raise
+    finally:
+        write_log.stop()
+
+
+def replace_with_empty(qdrant_client: QdrantClient, aliases: List[str]) -> Dict[str, Optional[str]]:
+    """
+    Point each alias at a fresh, empty clone of its collection in one atomic swap and drop the old generations,
+    so a purge never leaves readers without a collection.
+    """
+    targets = {}
+    for alias in aliases:
+        source = physical_name(qdrant_client, alias)
+        if source is None:
+            continue
+        targets[alias] = generation_name(alias)
+        clone_collection(qdrant_client, source, targets[alias])
+    previous = swap_aliases(qdrant_client, targets)
+    for old in previous.values():
+        if old is not None:
+            qdrant_client.delete_collection(old)
+    return previous
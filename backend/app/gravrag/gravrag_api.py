@@ -1,20 +1,133 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Dict, Any, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Dict, Any, List, Optional, Union
+import os
+import json
+import asyncio
 import logging
-from gravrag.gravrag import MemoryManager
+import threading
+from gravrag.gravrag import MemoryManager, TAG_MODES, ORDER_BY_MODES, normalize_timestamp
+from gravrag.gravrag_io import DEFAULT_BATCH_SIZE, DEFAULT_PARALLEL, resolve_export_path
+from gravrag import gravrag_browse, gravrag_consolidate, gravrag_graph, gravrag_tiers, gravrag_aliases, gravrag_subscriptions
+from gravrag.gravrag_metrics import stage_timer, track_endpoint
+from gravrag.gravrag_admission import admin_admission, ingest_admission, recall_admission
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(track_endpoint)])
 logger = logging.getLogger(__name__)
-memory_manager = MemoryManager()
+
+class LazyMemoryManager:
+    """
+    Stands in for the API's MemoryManager and builds it on first use, so importing this module neither loads
+    the embedding model nor connects to Qdrant. Assigning `memory_manager` before the first request serves
+    another manager instead, as the benchmark does.
+    """
+
+    def __init__(self, factory=MemoryManager):
+        self._factory = factory
+        self._manager = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if self._manager is None:
+            with self._lock:
+                if self._manager is None:
+                    self._manager = self._factory()
+        return getattr(self._manager, name)
+
+memory_manager = LazyMemoryManager()
+
+MAX_BATCH_QUERIES = 64  # Upper bound on queries per /recall_batch call
+MAX_TOP_K = 1000  # Upper bound on memories returned per query
+MAX_TRAVERSE_HOPS = 4
+MAX_BEAM_WIDTH = 64
+KEEPALIVE_SECONDS = 15  # Idle subscription streams send a keepalive this often
+tier_mover: Optional[asyncio.Task] = None
+graph_repairer: Optional[asyncio.Task] = None
+
+@router.on_event("startup")
+async def start_tier_mover():
+    """ Demote decayed memories to the cold tier in the background while tiering is on. """
+    global tier_mover
+    if memory_manager.tiering:
+        tier_mover = asyncio.create_task(memory_manager.run_tier_mover())
+
+@router.on_event("startup")
+async def start_graph_repairer():
+    """ Link new memories into the memory graph in the background while insert-time maintenance is off. """
+    global graph_repairer
+    if not memory_manager.graph_k and gravrag_graph.REPAIR_INTERVAL_SECONDS > 0:
+        graph_repairer = asyncio.create_task(memory_manager.run_graph_repairer())
+
+@router.on_event("shutdown")
+async def stop_tier_mover():
+    if tier_mover is not None:
+        tier_mover.cancel()
+    if graph_repairer is not None:
+        graph_repairer.cancel()
+
+def serialize_response(content: Dict[str, Any]) -> JSONResponse:
+    """ Encode a response body up front so its serialization time is recorded as a stage. """
+    with stage_timer("serialize"):
+        return JSONResponse(content=content)
 
 class MemoryRequest(BaseModel):
     content: str
     metadata: Optional[Dict[str, Any]] = None
 
 class RecallRequest(BaseModel):
+    query: Optional[str] = None  # May be omitted for a time window ordered by recency
+    top_k: int = Field(5, ge=1, le=MAX_TOP_K)
+    tags: Optional[List[str]] = None
+    tag_mode: Optional[str] = "boost"  # "boost" ranks tag overlap higher, "filter" requires it
+    since: Optional[Union[float, str]] = None  # Epoch seconds or ISO-8601
+    until: Optional[Union[float, str]] = None
+    order_by: Optional[str] = "relevance"  # "relevance" or "recency"
+    session_id: Optional[str] = None  # Search this session's (or objective's) working memory first
+    token_budget: Optional[int] = None  # Pack up to top_k diverse memories into a context of at most this many tokens
+    mmr_lambda: Optional[float] = None  # Packing trade-off: 1 ranks by gravity alone, 0 by diversity alone
+
+class RecallBatchRequest(BaseModel):
+    queries: List[RecallRequest]
+
+class RelatedRequest(BaseModel):
+    top_k: int = Field(5, ge=1, le=MAX_TOP_K)
+    positive_ids: Optional[List[Union[int, str]]] = None  # Extra "more like these" examples
+    negative_ids: Optional[List[Union[int, str]]] = None  # "Less like these" examples
+    tags: Optional[List[str]] = None
+    tag_mode: Optional[str] = "boost"
+    since: Optional[Union[float, str]] = None
+    until: Optional[Union[float, str]] = None
+    metadata: Optional[Dict[str, Any]] = None  # Exact-match filter on metadata keys
+    order_by: Optional[str] = "relevance"
+
+class TraverseRequest(BaseModel):
+    point_id: Optional[Union[int, str]] = None  # Start from this memory...
+    query: Optional[str] = None  # ...or from the best matches of a query
+    hops: Optional[int] = 2
+    beam_width: Optional[int] = 8
+    top_k: int = Field(10, ge=1, le=MAX_TOP_K)
+    tags: Optional[List[str]] = None
+
+class RepairGraphRequest(BaseModel):
+    full: Optional[bool] = False  # Recompute every neighbour list, not only missing or stale ones
+    background: Optional[bool] = True
+
+class DemoteRequest(BaseModel):
+    spacetime_threshold: Optional[float] = gravrag_tiers.DEFAULT_SPACETIME_THRESHOLD
+    min_age_seconds: Optional[float] = gravrag_tiers.DEFAULT_MIN_AGE_SECONDS
+    background: Optional[bool] = False
+
+class SubscriptionRequest(BaseModel):
     query: str
-    top_k: Optional[int] = 5
+    threshold: Optional[float] = gravrag_subscriptions.DEFAULT_THRESHOLD  # Minimum cosine similarity
+    tags: Optional[List[str]] = None  # Only memories sharing one of these tags
+
+class RebuildRequest(BaseModel):
+    model: Optional[str] = None  # SentenceTransformer model to re-embed with; vectors are copied as-is when omitted
+    batch_size: Optional[int] = gravrag_aliases.DEFAULT_BATCH_SIZE
+    keep_previous: Optional[bool] = False  # Keep the old generation for rollback instead of dropping it
+    background: Optional[bool] = True
 
 class PruneRequest(BaseModel):
     gravity_threshold: Optional[float] = 1e-5
@@ -22,12 +135,45 @@ class PruneRequest(BaseModel):
 class RecallWithMetadataRequest(BaseModel):
     query: str
     metadata: Dict[str, Any]
-    top_k: Optional[int] = 10
+    top_k: int = Field(10, ge=1, le=MAX_TOP_K)
 
 class DeleteByMetadataRequest(BaseModel):
     metadata: Dict[str, Any]
 
-@router.post("/create_memory")
+class ListMemoriesRequest(BaseModel):
+    cursor: Optional[str] = None  # next_cursor of the previous page; omit for the first page
+    limit: Optional[int] = gravrag_browse.DEFAULT_PAGE_SIZE  # Capped at GRAVRAG_MAX_PAGE_SIZE
+    metadata: Optional[Dict[str, Any]] = None
+    tags: Optional[List[str]] = None
+    since: Optional[Union[float, str]] = None
+    until: Optional[Union[float, str]] = None
+    fields: Optional[List[str]] = None  # content, preview, metadata, metadata.<key>, vector
+
+class UpdateMetadataRequest(BaseModel):
+    filter: Dict[str, Any]  # Exact-match metadata criteria; a list value requires each of its elements
+    patch: Dict[str, Any]  # Metadata keys to set on every matching memory
+
+class ConsolidateRequest(BaseModel):
+    objective_id: Optional[Union[int, str]] = None  # All objectives when omitted; matched with its JSON type
+    spacetime_threshold: Optional[float] = gravrag_consolidate.DEFAULT_SPACETIME_THRESHOLD
+    min_age_seconds: Optional[float] = gravrag_consolidate.DEFAULT_MIN_AGE_SECONDS
+    target_ratio: Optional[float] = gravrag_consolidate.DEFAULT_TARGET_RATIO
+    min_cluster_size: Optional[int] = 2
+    eval_queries: Optional[int] = 50
+    k: Optional[int] = 10
+    dry_run: Optional[bool] = True  # Report only; send false to write summaries and delete the merged memories
+
+class ExportRequest(BaseModel):
+    path: str  # Server-side Parquet file path
+    batch_size: Optional[int] = DEFAULT_BATCH_SIZE
+
+class ImportRequest(BaseModel):
+    path: str  # Server-side Parquet file path
+    batch_size: Optional[int] = DEFAULT_BATCH_SIZE
+    parallel: Optional[int] = DEFAULT_PARALLEL
+    bulk: Optional[bool] = False  # Suspend HNSW indexing until the import is done
+
+@router.post("/create_memory", dependencies=[Depends(ingest_admission)])
 async def create_memory(memory_request: MemoryRequest):
     if not memory_request.content.strip():
         logger.warning("Memory creation failed: Empty content.")
@@ -42,23 +188,352 @@ async def create_memory(memory_request: MemoryRequest):
         logger.error(f"Error during memory creation: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error creating memory: {str(e)}")
 
-@router.post("/recall_memory")
+def validate_packing(recall_request: RecallRequest):
+    """ Reject invalid token-budgeted recall options with a 400. """
+    if recall_request.token_budget is not None and recall_request.token_budget < 1:
+        raise HTTPException(status_code=400, detail="token_budget must be positive.")
+    if recall_request.token_budget is not None and not (recall_request.query or "").strip():
+        raise HTTPException(status_code=400, detail="A token-budgeted recall needs a query.")
+    if recall_request.mmr_lambda is not None and not 0 <= recall_request.mmr_lambda <= 1:
+        raise HTTPException(status_code=400, detail="mmr_lambda must be in [0, 1].")
+
+@router.post("/recall_memory", dependencies=[Depends(recall_admission)])
 async def recall_memory(recall_request: RecallRequest):
-    if not recall_request.query.strip():
+    if recall_request.tag_mode not in TAG_MODES:
+        raise HTTPException(status_code=400, detail=f"tag_mode must be one of {list(TAG_MODES)}.")
+    if recall_request.order_by not in ORDER_BY_MODES:
+        raise HTTPException(status_code=400, detail=f"order_by must be one of {list(ORDER_BY_MODES)}.")
+    validate_packing(recall_request)
+    try:
+        since = normalize_timestamp(recall_request.since) if recall_request.since is not None else None
+        until = normalize_timestamp(recall_request.until) if recall_request.until is not None else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="since/until must be epoch seconds or ISO-8601 timestamps.")
+
+    time_window_only = recall_request.order_by == "recency" and (since is not None or until is not None)
+    if not (recall_request.query or "").strip() and not time_window_only:
         logger.warning("Memory recall failed: Empty query.")
         raise HTTPException(status_code=400, detail="Query cannot be empty.")
     
     try:
         logger.info(f"Recalling memories for query: '{recall_request.query}' with top_k={recall_request.top_k}")
-        memories = await memory_manager.recall_memory(query_content=recall_request.query, top_k=recall_request.top_k)
-        if not memories:
+        memories = await memory_manager.recall_memory(
+            query_content=recall_request.query,
+            top_k=recall_request.top_k,
+            tags=recall_request.tags,
+            tag_mode=recall_request.tag_mode,
+            since=since,
+            until=until,
+            order_by=recall_request.order_by,
+            session_id=recall_request.session_id,
+            token_budget=recall_request.token_budget,
+            mmr_lambda=recall_request.mmr_lambda
+        )
+        if not memories or (recall_request.token_budget is not None and not memories["memories"]):
             return {"message": "No relevant memories found"}
-        return {"memories": memories}
+        return serialize_response(memories if recall_request.token_budget is not None else {"memories": memories})
     except Exception as e:
         logger.error(f"Error during memory recall: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error recalling memories: {str(e)}")
 
-@router.post("/prune_memories")
+@router.post("/recall_batch", dependencies=[Depends(recall_admission)])
+async def recall_batch(batch_request: RecallBatchRequest):
+    """
+    Recall memories for several queries in one call; results come back in request order.
+    """
+    queries = batch_request.queries
+    if not queries:
+        raise HTTPException(status_code=400, detail="Queries cannot be empty.")
+    if len(queries) > MAX_BATCH_QUERIES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_QUERIES} queries per batch.")
+
+    batch = []
+    for recall_request in queries:
+        if not (recall_request.query or "").strip():
+            raise HTTPException(status_code=400, detail="Query cannot be empty.")
+        if recall_request.tag_mode not in TAG_MODES:
+            raise HTTPException(status_code=400, detail=f"tag_mode must be one of {list(TAG_MODES)}.")
+        if recall_request.order_by not in ORDER_BY_MODES:
+            raise HTTPException(status_code=400, detail=f"order_by must be one of {list(ORDER_BY_MODES)}.")
+        validate_packing(recall_request)
+        try:
+            since = normalize_timestamp(recall_request.since) if recall_request.since is not None else None
+            until = normalize_timestamp(recall_request.until) if recall_request.until is not None else None
+        except ValueError:
+            raise HTTPException(status_code=400, detail="since/until must be epoch seconds or ISO-8601 timestamps.")
+        batch.append({**recall_request.model_dump(), "since": since, "until": until})
+
+    try:
+        logger.info(f"Recalling memories for a batch of {len(batch)} queries")
+        results = await memory_manager.recall_many(batch)
+        return serialize_response({"results": [
+            memories if isinstance(memories, dict) else {"memories": memories} for memories in results
+        ]})
+    except Exception as e:
+        logger.error(f"Error during batch memory recall: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error recalling memories: {str(e)}")
+
+def parse_point_id(point_id: Union[int, str]) -> Union[int, str]:
+    """ Qdrant point IDs are unsigned integers or UUID strings. """
+    return int(point_id) if isinstance(point_id, str) and point_id.isdigit() else point_id
+
+@router.post("/related/{point_id}", dependencies=[Depends(recall_admission)])
+async def related_memories(point_id: str, related_request: Optional[RelatedRequest] = None):
+    """
+    Memories similar to a stored memory, ranked from its stored vector without re-encoding any content.
+    """
+    related_request = related_request or RelatedRequest()
+    if related_request.tag_mode not in TAG_MODES:
+        raise HTTPException(status_code=400, detail=f"tag_mode must be one of {list(TAG_MODES)}.")
+    if related_request.order_by not in ORDER_BY_MODES:
+        raise HTTPException(status_code=400, detail=f"order_by must be one of {list(ORDER_BY_MODES)}.")
+    try:
+        since = normalize_timestamp(related_request.since) if related_request.since is not None else None
+        until = normalize_timestamp(related_request.until) if related_request.until is not None else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="since/until must be epoch seconds or ISO-8601 timestamps.")
+
+    try:
+        logger.info(f"Recalling memories related to '{point_id}' with top_k={related_request.top_k}")
+        memories = await memory_manager.related_memories(
+            point_id=parse_point_id(point_id),
+            top_k=related_request.top_k,
+            positive_ids=[parse_point_id(pid) for pid in related_request.positive_ids or []],
+            negative_ids=[parse_point_id(pid) for pid in related_request.negative_ids or []],
+            tags=related_request.tags,
+            tag_mode=related_request.tag_mode,
+            since=since,
+            until=until,
+            metadata=related_request.metadata,
+            order_by=related_request.order_by
+        )
+        if not memories:
+            return {"message": "No related memories found"}
+        return serialize_response({"memories": memories})
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]) if e.args else "Memory not found")
+    except Exception as e:
+        logger.error(f"Error during related memory recall: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error recalling related memories: {str(e)}")
+
+@router.post("/traverse", dependencies=[Depends(recall_admission)])
+async def traverse_memories(traverse_request: TraverseRequest):
+    """
+    Multi-hop associative recall: expand the memory graph from a memory or a query with gravity-weighted beam search.
+    """
+    if traverse_request.point_id is None and not (traverse_request.query or "").strip():
+        raise HTTPException(status_code=400, detail="Either point_id or query is required.")
+    if not 1 <= (traverse_request.hops or 0) <= MAX_TRAVERSE_HOPS:
+        raise HTTPException(status_code=400, detail=f"hops must be between 1 and {MAX_TRAVERSE_HOPS}.")
+    if not 1 <= (traverse_request.beam_width or 0) <= MAX_BEAM_WIDTH:
+        raise HTTPException(status_code=400, detail=f"beam_width must be between 1 and {MAX_BEAM_WIDTH}.")
+
+    try:
+        logger.info(f"Traversing the memory graph {traverse_request.hops} hops from "
+                    f"{traverse_request.point_id or repr(traverse_request.query)}")
+        memories = await memory_manager.traverse_memories(
+            point_id=parse_point_id(traverse_request.point_id) if traverse_request.point_id is not None else None,
+            query_content=traverse_request.query,
+            hops=traverse_request.hops,
+            beam_width=traverse_request.beam_width,
+            top_k=traverse_request.top_k,
+            tags=traverse_request.tags
+        )
+        # Memories not yet linked by the graph repairer cannot be reached through the graph
+        if not memories:
+            return {"message": "No connected memories found", "unlinked_memories": memory_manager.unlinked_memories}
+        return serialize_response({"memories": memories, "unlinked_memories": memory_manager.unlinked_memories})
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]) if e.args else "Memory not found")
+    except Exception as e:
+        logger.error(f"Error during memory graph traversal: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error traversing memories: {str(e)}")
+
+@router.post("/subscriptions", dependencies=[Depends(recall_admission)])
+async def create_subscription(subscription_request: SubscriptionRequest):
+    """
+    Register a standing query. Memories created from now on that match it are pushed to
+    /subscriptions/{id}/events (server-sent events) or /subscriptions/{id}/ws (WebSocket).
+    """
+    if not subscription_request.query.strip():
+        raise HTTPException(status_code=400, detail="Query cannot be empty.")
+    if not -1 <= subscription_request.threshold <= 1:
+        raise HTTPException(status_code=400, detail="threshold must be a cosine similarity in [-1, 1].")
+
+    try:
+        logger.info(f"Registering standing query: '{subscription_request.query}'")
+        subscription = await memory_manager.subscribe(
+            query_content=subscription_request.query,
+            threshold=subscription_request.threshold,
+            tags=subscription_request.tags
+        )
+        return {"message": "Subscription created successfully", **subscription.to_dict()}
+    except RuntimeError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error creating subscription: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error creating subscription: {str(e)}")
+
+@router.get("/subscriptions", dependencies=[Depends(recall_admission)])
+async def list_subscriptions():
+    return {"subscriptions": [subscription.to_dict() for subscription in memory_manager.subscriptions.subscriptions.values()]}
+
+@router.delete("/subscriptions/{subscription_id}", dependencies=[Depends(recall_admission)])
+async def delete_subscription(subscription_id: str):
+    try:
+        memory_manager.subscriptions.remove(subscription_id)
+        return {"message": "Subscription deleted successfully"}
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+def get_subscription(subscription_id: str) -> gravrag_subscriptions.Subscription:
+    try:
+        return memory_manager.subscriptions.get(subscription_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+# Streams hold no admission slot: they are idle between events and would starve the recall budget
+@router.get("/subscriptions/{subscription_id}/events")
+async def subscription_events(subscription_id: str):
+    """
+    Server-sent event stream of the memories matching a standing query.
+    """
+    subscription = get_subscription(subscription_id)
+
+    async def stream():
+        queue = subscription.attach()
+        try:
+            while True:
+                event = await subscription.next_event(queue, KEEPALIVE_SECONDS)
+                if event is None:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+                if event["event"] == "closed":
+                    return
+        finally:
+            subscription.detach(queue)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@router.websocket("/subscriptions/{subscription_id}/ws")
+async def subscription_websocket(websocket: WebSocket, subscription_id: str):
+    """
+    WebSocket stream of the memories matching a standing query, one JSON message per match.
+    """
+    try:
+        subscription = memory_manager.subscriptions.get(subscription_id)
+    except KeyError:
+        await websocket.close(code=4404, reason="Subscription not found")
+        return
+
+    await websocket.accept()
+    queue = subscription.attach()
+    try:
+        while True:
+            event = await subscription.next_event(queue, KEEPALIVE_SECONDS)
+            await websocket.send_json(event or {"subscription_id": subscription_id, "event": "keepalive"})
+            if event is not None and event["event"] == "closed":
+                await websocket.close()
+                return
+    except WebSocketDisconnect:
+        pass
+    finally:
+        subscription.detach(queue)
+
+@router.post("/repair_graph", dependencies=[Depends(admin_admission)])
+async def repair_graph(repair_request: RepairGraphRequest, background_tasks: BackgroundTasks):
+    """
+    Rebuild missing or stale neighbour lists of the memory graph, by default as a background job.
+    """
+    try:
+        memory_manager.ensure_not_rebuilding("repair the memory graph")
+        if repair_request.background:
+            background_tasks.add_task(memory_manager.repair_graph, full=repair_request.full)
+            return {"message": "Memory graph repair started"}
+        result = await memory_manager.repair_graph(full=repair_request.full)
+        return {"message": "Memory graph repair completed successfully", **result}
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error repairing memory graph: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error repairing memory graph: {str(e)}")
+
+@router.post("/demote_memories", dependencies=[Depends(admin_admission)])
+async def demote_memories(demote_request: DemoteRequest, background_tasks: BackgroundTasks):
+    """
+    Move memories whose decayed spacetime coordinate fell below the threshold to the cold tier now,
+    instead of waiting for the background tier mover.
+    """
+    if not memory_manager.tiering:
+        raise HTTPException(status_code=400, detail="Tiering is disabled; set GRAVRAG_TIERING=1 to enable the cold tier.")
+    options = demote_request.model_dump(exclude={"background"})
+    try:
+        memory_manager.ensure_not_rebuilding("demote memories")
+        if demote_request.background:
+            background_tasks.add_task(memory_manager.demote_memories, **options)
+            return {"message": "Memory demotion started"}
+        result = await memory_manager.demote_memories(**options)
+        return {"message": "Memory demotion completed successfully", **result}
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error demoting memories: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error demoting memories: {str(e)}")
+
+@router.post("/rebuild_memories", dependencies=[Depends(admin_admission)])
+async def rebuild_memories(rebuild_request: RebuildRequest, background_tasks: BackgroundTasks):
+    """
+    Rebuild the memory collections into new generations (optionally re-embedding with another model) and
+    swap their aliases atomically once caught up; recalls keep being served throughout.
+    """
+    if rebuild_request.batch_size < 1:
+        raise HTTPException(status_code=400, detail="batch_size must be positive.")
+    try:
+        job = memory_manager.start_rebuild(rebuild_request.model)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    options = {"batch_size": rebuild_request.batch_size, "keep_previous": rebuild_request.keep_previous}
+    try:
+        logger.info(f"Rebuilding memory collections {job.aliases} with model: {rebuild_request.model}")
+        if rebuild_request.background:
+            background_tasks.add_task(memory_manager.rebuild_memories, job, **options)
+            return {"message": "Memory rebuild started", **job.to_dict()}
+        result = await memory_manager.rebuild_memories(job, **options)
+        return {"message": "Memory rebuild completed successfully", **result}
+    except Exception as e:
+        logger.error(f"Error rebuilding memories: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error rebuilding memories: {str(e)}")
+
+@router.get("/rebuild_status", dependencies=[Depends(recall_admission)])
+async def rebuild_status():
+    """
+    Progress and throughput of the current or last memory rebuild.
+    """
+    if memory_manager.rebuild_job is None:
+        return {"message": "No rebuild has run since startup"}
+    return memory_manager.rebuild_job.to_dict()
+
+@router.get("/stats", dependencies=[Depends(recall_admission)])
+async def memory_stats(objective_id: Optional[str] = None, tag: Optional[str] = None, refresh: bool = False,
+                       limit: int = 100):
+    """
+    Memory counts and average gravitational pull per objective and per tag, from a cached aggregate table.
+    `objective_id`/`tag` add an exact server-side count of the matching memories.
+    """
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be positive.")
+
+    try:
+        return await memory_manager.memory_stats(objective_id=objective_id, tag=tag, refresh=refresh, limit=limit)
+    except Exception as e:
+        logger.error(f"Error computing memory stats: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error computing memory stats: {str(e)}")
+
+@router.post("/prune_memories", dependencies=[Depends(ingest_admission)])
 async def prune_memories(prune_request: PruneRequest):
     try:
         await memory_manager.prune_memories()
@@ -67,23 +542,25 @@ async def prune_memories(prune_request: PruneRequest):
         logger.error(f"Error during memory pruning: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error pruning memories: {str(e)}")
 
-@router.post("/purge_memories")
+@router.post("/purge_memories", dependencies=[Depends(ingest_admission)])
 async def purge_memories():
     try:
         await memory_manager.purge_all_memories()
         return {"message": "All memories have been purged successfully"}
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         logger.error(f"Error purging memories: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error purging memories: {str(e)}")
 
-@router.post("/recall_with_metadata")
+@router.post("/recall_with_metadata", dependencies=[Depends(recall_admission)])
 async def recall_with_metadata(recall_request: RecallWithMetadataRequest):
     """
     Recall memories that match query content and metadata criteria.
     """
     query = recall_request.query
     metadata = recall_request.metadata
-    top_k = recall_request.top_k or 10
+    top_k = recall_request.top_k
 
     if not query.strip():
         raise HTTPException(status_code=400, detail="Query content cannot be empty.")
@@ -96,17 +573,140 @@ async def recall_with_metadata(recall_request: RecallWithMetadataRequest):
         if not memories or "memories" not in memories:
             return {"message": "No matching memories found"}
         
-        return memories
+        return serialize_response(memories)
     except Exception as e:
         logger.error(f"Error during metadata recall: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error recalling memories: {str(e)}")
 
-@router.post("/delete_by_metadata")
+@router.post("/memories", dependencies=[Depends(recall_admission)])
+async def list_memories(list_request: ListMemoriesRequest):
+    """
+    Browse memories a page at a time with an opaque cursor, without encoding a query.
+    """
+    if list_request.limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be positive.")
+
+    try:
+        since = normalize_timestamp(list_request.since) if list_request.since is not None else None
+        until = normalize_timestamp(list_request.until) if list_request.until is not None else None
+        page = await memory_manager.list_memories(
+            cursor=list_request.cursor,
+            limit=list_request.limit,
+            metadata=list_request.metadata,
+            tags=list_request.tags,
+            since=since,
+            until=until,
+            fields=list_request.fields
+        )
+        return serialize_response(page)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error listing memories: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error listing memories: {str(e)}")
+
+@router.post("/update_metadata", dependencies=[Depends(ingest_admission)])
+async def update_metadata(update_request: UpdateMetadataRequest):
+    """
+    Merge a metadata patch into every memory matching a metadata filter, server-side and without re-encoding.
+    """
+    if not update_request.filter:
+        raise HTTPException(status_code=400, detail="Filter cannot be empty.")
+    if not update_request.patch:
+        raise HTTPException(status_code=400, detail="Patch cannot be empty.")
+
+    try:
+        logger.info(f"Updating metadata of memories matching {update_request.filter} with {update_request.patch}")
+        updated = await memory_manager.update_metadata(metadata=update_request.filter, patch=update_request.patch)
+        return {"message": "Memory metadata update completed successfully", "updated": updated}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error updating memory metadata: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error updating memory metadata: {str(e)}")
+
+@router.post("/delete_by_metadata", dependencies=[Depends(ingest_admission)])
 async def delete_by_metadata(delete_request: DeleteByMetadataRequest):
+    if not delete_request.metadata:
+        raise HTTPException(status_code=400, detail="Metadata cannot be empty.")
+
     try:
         logger.info(f"Deleting memories with metadata: {delete_request.metadata}")
-        await memory_manager.delete_memories_by_metadata(metadata=delete_request.metadata)
-        return {"message": "Memory deletion by metadata completed successfully"}
+        deleted = await memory_manager.delete_memories_by_metadata(metadata=delete_request.metadata)
+        return {"message": "Memory deletion by metadata completed successfully", "deleted": deleted}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error deleting memories by metadata: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error deleting memories: {str(e)}")
+
+@router.post("/consolidate_memories", dependencies=[Depends(admin_admission)])
+async def consolidate_memories(consolidate_request: ConsolidateRequest):
+    """
+    Compact cold memories into cluster summaries and report the shrink ratio and recall@k before/after.
+    """
+    if not 0 < consolidate_request.target_ratio <= 1:
+        raise HTTPException(status_code=400, detail="target_ratio must be in (0, 1].")
+    if consolidate_request.min_cluster_size < 2:
+        raise HTTPException(status_code=400, detail="min_cluster_size must be at least 2.")
+
+    options = consolidate_request.model_dump(exclude={"objective_id"})
+    try:
+        logger.info(f"Consolidating memories with options: {options}")
+        report = await memory_manager.consolidate_memories(objective_id=consolidate_request.objective_id, **options)
+        return {"message": "Memory consolidation completed successfully", **report}
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error consolidating memories: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error consolidating memories: {str(e)}")
+
+@router.post("/export_memories", dependencies=[Depends(admin_admission)])
+async def export_memories(export_request: ExportRequest):
+    """
+    Stream all memories into a Parquet file on the server.
+    """
+    if export_request.batch_size < 1:
+        raise HTTPException(status_code=400, detail="batch_size must be positive.")
+    try:
+        path = resolve_export_path(export_request.path)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        logger.info(f"Exporting memories to: {path}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        result = await memory_manager.export_memories(path=path, batch_size=export_request.batch_size)
+        return {"message": "Memory export completed successfully", **result}
+    except Exception as e:
+        logger.error(f"Error exporting memories: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error exporting memories: {str(e)}")
+
+@router.post("/import_memories", dependencies=[Depends(admin_admission)])
+async def import_memories(import_request: ImportRequest):
+    """
+    Restore memories from a Parquet file on the server.
+    """
+    if import_request.batch_size < 1 or import_request.parallel < 1:
+        raise HTTPException(status_code=400, detail="batch_size and parallel must be positive.")
+    try:
+        path = resolve_export_path(import_request.path)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        logger.info(f"Importing memories from: {path}")
+        result = await memory_manager.import_memories(
+            path=path,
+            batch_size=import_request.batch_size,
+            parallel=import_request.parallel,
+            bulk=import_request.bulk
+        )
+        return {"message": "Memory import completed successfully", **result}
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Export file not found: {import_request.path}")
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error importing memories: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error importing memories: {str(e)}")
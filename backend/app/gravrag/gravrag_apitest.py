@@ -1,5 +1,6 @@
 import requests
 import json
+import time
 import logging
 
 # Configure logging
@@ -7,6 +8,7 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 BASE_URL = "http://localhost:8000/gravrag"
+QDRANT_URL = "http://localhost:6333"
 
 def test_create_memory():
     payload = {
@@ -85,6 +87,292 @@ def test_recall_memory():
     logger.info("Memory recall successful.")
     logger.info(f"Recalled Memories: {json.dumps(data, indent=2)}")
 
+def test_recall_memory_with_tags():
+    payload = {
+        "query": "test memory",
+        "top_k": 3,
+        "tags": ["example"],
+        "tag_mode": "filter"
+    }
+    response = requests.post(f"{BASE_URL}/recall_memory", json=payload)
+
+    logger.info(f"Recall Memory with Tags Response: {response.status_code}")
+    logger.info(f"Response Content: {response.content}")
+    assert response.status_code == 200, f"Failed to recall memory by tags. Status Code: {response.status_code}"
+
+    data = response.json()
+    assert "memories" in data, "No memories found in the response"
+    for memory in data["memories"]:
+        assert "example" in memory["metadata"].get("tags", []), "Tag filter returned a memory without the tag"
+
+    logger.info("Memory recall with tags successful.")
+
+def test_recall_recent_window():
+    payload = {
+        "since": time.time() - 3600,
+        "order_by": "recency",
+        "top_k": 10
+    }
+    response = requests.post(f"{BASE_URL}/recall_memory", json=payload)
+
+    logger.info(f"Recall Recent Window Response: {response.status_code}")
+    logger.info(f"Response Content: {response.content}")
+    assert response.status_code == 200, f"Failed to recall recent memories. Status Code: {response.status_code}"
+
+    data = response.json()
+    assert "memories" in data, "No memories found in the response"
+    timestamps = [memory["metadata"]["timestamp"] for memory in data["memories"]]
+    assert timestamps == sorted(timestamps, reverse=True), "Recent memories are not ordered newest-first"
+    assert all(ts >= payload["since"] for ts in timestamps), "Memory outside the requested window"
+
+    logger.info("Recent window recall successful.")
+
+def test_recall_batch():
+    payload = {
+        "queries": [
+            {"query": "test memory", "top_k": 2},
+            {"query": "another test memory", "top_k": 1}
+        ]
+    }
+    response = requests.post(f"{BASE_URL}/recall_batch", json=payload)
+
+    logger.info(f"Recall Batch Response: {response.status_code}")
+    logger.info(f"Response Content: {response.content}")
+    assert response.status_code == 200, f"Failed to recall memory batch. Status Code: {response.status_code}"
+
+    data = response.json()
+    assert len(data["results"]) == len(payload["queries"]), "Batch results do not match the number of queries"
+    for query, result in zip(payload["queries"], data["results"]):
+        assert len(result["memories"]) <= query["top_k"], "Batch result exceeds top_k"
+
+    logger.info("Batch recall successful.")
+
+def test_related_memories():
+    recall = requests.post(f"{BASE_URL}/recall_memory", json={"query": "test memory", "top_k": 2})
+    assert recall.status_code == 200, f"Failed to recall a source memory. Status Code: {recall.status_code}"
+    source_id = recall.json()["memories"][0]["id"]
+
+    response = requests.post(f"{BASE_URL}/related/{source_id}", json={"top_k": 3})
+
+    logger.info(f"Related Memories Response: {response.status_code}")
+    logger.info(f"Response Content: {response.content}")
+    assert response.status_code == 200, f"Failed to recall related memories. Status Code: {response.status_code}"
+
+    memories = response.json().get("memories", [])
+    assert len(memories) <= 3, "Related memories exceed top_k"
+    assert all(memory["id"] != source_id for memory in memories), "Source memory returned as related to itself"
+
+    missing = requests.post(f"{BASE_URL}/related/00000000-0000-0000-0000-000000000000")
+    assert missing.status_code == 404, f"Expected 404 for an unknown memory. Status Code: {missing.status_code}"
+    logger.info("Related memory recall successful.")
+
+def test_traverse_memories():
+    payload = {"query": "test memory", "hops": 2, "beam_width": 4, "top_k": 5}
+    response = requests.post(f"{BASE_URL}/traverse", json=payload)
+
+    logger.info(f"Traverse Memories Response: {response.status_code}")
+    logger.info(f"Response Content: {response.content}")
+    assert response.status_code == 200, f"Failed to traverse memories. Status Code: {response.status_code}"
+
+    memories = response.json().get("memories", [])
+    assert len(memories) <= payload["top_k"], "Traversal results exceed top_k"
+    assert all(memory["hop"] <= payload["hops"] for memory in memories), "Traversal went beyond the hop limit"
+    logger.info("Memory graph traversal successful.")
+
+def test_demote_memories():
+    payload = {"spacetime_threshold": 1e-6, "min_age_seconds": 86400, "background": False}
+    response = requests.post(f"{BASE_URL}/demote_memories", json=payload)
+
+    logger.info(f"Demote Memories Response: {response.status_code}")
+    logger.info(f"Response Content: {response.content}")
+    if response.status_code == 400:
+        logger.info("Tiering is disabled on the server; skipping demotion checks.")
+        return
+    assert response.status_code == 200, f"Failed to demote memories. Status Code: {response.status_code}"
+    assert "demoted" in response.json(), "Demotion report is missing the demoted count"
+    logger.info("Memory demotion completed successfully.")
+
+def test_cold_tier_memories():
+    # A month-old memory is under a spacetime threshold this high, so it is demoted at once
+    content = "This is a cold tier test memory"
+    metadata = {"objective_id": "obj_cold", "tags": ["cold"], "timestamp": time.time() - 30 * 86400}
+    created = requests.post(f"{BASE_URL}/create_memory", json={"content": content, "metadata": metadata})
+    assert created.status_code == 200, f"Failed to create memory. Status Code: {created.status_code}"
+    demoted = requests.post(f"{BASE_URL}/demote_memories", json={"spacetime_threshold": 1e9, "min_age_seconds": 86400})
+    if demoted.status_code == 400:
+        logger.info("Tiering is disabled on the server; skipping cold tier checks.")
+        return
+    assert demoted.status_code == 200, f"Failed to demote memories. Status Code: {demoted.status_code}"
+
+    listed = requests.post(f"{BASE_URL}/memories", json={"metadata": {"objective_id": "obj_cold"}, "fields": ["metadata"]})
+    cold = [memory for memory in listed.json()["memories"] if memory.get("tier") == "cold"]
+    assert cold, "The memory was not demoted to the cold tier"
+    cold_id = cold[0]["id"]
+
+    related = requests.post(f"{BASE_URL}/related/{cold_id}", json={"top_k": 3})
+    logger.info(f"Related Cold Memory Response: {related.status_code}")
+    assert related.status_code == 200, f"Failed to relate a demoted memory. Status Code: {related.status_code}"
+
+    recalled = requests.post(f"{BASE_URL}/recall_with_metadata",
+                             json={"query": content, "metadata": {"objective_id": "obj_cold"}, "top_k": 5})
+    assert recalled.status_code == 200, f"Failed to recall by metadata. Status Code: {recalled.status_code}"
+    assert any(memory["content"] == content for memory in recalled.json().get("memories", [])), \
+        "Metadata recall missed the demoted memory"
+
+    traversed = requests.post(f"{BASE_URL}/traverse", json={"point_id": cold_id, "hops": 1})
+    assert traversed.status_code == 200, f"Failed to traverse from a demoted memory. Status Code: {traversed.status_code}"
+
+    stats = requests.get(f"{BASE_URL}/stats", params={"refresh": True}).json()
+    exported = requests.post(f"{BASE_URL}/export_memories", json={"path": "gravrag_apitest_cold.parquet"})
+    assert exported.status_code == 200, f"Failed to export memories. Status Code: {exported.status_code}"
+    assert exported.json()["points"] >= stats["total"]["count"], "The export left out demoted memories"
+    logger.info("Cold tier memories are related, recalled, traversed and exported.")
+
+def test_rebuild_memories():
+    payload = {"background": False, "batch_size": 256}
+    response = requests.post(f"{BASE_URL}/rebuild_memories", json=payload)
+
+    logger.info(f"Rebuild Memories Response: {response.status_code}")
+    logger.info(f"Response Content: {response.content}")
+    assert response.status_code == 200, f"Failed to rebuild memories. Status Code: {response.status_code}"
+    assert response.json()["status"] == "completed", "Rebuild did not complete"
+
+    status = requests.get(f"{BASE_URL}/rebuild_status")
+    assert status.status_code == 200, f"Failed to read rebuild status. Status Code: {status.status_code}"
+    assert status.json()["copied"] == response.json()["copied"], "Rebuild status does not match the rebuild"
+    logger.info("Memory rebuild completed successfully.")
+
+def test_subscriptions():
+    payload = {"query": "This is a subscribed test memory", "threshold": 0.5}
+    response = requests.post(f"{BASE_URL}/subscriptions", json=payload)
+
+    logger.info(f"Create Subscription Response: {response.status_code}")
+    logger.info(f"Response Content: {response.content}")
+    assert response.status_code == 200, f"Failed to create subscription. Status Code: {response.status_code}"
+    subscription_id = response.json()["id"]
+
+    created = requests.post(f"{BASE_URL}/create_memory", json={"content": "This is a subscribed test memory", "metadata": {}})
+    assert created.status_code == 200, f"Failed to create memory. Status Code: {created.status_code}"
+
+    # The match was queued at creation, so the stream's first event is already waiting
+    with requests.get(f"{BASE_URL}/subscriptions/{subscription_id}/events", stream=True, timeout=10) as stream:
+        event = next(json.loads(line[len("data: "):]) for line in stream.iter_lines(decode_unicode=True)
+                     if line and line.startswith("data: "))
+    assert event["content"] == "This is a subscribed test memory", "Subscription pushed the wrong memory"
+
+    deleted = requests.delete(f"{BASE_URL}/subscriptions/{subscription_id}")
+    assert deleted.status_code == 200, f"Failed to delete subscription. Status Code: {deleted.status_code}"
+    logger.info("Subscription pushed the new memory successfully.")
+
+def test_rebuild_with_subscription():
+    payload = {"query": "This memory arrives after the model changed", "threshold": 0.5}
+    response = requests.post(f"{BASE_URL}/subscriptions", json=payload)
+    assert response.status_code == 200, f"Failed to create subscription. Status Code: {response.status_code}"
+    subscription_id = response.json()["id"]
+
+    # Re-embed with another model and back, so the server ends on the model it started with
+    for model in ("paraphrase-MiniLM-L3-v2", "all-MiniLM-L6-v2"):
+        rebuilt = requests.post(f"{BASE_URL}/rebuild_memories", json={"background": False, "model": model})
+        logger.info(f"Rebuild Memories Response: {rebuilt.status_code}")
+        assert rebuilt.status_code == 200, f"Failed to rebuild memories. Status Code: {rebuilt.status_code}"
+        assert rebuilt.json()["status"] == "completed", "Rebuild did not complete"
+
+    created = requests.post(f"{BASE_URL}/create_memory", json={"content": payload["query"], "metadata": {}})
+    assert created.status_code == 200, f"Failed to create memory after the rebuild. Status Code: {created.status_code}"
+
+    with requests.get(f"{BASE_URL}/subscriptions/{subscription_id}/events", stream=True, timeout=10) as stream:
+        event = next(json.loads(line[len("data: "):]) for line in stream.iter_lines(decode_unicode=True)
+                     if line and line.startswith("data: "))
+    assert event["content"] == payload["query"], "Subscription did not match in the new model's vector space"
+
+    deleted = requests.delete(f"{BASE_URL}/subscriptions/{subscription_id}")
+    assert deleted.status_code == 200, f"Failed to delete subscription. Status Code: {deleted.status_code}"
+    logger.info("Subscription kept matching across a re-embedding rebuild.")
+
+def test_bulk_import_memories():
+    path = "gravrag_apitest_export.parquet"  # Server-side, under GRAVRAG_EXPORT_DIR
+    exported = requests.post(f"{BASE_URL}/export_memories", json={"path": path})
+    assert exported.status_code == 200, f"Failed to export memories. Status Code: {exported.status_code}"
+
+    response = requests.post(f"{BASE_URL}/import_memories", json={"path": path, "bulk": True})
+
+    logger.info(f"Bulk Import Memories Response: {response.status_code}")
+    logger.info(f"Response Content: {response.content}")
+    assert response.status_code == 200, f"Failed to bulk import memories. Status Code: {response.status_code}"
+    assert response.json()["points"] == exported.json()["points"], "Bulk import did not restore every memory"
+    assert "total_seconds" in response.json()["bulk_load"], "Bulk import report is missing its timings"
+    logger.info("Bulk import completed successfully.")
+
+def test_bulk_load_restores_on_failure():
+    # Talks to the API's Qdrant directly: a bulk load that fails on entry never reaches an endpoint
+    from qdrant_client import QdrantClient
+    from qdrant_client.models import VectorParams, Distance
+    from gravrag.gravrag_bulk import BulkLoad
+
+    client = QdrantClient(url=QDRANT_URL)
+    collection_name = "gravrag_apitest_bulk"
+    client.delete_collection(collection_name)
+    client.create_collection(collection_name, vectors_config=VectorParams(size=4, distance=Distance.COSINE))
+    threshold = client.get_collection(collection_name).config.optimizer_config.indexing_threshold
+    try:
+        try:
+            with BulkLoad(client, [collection_name, "gravrag_apitest_missing"], wait=False):
+                raise AssertionError("A bulk load of a missing collection was entered")
+        except ValueError:
+            pass
+        restored = client.get_collection(collection_name).config.optimizer_config.indexing_threshold
+        assert restored == threshold, f"Indexing threshold left at {restored} instead of {threshold}"
+    finally:
+        client.delete_collection(collection_name)
+    logger.info("Failed bulk load restored the collections it had suspended.")
+
+def test_working_memory_recall():
+    payload = {"content": "This is a session working memory test", "metadata": {"session_id": "apitest-session"}}
+    created = requests.post(f"{BASE_URL}/create_memory", json=payload)
+    assert created.status_code == 200, f"Failed to create memory. Status Code: {created.status_code}"
+
+    response = requests.post(f"{BASE_URL}/recall_memory", json={
+        "query": "This is a session working memory test", "top_k": 1, "session_id": "apitest-session"
+    })
+
+    logger.info(f"Working Memory Recall Response: {response.status_code}")
+    logger.info(f"Response Content: {response.content}")
+    assert response.status_code == 200, f"Failed to recall memories. Status Code: {response.status_code}"
+    memory = response.json()["memories"][0]
+    assert memory["content"] == payload["content"], "Session recall returned the wrong memory"
+    assert memory.get("tier") == "working", "Session recall was not served from working memory"
+    logger.info("Session recall served from working memory successfully.")
+
+def test_compressed_content_recall():
+    content = "Compressed content test: " + " ".join(f"section {n} of a long design document" for n in range(500))
+    created = requests.post(f"{BASE_URL}/create_memory", json={"content": content, "metadata": {"tags": ["apitest"]}})
+    assert created.status_code == 200, f"Failed to create memory. Status Code: {created.status_code}"
+
+    response = requests.post(f"{BASE_URL}/recall_memory", json={"query": content[:200], "top_k": 1})
+
+    logger.info(f"Compressed Content Recall Response: {response.status_code}")
+    assert response.status_code == 200, f"Failed to recall memories. Status Code: {response.status_code}"
+    memory = response.json()["memories"][0]
+    assert memory["content"] == content, "Recall did not return the full decompressed content"
+    logger.info("Compressed content recalled in full successfully.")
+
+def test_token_budget_recall():
+    for content in ["Token budget test: deploy the api cluster", "Token budget test: deploy the api cluster again"]:
+        created = requests.post(f"{BASE_URL}/create_memory", json={"content": content, "metadata": {"tags": ["apitest"]}})
+        assert created.status_code == 200, f"Failed to create memory. Status Code: {created.status_code}"
+
+    response = requests.post(f"{BASE_URL}/recall_memory", json={
+        "query": "Token budget test: deploy the api cluster", "top_k": 5, "token_budget": 64
+    })
+
+    logger.info(f"Token Budget Recall Response: {response.status_code}")
+    logger.info(f"Response Content: {response.content}")
+    assert response.status_code == 200, f"Failed to recall memories. Status Code: {response.status_code}"
+    packed = response.json()
+    assert packed["context_tokens"] <= 64, "Packed context exceeds the token budget"
+    assert sum(memory["tokens"] for memory in packed["memories"]) <= packed["context_tokens"], "Token counts disagree"
+    logger.info("Token-budgeted recall successful.")
+
 def test_prune_memories():
     response = requests.post(f"{BASE_URL}/prune_memories", json={})
     
@@ -127,6 +415,62 @@ def test_recall_memory_with_metadata():
     logger.info("Memory recall with metadata successful.")
     logger.info(f"Matching Memories: {json.dumps(data, indent=2)}")
 
+def test_update_metadata():
+    created = requests.post(f"{BASE_URL}/create_memory", json={
+        "content": "This is a metadata patch test", "metadata": {"task_id": "apitest-patch"}
+    })
+    assert created.status_code == 200, f"Failed to create memory. Status Code: {created.status_code}"
+
+    response = requests.post(f"{BASE_URL}/update_metadata", json={
+        "filter": {"task_id": "apitest-patch"}, "patch": {"archived": True}
+    })
+
+    logger.info(f"Update Metadata Response: {response.status_code}")
+    logger.info(f"Response Content: {response.content}")
+    assert response.status_code == 200, f"Failed to update metadata. Status Code: {response.status_code}"
+    assert response.json()["updated"] >= 1, "No memories were updated"
+
+    recalled = requests.post(f"{BASE_URL}/recall_with_metadata", json={
+        "query": "This is a metadata patch test", "metadata": {"task_id": "apitest-patch", "archived": True}
+    })
+    assert recalled.status_code == 200 and recalled.json().get("memories"), "Patched metadata was not found on recall"
+    logger.info("Metadata update by filter successful.")
+
+def test_memory_stats():
+    created = requests.post(f"{BASE_URL}/create_memory", json={
+        "content": "This is a stats test", "metadata": {"objective_id": "apitest-stats", "tags": ["apitest"]}
+    })
+    assert created.status_code == 200, f"Failed to create memory. Status Code: {created.status_code}"
+
+    response = requests.get(f"{BASE_URL}/stats", params={"objective_id": "apitest-stats", "tag": "apitest"})
+
+    logger.info(f"Memory Stats Response: {response.status_code}")
+    logger.info(f"Response Content: {response.content}")
+    assert response.status_code == 200, f"Failed to get memory stats. Status Code: {response.status_code}"
+    stats = response.json()
+    assert stats["match"]["count"] >= 1, "The filtered count missed the new memory"
+    assert stats["total"]["count"] >= stats["match"]["count"], "Total count is below the filtered count"
+    logger.info("Memory stats retrieved successfully.")
+
+def test_list_memories():
+    seen, cursor = set(), None
+    for _ in range(3):
+        response = requests.post(f"{BASE_URL}/memories", json={"cursor": cursor, "limit": 2, "fields": ["preview", "metadata"]})
+        assert response.status_code == 200, f"Failed to list memories. Status Code: {response.status_code}"
+        page = response.json()
+        assert len(page["memories"]) <= 2, "Page exceeds the requested limit"
+        ids = {memory["id"] for memory in page["memories"]}
+        assert not ids & seen, "Pages overlap"
+        seen |= ids
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    logger.info(f"Listed {len(seen)} memories over cursor pages")
+    invalid = requests.post(f"{BASE_URL}/memories", json={"cursor": "not-a-cursor"})
+    assert invalid.status_code == 400, f"Invalid cursor was accepted. Status Code: {invalid.status_code}"
+    logger.info("Memory listing successful.")
+
 def test_delete_by_metadata():
     payload = {
         "metadata": {
@@ -169,6 +513,81 @@ def main():
     except Exception as e:
         logger.error(f"Error in test_recall_memory: {e}")
 
+    try:
+        test_recall_memory_with_tags()
+    except Exception as e:
+        logger.error(f"Error in test_recall_memory_with_tags: {e}")
+
+    try:
+        test_recall_recent_window()
+    except Exception as e:
+        logger.error(f"Error in test_recall_recent_window: {e}")
+
+    try:
+        test_recall_batch()
+    except Exception as e:
+        logger.error(f"Error in test_recall_batch: {e}")
+
+    try:
+        test_related_memories()
+    except Exception as e:
+        logger.error(f"Error in test_related_memories: {e}")
+
+    try:
+        test_traverse_memories()
+    except Exception as e:
+        logger.error(f"Error in test_traverse_memories: {e}")
+
+    try:
+        test_subscriptions()
+    except Exception as e:
+        logger.error(f"Error in test_subscriptions: {e}")
+
+    try:
+        test_demote_memories()
+    except Exception as e:
+        logger.error(f"Error in test_demote_memories: {e}")
+
+    try:
+        test_cold_tier_memories()
+    except Exception as e:
+        logger.error(f"Error in test_cold_tier_memories: {e}")
+
+    try:
+        test_rebuild_memories()
+    except Exception as e:
+        logger.error(f"Error in test_rebuild_memories: {e}")
+
+    try:
+        test_rebuild_with_subscription()
+    except Exception as e:
+        logger.error(f"Error in test_rebuild_with_subscription: {e}")
+
+    try:
+        test_bulk_import_memories()
+    except Exception as e:
+        logger.error(f"Error in test_bulk_import_memories: {e}")
+
+    try:
+        test_bulk_load_restores_on_failure()
+    except Exception as e:
+        logger.error(f"Error in test_bulk_load_restores_on_failure: {e}")
+
+    try:
+        test_working_memory_recall()
+    except Exception as e:
+        logger.error(f"Error in test_working_memory_recall: {e}")
+
+    try:
+        test_compressed_content_recall()
+    except Exception as e:
+        logger.error(f"Error in test_compressed_content_recall: {e}")
+
+    try:
+        test_token_budget_recall()
+    except Exception as e:
+        logger.error(f"Error in test_token_budget_recall: {e}")
+
     try:
         test_prune_memories()
     except Exception as e:
@@ -179,6 +598,21 @@ def main():
     except Exception as e:
         logger.error(f"Error in test_recall_memory_with_metadata: {e}")
 
+    try:
+        test_update_metadata()
+    except Exception as e:
+        logger.error(f"Error in test_update_metadata: {e}")
+
+    try:
+        test_memory_stats()
+    except Exception as e:
+        logger.error(f"Error in test_memory_stats: {e}")
+
+    try:
+        test_list_memories()
+    except Exception as e:
+        logger.error(f"Error in test_list_memories: {e}")
+
     try:
         test_delete_by_metadata()
     except Exception as e:
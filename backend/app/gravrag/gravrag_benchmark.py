@@ -0,0 +1,315 @@
+"""
+Reproducible load and latency benchmark for the GravRAG API.
+
+Runs the FastAPI router in-process (httpx ASGI transport, no network hop) against an in-memory
+or local Qdrant, seeds a synthetic corpus from a fixed RNG seed, drives a concurrent mixed
+create/recall/filter workload with asyncio, and reports throughput and p50/p95/p99 per endpoint.
+
+Usage (from backend/app):
+    python -m gravrag.gravrag_benchmark --corpus-size 10000 --output bench.json --write-baseline baseline.json
+    python -m gravrag.gravrag_benchmark --corpus-size 10000 --output bench.json --baseline baseline.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import hashlib
+import logging
+import argparse
+import platform
+from collections import defaultdict
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIM = 384  # Matches all-MiniLM-L6-v2 so the hash encoder can stand in for it
+DEFAULT_MIX = "create=0.2,recall=0.6,filter=0.2"
+SEED_BATCH_SIZE = 1000
+
+WORDS = (
+    "agent task objective memory plan tool result error retry schedule deploy review user query context "
+    "project milestone summary report api database index vector cluster latency throughput cache queue "
+    "worker model prompt token budget design test release incident fix feature backlog meeting note"
+).split()
+TAGS = ["planning", "execution", "research", "debugging", "review", "ops", "user", "system"]
+
+
+class HashingEncoder:
+    """
+    Deterministic feature-hashing encoder with SentenceTransformer's encode() interface.
+    Lets the benchmark isolate API and Qdrant cost from model inference; texts sharing
+    words still land close together, so recall results stay meaningful.
+    """
+
+    def __init__(self, dim: int = DEFAULT_DIM):
+        self.dim = dim
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def _encode_one(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in text.lower().split():
+            digest = hashlib.blake2b(token.encode(), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dim
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def encode(self, sentences, batch_size: int = 32, **kwargs):
+        if isinstance(sentences, str):
+            return self._encode_one(sentences)
+        if not len(sentences):
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.stack([self._encode_one(text) for text in sentences])
+
+
+def synthetic_text(rng: random.Random, words: int = 12) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def synthetic_metadata(rng: random.Random, objectives: int, now: float) -> Dict[str, Any]:
+    objective = rng.randrange(objectives)
+    return {
+        "objective_id": f"obj_{objective}",
+        "task_id": f"task_{objective}_{rng.randrange(20)}",
+        "tags": rng.sample(TAGS, rng.randint(1, 3)),
+        "timestamp": now - rng.uniform(0, 30 * 24 * 3600),
+    }
+
+
+def seed_corpus(memory_manager, corpus_size: int, seed: int, objectives: int) -> float:
+    """
+    Bulk-insert a synthetic corpus straight into Qdrant in the MemoryPacket payload layout.
+    Gravity fields are computed for the whole batch with NumPy rather than per packet.
+    Returns the seeding wall time in seconds.
+    """
+    from qdrant_client.models import PointStruct
+
+    rng = random.Random(seed)
+    now = time.time()
+    start = time.perf_counter()
+    for batch_start in range(0, corpus_size, SEED_BATCH_SIZE):
+        count = min(SEED_BATCH_SIZE, corpus_size - batch_start)
+        texts = [synthetic_text(rng) for _ in range(count)]
+        metadatas = [synthetic_metadata(rng, objectives, now) for _ in range(count)]
+        vectors = np.asarray(memory_manager.model.encode(texts), dtype=np.float32)
+
+        magnitudes = np.linalg.norm(vectors, axis=1)
+        timestamps = np.array([metadata["timestamp"] for metadata in metadatas])
+        spacetime = magnitudes / (1 + (now - timestamps))
+
+        points = []
+        for row, (text, metadata) in enumerate(zip(texts, metadatas)):
+            vector = vectors[row].tolist()
+            metadata.update({
+                "recall_count": 0,
+                "memetic_similarity": 1.0,
+                "semantic_relativity": 1.0,
+                "gravitational_pull": float(magnitudes[row]),
+                "spacetime_coordinate": float(spacetime[row]),
+            })
+            points.append(PointStruct(
+                id=batch_start + row,
+                vector=vector,
+                payload={"vector": vector, "content": text, "metadata": metadata}
+            ))
+        memory_manager.qdrant_client.upsert(collection_name=memory_manager.collection_name, points=points)
+        if (batch_start // SEED_BATCH_SIZE) % 50 == 0:
+            logger.info(f"Seeded {batch_start + count}/{corpus_size} memories.")
+    return time.perf_counter() - start
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight)
+    unknown = set(weights) - {"create", "recall", "filter"}
+    if unknown:
+        raise ValueError(f"Unknown workload operations: {sorted(unknown)}")
+    return weights
+
+
+def build_request(operation: str, rng: random.Random, objectives: int):
+    """ Return (endpoint, json payload) for one workload operation. """
+    if operation == "create":
+        metadata = synthetic_metadata(rng, objectives, time.time())
+        metadata.pop("timestamp")
+        return "/gravrag/create_memory", {"content": synthetic_text(rng), "metadata": metadata}
+    if operation == "recall":
+        return "/gravrag/recall_memory", {"query": synthetic_text(rng, 6), "top_k": 5}
+    objective = rng.randrange(objectives)
+    return "/gravrag/recall_with_metadata", {
+        "query": synthetic_text(rng, 6),
+        "metadata": {"objective_id": f"obj_{objective}"},
+        "top_k": 10,
+    }
+
+
+async def run_workload(app, total_requests: int, concurrency: int, mix: Dict[str, float], seed: int,
+                       objectives: int) -> Dict[str, Any]:
+    """ Drive `total_requests` mixed requests through `concurrency` asyncio workers. """
+    import httpx
+
+    operations = list(mix)
+    weights = [mix[operation] for operation in operations]
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    remaining = iter(range(total_requests))
+
+    async def worker(worker_id: int, client):
+        rng = random.Random(seed * 1000 + worker_id)
+        for _ in remaining:
+            operation = rng.choices(operations, weights)[0]
+            endpoint, payload = build_request(operation, rng, objectives)
+            start = time.perf_counter()
+            response = await client.post(endpoint, json=payload)
+            latencies[endpoint].append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors[endpoint] += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://gravrag-bench", timeout=None) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(worker_id, client) for worker_id in range(concurrency)))
+        wall_time = time.perf_counter() - start
+
+    endpoints = {}
+    for endpoint, samples in sorted(latencies.items()):
+        samples_ms = np.asarray(samples) * 1000
+        endpoints[endpoint] = {
+            "requests": len(samples),
+            "errors": errors[endpoint],
+            "throughput_rps": round(len(samples) / wall_time, 2),
+            "p50_ms": round(float(np.percentile(samples_ms, 50)), 3),
+            "p95_ms": round(float(np.percentile(samples_ms, 95)), 3),
+            "p99_ms": round(float(np.percentile(samples_ms, 99)), 3),
+        }
+    return {
+        "wall_time_s": round(wall_time, 3),
+        "throughput_rps": round(total_requests / wall_time, 2),
+        "endpoints": endpoints,
+    }
+
+
+def compare_to_baseline(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Compare per-endpoint p95 latency and throughput against a baseline run.
+    Returns a list of regression descriptions; empty when the run is within tolerance.
+    """
+    regressions = []
+    for endpoint, current in results["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(endpoint)
+        if previous is None:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{endpoint}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{endpoint}: throughput {previous['throughput_rps']} -> {current['throughput_rps']} req/s"
+            )
+    return regressions
+
+
+def format_report(results: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    lines = [f"{'endpoint':<32}{'req':>8}{'err':>6}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"]
+    for endpoint, stats in results["endpoints"].items():
+        line = (f"{endpoint:<32}{stats['requests']:>8}{stats['errors']:>6}{stats['throughput_rps']:>10}"
+                f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}")
+        previous = (baseline or {}).get("endpoints", {}).get(endpoint)
+        if previous:
+            change = (stats["p95_ms"] - previous["p95_ms"]) / previous["p95_ms"] * 100 if previous["p95_ms"] else 0.0
+            line += f"   p95 {change:+.1f}% vs baseline"
+        lines.append(line)
+    lines.append(f"total: {results['throughput_rps']} req/s over {results['wall_time_s']}s")
+    return "\n".join(lines)
+
+
+def build_app(args):
+    """ Build the FastAPI app around the GravRAG router with a MemoryManager for the chosen backend. """
+    from fastapi import FastAPI
+
+    if args.qdrant_url:
+        os.environ["QDRANT_LOCATION"] = args.qdrant_url
+    else:
+        os.environ.setdefault("QDRANT_LOCATION", ":memory:")
+
+    from gravrag import gravrag_api
+    from gravrag.gravrag import MemoryManager
+
+    model = HashingEncoder(args.dim) if args.encoder == "hash" else None
+    memory_manager = MemoryManager(collection_name=args.collection, model=model)
+    asyncio.run(memory_manager.purge_all_memories())  # Empties the collections behind the aliases, too
+    gravrag_api.memory_manager = memory_manager  # Replaces the lazy default before it builds its own manager
+
+    app = FastAPI(title="GravRAG benchmark")
+    app.include_router(gravrag_api.router, prefix="/gravrag")
+    return app, memory_manager
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="GravRAG API load and latency benchmark")
+    parser.add_argument("--corpus-size", type=int, default=10_000, help="Synthetic memories seeded before the run")
+    parser.add_argument("--requests", type=int, default=2_000, help="Total workload requests")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent asyncio clients")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Operation weights, e.g. create=0.2,recall=0.6,filter=0.2")
+    parser.add_argument("--objectives", type=int, default=100, help="Distinct objective_id values in the corpus")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--encoder", choices=["hash", "model"], default="hash",
+                        help="'hash' isolates API/Qdrant cost; 'model' loads the SentenceTransformer")
+    parser.add_argument("--dim", type=int, default=DEFAULT_DIM, help="Vector size for the hash encoder")
+    parser.add_argument("--qdrant-url", help="Local Qdrant server URL (default: in-memory Qdrant)")
+    parser.add_argument("--collection", default="MindBenchmark")
+    parser.add_argument("--output", help="Write this run's results to a JSON file")
+    parser.add_argument("--baseline", help="Compare against a baseline JSON written by --write-baseline")
+    parser.add_argument("--write-baseline", help="Write this run's results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed regression ratio against the baseline")
+    return parser
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.INFO)
+    args = build_parser().parse_args(argv)
+    mix = parse_mix(args.mix)
+
+    app, memory_manager = build_app(args)
+    seed_seconds = seed_corpus(memory_manager, args.corpus_size, args.seed, args.objectives)
+    logger.info(f"Seeded {args.corpus_size} memories in {seed_seconds:.1f}s.")
+
+    # Keep per-request logging out of the measurement
+    logging.getLogger().setLevel(logging.WARNING)
+    results = asyncio.run(run_workload(app, args.requests, args.concurrency, mix, args.seed, args.objectives))
+    results["config"] = {
+        key: value for key, value in vars(args).items() if key not in ("output", "baseline", "write_baseline")
+    }
+    results["seed_seconds"] = round(seed_seconds, 3)
+    results["environment"] = {"python": platform.python_version(), "platform": platform.platform()}
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print(format_report(results, baseline))
+
+    for path in (args.output, args.write_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(results, f, indent=2)
+
+    if baseline is not None:
+        if baseline.get("config", {}).get("corpus_size") != args.corpus_size:
+            print("warning: baseline was recorded with a different corpus size")
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+import os
+import json
+import base64
+import hashlib
+import binascii
+from typing import List, Dict, Any, Optional, Tuple
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import Filter
+
+from gravrag.gravrag_content import CONTENT_FIELD, COMPRESSED_FIELD, SIZE_FIELD, full_content
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = int(os.getenv("GRAVRAG_MAX_PAGE_SIZE", 1000))
+DEFAULT_FIELDS = ["content", "metadata"]
+
+
+def filter_fingerprint(**filters) -> str:
+    """ Short hash of a listing's filters; a cursor only resumes the listing it came from. """
+    return hashlib.sha1(json.dumps(filters, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+
+def encode_cursor(collection: int, offset: Any, fingerprint: str) -> str:
+    """ Opaque cursor: which collection of the listing to continue in, and Qdrant's next_page_offset there. """
+    raw = json.dumps({"c": collection, "o": offset, "f": fingerprint}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], fingerprint: str) -> Tuple[int, Any]:
+    """ (collection index, offset) of a cursor; raises ValueError for malformed or foreign cursors. """
+    if not cursor:
+        return 0, None
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        collection, offset, cursor_fingerprint = state["c"], state["o"], state["f"]
+    except (ValueError, binascii.Error, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if cursor_fingerprint != fingerprint:
+        raise ValueError("The cursor belongs to a listing with different filters")
+    if not isinstance(collection, int) or collection < 0:
+        raise ValueError("Invalid cursor")
+    return collection, offset
+
+
+def payload_selector(fields: List[str]) -> List[str]:
+    """
+    Payload keys to fetch for the requested fields: 'content' (full text), 'preview' (stored content, a preview
+    when compressed), 'metadata', 'metadata.<key>' and 'vector'. Raises ValueError for other fields.
+    """
+    keys = []
+    for field in fields:
+        if field == "content":
+            keys += [CONTENT_FIELD, COMPRESSED_FIELD]
+        elif field == "preview":
+            keys += [CONTENT_FIELD, SIZE_FIELD]
+        elif field in ("metadata", "vector") or (field.startswith("metadata.") and len(field) > len("metadata.")):
+            keys.append(field)
+        else:
+            raise ValueError(f"Unknown field '{field}'; expected content, preview, metadata, metadata.<key> or vector")
+    return list(dict.fromkeys(keys))
+
+
+def project(point, fields: List[str], tier: Optional[str] = None) -> Dict[str, Any]:
+    """ One listed memory: its ID and the requested fields. """
+    payload = point.payload or {}
+    item: Dict[str, Any] = {"id": str(point.id)}
+    for field in fields:
+        if field == "content":
+            item["content"] = full_content(payload)
+        elif field == "preview":
+            item["preview"] = payload.get(CONTENT_FIELD, "")
+            item["truncated"] = SIZE_FIELD in payload
+        elif field == "vector":
+            item["vector"] = payload.get("vector")
+        elif field == "metadata":
+            item["metadata"] = payload.get("metadata", {})
+        else:
+            metadata, key = payload.get("metadata") or {}, field[len("metadata."):]
+            if key in metadata:
+                item.setdefault("metadata", {})[key] = metadata[key]
+    if tier is not None:
+        item["tier"] = tier
+    return item
+
+
+def list_page(qdrant_client: QdrantClient, collections: List[Tuple[str, Optional[str]]],
+              query_filter: Optional[Filter], fields: List[str], limit: int, start: Tuple[int, Any],
+              fingerprint: str) -> Dict[str, Any]:
+    """
+    One page of a listing over `collections` ((name, tier) pairs, walked in order) with Qdrant scroll, plus
+    the cursor of the next page (None at the end). Only the page being built is held in memory, so walking
+    any number of memories costs the same per page.
+    """
+    index, offset = start
+    selector = payload_selector(fields)
+    memories: List[Dict[str, Any]] = []
+    while index < len(collections) and len(memories) < limit:
+        name, tier = collections[index]
+        points, offset = qdrant_client.scroll(
+            collection_name=name, scroll_filter=query_filter, limit=limit - len(memories), offset=offset,
+            with_payload=selector, with_vectors=False
+        )
+        memories.extend(project(point, fields, tier) for point in points)
+        if offset is None:
+            index += 1
+    next_cursor = encode_cursor(index, offset, fingerprint) if index < len(collections) else None
+    return {"memories": memories, "next_cursor": next_cursor}
@@ -0,0 +1,148 @@
+import os
+import time
+import logging
+import threading
+from typing import List, Dict, Any, Optional
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import OptimizersConfigDiff, CollectionStatus
+
+from gravrag.gravrag_aliases import physical_name
+
+logger = logging.getLogger(__name__)
+
+BULK_INDEXING_THRESHOLD = int(os.getenv("GRAVRAG_BULK_INDEXING_THRESHOLD", 0))  # 0 turns HNSW indexing off
+SERVER_DEFAULT_INDEXING_THRESHOLD = 20000  # Qdrant's default (kB), restored when a collection reports none
+GREEN_TIMEOUT_SECONDS = float(os.getenv("GRAVRAG_BULK_GREEN_TIMEOUT_SECONDS", 1800))
+POLL_INTERVAL_SECONDS = 0.5
+
+# Collections in bulk-load mode in this process: physical name -> [active loads, indexing threshold to restore]
+_active: Dict[str, list] = {}
+_active_lock = threading.Lock()
+
+
+def wait_for_green(qdrant_client: QdrantClient, collection_name: str, timeout: float = GREEN_TIMEOUT_SECONDS,
+                   poll_interval: float = POLL_INTERVAL_SECONDS) -> str:
+    """
+    Poll until the collection's optimizers are done (status green) or `timeout` seconds pass, and return the
+    last status. A grey collection has optimizations waiting for the next update; an empty optimizer config
+    update starts them.
+    """
+    deadline = time.monotonic() + timeout
+    nudged = False
+    while True:
+        status = qdrant_client.get_collection(collection_name).status
+        if status == CollectionStatus.GREEN:
+            return status.value
+        if status == CollectionStatus.GREY and not nudged:
+            qdrant_client.update_collection(collection_name=collection_name, optimizers_config=OptimizersConfigDiff())
+            nudged = True
+        if time.monotonic() >= deadline:
+            logger.warning(f"Collection '{collection_name}' is still {status.value} after {timeout:.0f}s.")
+            return status.value
+        time.sleep(poll_interval)
+
+
+class BulkLoad:
+    """
+    Context manager suspending HNSW indexing on collections for the duration of a large ingest:
+
+        with BulkLoad(client, ["Mind"]) as bulk:
+            ...  # batched upserts
+        print(bulk.report())
+
+    On entry, each collection's `indexing_threshold` is lowered to `indexing_threshold` (0 disables
+    indexing), so upserts land in plain segments instead of rebuilding HNSW graphs over and over. On
+    exit, the previous threshold is restored and the collection is awaited until it is green again,
+    so the index is built once over the final data. Searches stay correct in the meantime, but unindexed
+    segments are searched exhaustively and are slower. Nested or concurrent bulk loads of a collection
+    in the same process share one suspension, restored when the last one exits.
+    """
+
+    def __init__(self, qdrant_client: QdrantClient, collection_names: List[str],
+                 indexing_threshold: int = BULK_INDEXING_THRESHOLD, wait: bool = True,
+                 green_timeout: float = GREEN_TIMEOUT_SECONDS):
+        self.qdrant_client = qdrant_client
+        self.collection_names = collection_names
+        self.indexing_threshold = indexing_threshold
+        self.wait = wait
+        self.green_timeout = green_timeout
+        self.suspended: Dict[str, Optional[int]] = {}  # Collections this load suspended -> their previous threshold
+        self.statuses: Dict[str, str] = {}
+        self.started_at: Optional[float] = None
+        self.ingest_seconds: Optional[float] = None
+        self.index_seconds: Optional[float] = None
+        self._physical: List[str] = []
+
+    def __enter__(self) -> "BulkLoad":
+        self.started_at = time.perf_counter()
+        try:
+            for name in self.collection_names:
+                collection = physical_name(self.qdrant_client, name)
+                if collection is None:
+                    raise ValueError(f"Collection '{name}' does not exist")
+                with _active_lock:
+                    if collection in _active:
+                        _active[collection][0] += 1
+                    else:
+                        config = self.qdrant_client.get_collection(collection).config
+                        previous = config.optimizer_config.indexing_threshold
+                        self.qdrant_client.update_collection(
+                            collection_name=collection,
+                            optimizers_config=OptimizersConfigDiff(indexing_threshold=self.indexing_threshold)
+                        )
+                        _active[collection] = [1, previous]
+                        self.suspended[name] = previous
+                        logger.info(f"Bulk load: indexing threshold of '{collection}' lowered from {previous} "
+                                    f"to {self.indexing_threshold}.")
+                self._physical.append(collection)
+        except Exception:
+            # `with` never calls __exit__ for a failed __enter__, so collections suspended so far are restored here
+            self._release()
+            self.suspended = {}
+            raise
+        return self
+
+    def _release(self) -> List[str]:
+        """
+        Drop this load's hold on its collections and restore the indexing threshold of those no other load
+        still holds. Returns the collections restored.
+        """
+        restored = []
+        for collection in self._physical:
+            with _active_lock:
+                _active[collection][0] -= 1
+                if _active[collection][0] > 0:
+                    continue
+                _, previous = _active.pop(collection)
+            threshold = SERVER_DEFAULT_INDEXING_THRESHOLD if previous is None else previous
+            self.qdrant_client.update_collection(
+                collection_name=collection, optimizers_config=OptimizersConfigDiff(indexing_threshold=threshold)
+            )
+            logger.info(f"Bulk load: indexing threshold of '{collection}' restored to {threshold}.")
+            restored.append(collection)
+        self._physical = []
+        return restored
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.ingest_seconds = time.perf_counter() - self.started_at
+        # Restore even after a failed ingest, so the collection is never left unindexed
+        restored = self._release()
+        index_start = time.perf_counter()
+        if self.wait:
+            for collection in restored:
+                self.statuses[collection] = wait_for_green(self.qdrant_client, collection, self.green_timeout)
+        self.index_seconds = time.perf_counter() - index_start
+        return False
+
+    def report(self) -> Dict[str, Any]:
+        total = (self.ingest_seconds or 0.0) + (self.index_seconds or 0.0)
+        return {
+            "collections": self.collection_names,
+            "indexing_threshold": self.indexing_threshold,
+            "previous_thresholds": self.suspended,
+            "statuses": self.statuses,
+            "ingest_seconds": round(self.ingest_seconds, 3) if self.ingest_seconds is not None else None,
+            "index_seconds": round(self.index_seconds, 3) if self.index_seconds is not None else None,
+            "total_seconds": round(total, 3),
+        }
@@ -0,0 +1,118 @@
+"""
+Wall time of a large ingest with and without bulk-load mode (gravrag_bulk.BulkLoad).
+
+Both paths upsert the same synthetic vectors into a fresh collection with the same batch size and
+parallelism, then wait until the collection is green, i.e. fully indexed and ready to serve. The
+default path lets Qdrant build HNSW segments while points arrive. The bulk path suspends indexing
+during the upserts and builds the index once at the end. Reported per path: ingest, index-wait
+and total seconds, and points/second over the total.
+
+Local mode (the default) has no HNSW index or optimizer, so both paths measure the same work there;
+pass --qdrant-url for representative numbers.
+
+Usage (from backend/app):
+    python -m gravrag.gravrag_bulk_benchmark --points 1000000 --qdrant-url http://localhost:6333
+"""
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct, VectorParams, Distance
+
+from gravrag.gravrag_bulk import BulkLoad, wait_for_green
+
+logger = logging.getLogger(__name__)
+
+COLLECTION_PREFIX = "bulk_bench"
+
+
+def ingest(client: QdrantClient, collection_name: str, vectors: np.ndarray, batch_size: int, parallel: int,
+           bulk: bool) -> Dict[str, Any]:
+    client.create_collection(collection_name, vectors_config=VectorParams(size=vectors.shape[1], distance=Distance.COSINE))
+
+    def upsert(start: int):
+        client.upsert(collection_name, wait=True, points=[
+            PointStruct(id=start + row, vector=vector.tolist(), payload={"row": start + row})
+            for row, vector in enumerate(vectors[start:start + batch_size])
+        ])
+
+    start = time.perf_counter()
+    bulk_load = BulkLoad(client, [collection_name], wait=False) if bulk else contextlib.nullcontext()
+    with bulk_load, ThreadPoolExecutor(max_workers=parallel) as executor:
+        list(executor.map(upsert, range(0, len(vectors), batch_size)))
+    ingested = time.perf_counter()
+    status = wait_for_green(client, collection_name)
+    finished = time.perf_counter()
+
+    total = finished - start
+    return {
+        "points": len(vectors),
+        "status": status,
+        "ingest_seconds": round(ingested - start, 3),
+        "index_seconds": round(finished - ingested, 3),
+        "total_seconds": round(total, 3),
+        "points_per_second": round(len(vectors) / total, 1) if total > 0 else None,
+    }
+
+
+def format_report(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'path':<9}{'points':>10}{'ingest s':>11}{'index s':>10}{'total s':>10}{'points/s':>11}"]
+    for row in rows:
+        lines.append(
+            f"{row['path']:<9}{row['points']:>10}{row['ingest_seconds']:>11}{row['index_seconds']:>10}"
+            f"{row['total_seconds']:>10}{row['points_per_second']:>11}"
+        )
+    if len(rows) == 2 and rows[1]["total_seconds"] > 0:
+        lines.append(f"speedup: {rows[0]['total_seconds'] / rows[1]['total_seconds']:.2f}x")
+    return "\n".join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Compare ingest wall time with and without bulk-load mode.")
+    parser.add_argument("--points", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--parallel", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--qdrant-url", help="Qdrant server (default: in-memory local mode)")
+    parser.add_argument("--output", help="Write the JSON results here")
+    return parser
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.WARNING)
+    args = build_parser().parse_args(argv)
+    client = QdrantClient(url=args.qdrant_url) if args.qdrant_url else QdrantClient(location=":memory:")
+    vectors = np.random.default_rng(args.seed).standard_normal((args.points, args.dim)).astype(np.float32)
+
+    rows = []
+    for path, bulk in (("default", False), ("bulk", True)):
+        collection_name = f"{COLLECTION_PREFIX}_{path}"
+        if client.collection_exists(collection_name):
+            client.delete_collection(collection_name)
+        try:
+            rows.append({"path": path, **ingest(client, collection_name, vectors, args.batch_size, args.parallel, bulk)})
+        finally:
+            client.delete_collection(collection_name)
+    print(format_report(rows))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "config": vars(args),
+                "results": rows,
+                "environment": {"python": platform.python_version(), "platform": platform.platform()},
+            }, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
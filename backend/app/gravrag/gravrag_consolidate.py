@@ -0,0 +1,290 @@
+import math
+import time
+import uuid
+import random
+import logging
+from typing import List, Dict, Any, Optional, Iterator, Tuple, Union, Callable
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+from qdrant_client import QdrantClient
+from qdrant_client.models import Filter, FieldCondition, MatchValue, Range, PointStruct, PointIdsList
+
+from gravrag.gravrag_projection import VectorLayout
+from gravrag.gravrag_content import full_content, content_payload
+from gravrag.gravrag_graph import unlink_points
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SPACETIME_THRESHOLD = 1e-6
+DEFAULT_MIN_AGE_SECONDS = 7 * 24 * 3600
+DEFAULT_TARGET_RATIO = 0.1  # Aim for one summary per ~10 cold memories
+DEFAULT_BATCH_SIZE = 1000
+MAX_CLUSTERS = 2048
+PREVIEW_MEMBERS = 3  # Member contents quoted in a summary besides the representative
+
+
+def _cold_filter(objective_id: Union[int, str], min_age_seconds: float, now: float) -> Filter:
+    """ Server-side pre-filter: memories of one objective old enough to possibly be cold. """
+    return Filter(must=[
+        FieldCondition(key="metadata.objective_id", match=MatchValue(value=objective_id)),
+        FieldCondition(key="metadata.timestamp", range=Range(lte=now - min_age_seconds)),
+    ])
+
+
+def _spacetime_now(metadata: Dict[str, Any], now: float) -> float:
+    """ Spacetime coordinate decayed to `now` (the stored value is computed at write time). """
+    age = now - float(metadata.get("timestamp", now))
+    return float(metadata.get("gravitational_pull", 0.0)) / (1 + max(age, 0.0))
+
+
+def _stream_cold(qdrant_client: QdrantClient, collection_name: str, scroll_filter: Filter, threshold: float,
+                 now: float, batch_size: int, layout: VectorLayout) -> Iterator[Tuple[list, np.ndarray]]:
+    """ Yield (points, unit vectors) pages of memories whose decayed spacetime coordinate is below threshold. """
+    offset = None
+    while True:
+        points, offset = qdrant_client.scroll(
+            collection_name=collection_name,
+            scroll_filter=scroll_filter,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=layout.with_vectors(full=True)
+        )
+        cold = [point for point in points if _spacetime_now(point.payload.get("metadata", {}), now) < threshold]
+        if cold:
+            vectors = np.asarray([layout.extract(point) for point in cold], dtype=np.float64)
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            yield cold, vectors / np.where(norms > 0, norms, 1.0)
+        if offset is None:
+            return
+
+
+def discover_objectives(qdrant_client: QdrantClient, collection_name: str, min_age_seconds: float,
+                        batch_size: int = DEFAULT_BATCH_SIZE) -> List[Union[int, str]]:
+    """
+    Distinct objective_id values among memories older than `min_age_seconds`, reading only that field.
+    Values keep their stored type, since the cold filter matches 42 and "42" separately.
+    """
+    objectives, offset = set(), None
+    age_filter = Filter(must=[FieldCondition(key="metadata.timestamp", range=Range(lte=time.time() - min_age_seconds))])
+    while True:
+        points, offset = qdrant_client.scroll(
+            collection_name=collection_name,
+            scroll_filter=age_filter,
+            limit=batch_size,
+            offset=offset,
+            with_payload=["metadata.objective_id"],
+            with_vectors=False
+        )
+        for point in points:
+            objective_id = (point.payload.get("metadata") or {}).get("objective_id")
+            if objective_id is not None:
+                objectives.add(objective_id)
+        if offset is None:
+            return sorted(objectives, key=lambda objective: (type(objective).__name__, str(objective)))
+
+
+def _recall_at_k(qdrant_client: QdrantClient, collection_name: str, queries: np.ndarray, k: int,
+                 ground_truth: List[List[Any]], replaced_by: Optional[Dict[Any, Any]] = None,
+                 layout: Optional[VectorLayout] = None) -> float:
+    """
+    Mean recall@k of approximate (HNSW) search against exact-search ground truth.
+    IDs merged into a summary count as found when their summary is returned.
+    """
+    if not len(queries):
+        return 1.0
+    replaced_by = replaced_by or {}
+    layout = layout or VectorLayout()
+    responses = layout.run_batch(
+        qdrant_client, collection_name,
+        [layout.search_request(query.tolist(), None, k, with_payload=False) for query in queries]
+    )
+    scores = []
+    for truth, hits in zip(ground_truth, responses):
+        expected = {replaced_by.get(point_id, point_id) for point_id in truth}
+        found = {hit.id for hit in hits}
+        scores.append(len(expected & found) / len(expected) if expected else 1.0)
+    return float(np.mean(scores))
+
+
+def consolidate_objective(qdrant_client: QdrantClient, collection_name: str, objective_id: Union[int, str],
+                          spacetime_threshold: float = DEFAULT_SPACETIME_THRESHOLD,
+                          min_age_seconds: float = DEFAULT_MIN_AGE_SECONDS,
+                          target_ratio: float = DEFAULT_TARGET_RATIO, min_cluster_size: int = 2,
+                          batch_size: int = DEFAULT_BATCH_SIZE, eval_queries: int = 50, k: int = 10,
+                          dry_run: bool = False, seed: int = 0, layout: Optional[VectorLayout] = None,
+                          on_delete: Optional[Callable[[List[Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Replace the cold memories of one objective with cluster summaries.
+
+    Pass 1 streams cold memories into MiniBatchKMeans.partial_fit; pass 2 streams them again to assign
+    clusters and accumulate centroids, member IDs, recall counts and a representative memory. Each cluster
+    with at least `min_cluster_size` members becomes one summary memory referencing the merged point IDs,
+    after which the members are deleted, unlinked from their neighbours' graph lists and passed to
+    `on_delete` (e.g. to drop them from working memory). recall@k against exact search is measured before
+    and after.
+    """
+    start = time.perf_counter()
+    now = time.time()
+    layout = layout or VectorLayout()
+    scroll_filter = _cold_filter(objective_id, min_age_seconds, now)
+    report = {"objective_id": objective_id, "cold_points": 0, "clusters": 0, "summaries_written": 0,
+              "points_removed": 0, "shrink_ratio": 1.0, "dry_run": dry_run}
+
+    candidates = qdrant_client.count(collection_name, count_filter=scroll_filter, exact=True).count
+    n_clusters = min(MAX_CLUSTERS, max(1, int(math.ceil(candidates * target_ratio))))
+    if candidates < max(min_cluster_size, 2):
+        return report
+
+    # Pass 1: fit clusters on the stream. Pages are buffered until the first fit has enough samples.
+    kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=seed, batch_size=max(batch_size, n_clusters))
+    buffered, fitted = [], False
+    for _, vectors in _stream_cold(qdrant_client, collection_name, scroll_filter, spacetime_threshold, now, batch_size, layout):
+        buffered.append(vectors)
+        if sum(len(chunk) for chunk in buffered) >= n_clusters:
+            kmeans.partial_fit(np.vstack(buffered))
+            buffered, fitted = [], True
+    if buffered and fitted:
+        kmeans.partial_fit(np.vstack(buffered))
+    if not fitted:
+        # Fewer cold memories than clusters after the client-side decay check; collapse into one cluster
+        leftover = np.vstack(buffered) if buffered else np.empty((0, 0))
+        if len(leftover) < max(min_cluster_size, 2):
+            return report
+        kmeans = MiniBatchKMeans(n_clusters=1, random_state=seed).fit(leftover)
+        n_clusters = 1
+
+    # Pass 2: assign, accumulate per-cluster aggregates and reservoir-sample evaluation queries
+    rng = random.Random(seed)
+    dim = kmeans.cluster_centers_.shape[1]
+    sums = np.zeros((n_clusters, dim))
+    members: List[List[Any]] = [[] for _ in range(n_clusters)]
+    recall_counts = np.zeros(n_clusters)
+    latest = np.zeros(n_clusters)
+    best_distance = np.full(n_clusters, np.inf)
+    representative: List[Optional[Dict[str, Any]]] = [None] * n_clusters
+    previews: List[List[str]] = [[] for _ in range(n_clusters)]
+    tags: List[set] = [set() for _ in range(n_clusters)]
+    sample: List[np.ndarray] = []
+    seen = 0
+
+    for points, vectors in _stream_cold(qdrant_client, collection_name, scroll_filter, spacetime_threshold, now, batch_size, layout):
+        labels = kmeans.predict(vectors)
+        distances = np.linalg.norm(vectors - kmeans.cluster_centers_[labels], axis=1)
+        np.add.at(sums, labels, vectors)
+        for point, vector, label, distance in zip(points, vectors, labels, distances):
+            metadata = point.payload.get("metadata", {})
+            members[label].append(point.id)
+            recall_counts[label] += metadata.get("recall_count", 0)
+            latest[label] = max(latest[label], float(metadata.get("timestamp", 0.0)))
+            tags[label].update(metadata.get("tags") or [])
+            if distance < best_distance[label]:
+                best_distance[label] = distance
+                representative[label] = point.payload
+            elif len(previews[label]) < PREVIEW_MEMBERS:
+                previews[label].append(point.payload.get("content", ""))  # Already a preview when compressed
+
+            seen += 1
+            if len(sample) < eval_queries:
+                sample.append(vector)
+            elif rng.random() < eval_queries / seen:
+                sample[rng.randrange(eval_queries)] = vector
+
+    report["cold_points"] = seen
+    report["clusters"] = int(sum(1 for cluster in members if cluster))
+    queries = np.asarray(sample)
+    ground_truth = []
+    if len(queries):
+        exact = qdrant_client.search_batch(
+            collection_name=collection_name,
+            requests=[layout.exact_search_request(query.tolist(), k) for query in queries]
+        )
+        ground_truth = [[hit.id for hit in hits] for hits in exact]
+    report["recall_at_k_before"] = _recall_at_k(qdrant_client, collection_name, queries, k, ground_truth, layout=layout)
+    report["k"] = k
+
+    summaries, replaced_by = [], {}
+    for label in range(n_clusters):
+        if len(members[label]) < min_cluster_size:
+            continue
+        summary_id = str(uuid.uuid4())
+        centroid = (sums[label] / len(members[label])).tolist()
+        content = full_content(representative[label])
+        if previews[label]:
+            content += "\n" + "\n".join(f"- {preview}" for preview in previews[label])
+        metadata = {
+            "objective_id": objective_id,
+            "consolidated": True,
+            "consolidated_from": [str(point_id) for point_id in members[label]],
+            "consolidated_count": len(members[label]),
+            "consolidated_at": now,
+            "recall_count": int(recall_counts[label]),
+            "timestamp": latest[label],
+            "tags": sorted(str(tag) for tag in tags[label]),
+            "memetic_similarity": 1.0,
+            "semantic_relativity": 1.0,
+        }
+        magnitude = float(np.linalg.norm(centroid))
+        metadata["gravitational_pull"] = magnitude * (1 + math.log1p(metadata["recall_count"]))
+        metadata["spacetime_coordinate"] = metadata["gravitational_pull"] / (1 + max(now - metadata["timestamp"], 0.0))
+        summaries.append(PointStruct(
+            id=summary_id,
+            vector=layout.point_vector(centroid),
+            payload={"vector": centroid, **content_payload(f"Consolidated from {len(members[label])} memories: {content}"),
+                     "metadata": metadata}
+        ))
+        replaced_by.update({point_id: summary_id for point_id in members[label]})
+
+    removed = len(replaced_by)
+    report["summaries_written"] = len(summaries)
+    report["points_removed"] = removed
+    report["shrink_ratio"] = round(seen / (seen - removed + len(summaries)), 3) if seen else 1.0
+
+    if not dry_run and summaries:
+        for chunk_start in range(0, len(summaries), batch_size):
+            qdrant_client.upsert(collection_name=collection_name, points=summaries[chunk_start:chunk_start + batch_size])
+        merged_ids = list(replaced_by)
+        for chunk_start in range(0, len(merged_ids), batch_size):
+            qdrant_client.delete(
+                collection_name=collection_name,
+                points_selector=PointIdsList(points=merged_ids[chunk_start:chunk_start + batch_size])
+            )
+        if on_delete is not None:
+            on_delete(merged_ids)
+        report["neighbor_lists_updated"] = unlink_points(qdrant_client, collection_name, merged_ids, batch_size)
+        report["recall_at_k_after"] = _recall_at_k(
+            qdrant_client, collection_name, queries, k, ground_truth, replaced_by, layout
+        )
+
+    report["seconds"] = round(time.perf_counter() - start, 3)
+    logger.info(f"Consolidated objective '{objective_id}': {report}")
+    return report
+
+
+def consolidate_memories(qdrant_client: QdrantClient, collection_names: List[str],
+                         objective_id: Optional[Union[int, str]] = None,
+                         **options) -> Dict[str, Any]:
+    """
+    Consolidate cold memories of one objective, or of every objective with old enough memories, in each of
+    the collections (e.g. the hot and cold tiers). Summaries stay in the collection of their members.
+    Returns per-objective reports, naming their collection, plus the overall shrink ratio.
+    """
+    min_age_seconds = options.get("min_age_seconds", DEFAULT_MIN_AGE_SECONDS)
+    batch_size = options.get("batch_size", DEFAULT_BATCH_SIZE)
+    reports = []
+    for collection_name in collection_names:
+        objectives = [objective_id] if objective_id is not None else discover_objectives(
+            qdrant_client, collection_name, min_age_seconds, batch_size
+        )
+        for objective in objectives:
+            report = consolidate_objective(qdrant_client, collection_name, objective, **options)
+            reports.append({"collection": collection_name, **report})
+
+    cold = sum(report["cold_points"] for report in reports)
+    remaining = cold - sum(report["points_removed"] - report["summaries_written"] for report in reports)
+    return {
+        "objectives": reports,
+        "cold_points": cold,
+        "shrink_ratio": round(cold / remaining, 3) if remaining else 1.0,
+    }
@@ -0,0 +1,66 @@
+import os
+import zlib
+import base64
+import logging
+from typing import List, Dict, Any
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import PayloadSelectorExclude
+
+logger = logging.getLogger(__name__)
+
+CONTENT_FIELD = "content"  # Full content, or a preview of compressed content
+COMPRESSED_FIELD = "content_zlib"  # Base64 of the zlib-compressed UTF-8 content
+SIZE_FIELD = "content_bytes"  # Uncompressed size in bytes, only on compressed memories
+COMPRESS_THRESHOLD = int(os.getenv("GRAVRAG_COMPRESS_THRESHOLD", 4096))  # Bytes; 0 stores all content raw
+PREVIEW_CHARS = int(os.getenv("GRAVRAG_PREVIEW_CHARS", 280))
+COMPRESSION_LEVEL = 6
+
+# Search results carry previews and metadata only; full content is fetched for the final top_k
+SEARCH_PAYLOAD = PayloadSelectorExclude(exclude=[COMPRESSED_FIELD])
+
+
+def preview(content: str, chars: int = PREVIEW_CHARS) -> str:
+    return content if len(content) <= chars else content[:chars].rstrip() + "…"
+
+
+def content_payload(content: str, threshold: int = COMPRESS_THRESHOLD) -> Dict[str, Any]:
+    """
+    Payload fields storing `content`: as-is below `threshold` bytes, otherwise a preview in `content`, the
+    compressed text in `content_zlib` and the original size in `content_bytes`. Content that does not
+    shrink by compression is stored as-is.
+    """
+    raw = content.encode("utf-8")
+    if threshold <= 0 or len(raw) < threshold:
+        return {CONTENT_FIELD: content}
+    compressed = base64.b64encode(zlib.compress(raw, COMPRESSION_LEVEL)).decode("ascii")
+    if len(compressed) >= len(raw):
+        return {CONTENT_FIELD: content}
+    return {CONTENT_FIELD: preview(content), COMPRESSED_FIELD: compressed, SIZE_FIELD: len(raw)}
+
+
+def is_compressed(payload: Dict[str, Any]) -> bool:
+    """ Whether a payload's `content` is only a preview (its compressed field may have been left out of a fetch). """
+    return SIZE_FIELD in payload
+
+
+def decompress(compressed: str) -> str:
+    return zlib.decompress(base64.b64decode(compressed)).decode("utf-8")
+
+
+def full_content(payload: Dict[str, Any]) -> str:
+    """ The complete content of a payload fetched with its compressed field. """
+    if COMPRESSED_FIELD in payload:
+        return decompress(payload[COMPRESSED_FIELD])
+    return payload.get(CONTENT_FIELD, "")
+
+
+def fetch_contents(qdrant_client: QdrantClient, collection_name: str, point_ids: List[Any]) -> Dict[Any, str]:
+    """ Full content of compressed memories, fetching only their compressed field, in one retrieve. """
+    if not point_ids:
+        return {}
+    points = qdrant_client.retrieve(
+        collection_name=collection_name, ids=list(point_ids), with_payload=[COMPRESSED_FIELD], with_vectors=False
+    )
+    return {point.id: decompress(point.payload[COMPRESSED_FIELD]) for point in points
+            if COMPRESSED_FIELD in (point.payload or {})}
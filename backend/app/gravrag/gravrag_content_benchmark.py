@@ -0,0 +1,144 @@
+"""
+Storage and recall latency of large-content memories stored raw and compressed (gravrag_content).
+
+Both paths store the same synthetic corpus of long documents in a fresh collection: the raw path keeps
+the full text in `content`, the compressed path stores it zlib-compressed behind a short preview. Each
+recall searches `--candidates` memories, as the re-ranking stage does, and returns the full content of
+the best `--top-k`: the raw path reads every candidate's full text in the search, the compressed path
+searches previews and metadata only and then fetches and decompresses the top_k. Reported per path:
+payload bytes (JSON-serialized, as Qdrant stores it), bytes per memory and recall p50/p95/p99.
+
+Synthetic documents draw from a small vocabulary and compress better than real text. Local mode (the
+default) hands payloads over in-process, so the raw path pays nothing for reading full text and only the
+extra retrieve of the compressed path shows; pass --qdrant-url for representative latencies, where every
+candidate's full text is serialized and sent over the network.
+
+Usage (from backend/app):
+    python -m gravrag.gravrag_content_benchmark --memories 5000 --content-words 2000
+"""
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+from typing import List, Dict, Any
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct, VectorParams, Distance
+
+from gravrag.gravrag_benchmark import HashingEncoder, synthetic_text
+from gravrag.gravrag_content import content_payload, fetch_contents, SEARCH_PAYLOAD
+
+logger = logging.getLogger(__name__)
+
+COLLECTION_PREFIX = "content_bench"
+BATCH_SIZE = 256
+
+
+def store(client: QdrantClient, collection_name: str, texts: List[str], vectors: np.ndarray, compress: bool) -> int:
+    """ Store the corpus and return the total JSON size of the payloads written. """
+    client.create_collection(collection_name, vectors_config=VectorParams(size=vectors.shape[1], distance=Distance.COSINE))
+    total_bytes = 0
+    for start in range(0, len(texts), BATCH_SIZE):
+        points = []
+        for row in range(start, min(start + BATCH_SIZE, len(texts))):
+            payload = {"content": texts[row], "metadata": {"row": row}}
+            if compress:
+                payload.update(content_payload(texts[row]))
+            total_bytes += len(json.dumps(payload))
+            points.append(PointStruct(id=row, vector=vectors[row].tolist(), payload=payload))
+        client.upsert(collection_name, points=points, wait=True)
+    return total_bytes
+
+
+def recall_latencies(client: QdrantClient, collection_name: str, queries: np.ndarray, candidates: int, top_k: int,
+                     compress: bool) -> List[float]:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        hits = client.search(collection_name, query_vector=query.tolist(), limit=candidates,
+                             with_payload=SEARCH_PAYLOAD if compress else True)
+        contents = {hit.id: hit.payload["content"] for hit in hits[:top_k]}
+        if compress:
+            contents.update(fetch_contents(client, collection_name, list(contents)))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def run_path(client: QdrantClient, args, texts: List[str], vectors: np.ndarray, queries: np.ndarray,
+             compress: bool) -> Dict[str, Any]:
+    collection_name = f"{COLLECTION_PREFIX}_{'compressed' if compress else 'raw'}"
+    if client.collection_exists(collection_name):
+        client.delete_collection(collection_name)
+    try:
+        payload_bytes = store(client, collection_name, texts, vectors, compress)
+        recall_latencies(client, collection_name, queries[:10], args.candidates, args.top_k, compress)  # Warm-up
+        latencies = recall_latencies(client, collection_name, queries, args.candidates, args.top_k, compress)
+    finally:
+        client.delete_collection(collection_name)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "path": "compressed" if compress else "raw",
+        "payload_bytes": payload_bytes,
+        "bytes_per_memory": round(payload_bytes / len(texts), 1),
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+    }
+
+
+def format_report(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'path':<12}{'payload MB':>12}{'bytes/mem':>12}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"]
+    for row in rows:
+        lines.append(
+            f"{row['path']:<12}{row['payload_bytes'] / 1e6:>12.2f}{row['bytes_per_memory']:>12}"
+            f"{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}"
+        )
+    if len(rows) == 2 and rows[1]["payload_bytes"] and rows[1]["p50_ms"]:
+        lines.append(f"storage saved: {1 - rows[1]['payload_bytes'] / rows[0]['payload_bytes']:.1%}, "
+                     f"p50 speedup: {rows[0]['p50_ms'] / rows[1]['p50_ms']:.2f}x")
+    return "\n".join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Compare raw and compressed memory content storage and recall.")
+    parser.add_argument("--memories", type=int, default=2000)
+    parser.add_argument("--content-words", type=int, default=2000, help="Words per synthetic document")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--candidates", type=int, default=50, help="Memories searched per recall")
+    parser.add_argument("--top-k", type=int, default=5, help="Memories whose full content a recall returns")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--qdrant-url", help="Qdrant server (default: in-memory local mode)")
+    parser.add_argument("--output", help="Write the JSON results here")
+    return parser
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.WARNING)
+    args = build_parser().parse_args(argv)
+    client = QdrantClient(url=args.qdrant_url) if args.qdrant_url else QdrantClient(location=":memory:")
+    rng = random.Random(args.seed)
+    encoder = HashingEncoder(args.dim)
+    texts = [synthetic_text(rng, args.content_words) for _ in range(args.memories)]
+    vectors = encoder.encode(texts)
+    queries = encoder.encode([synthetic_text(rng) for _ in range(args.queries)])
+
+    rows = [run_path(client, args, texts, vectors, queries, compress) for compress in (False, True)]
+    print(format_report(rows))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "config": vars(args),
+                "results": rows,
+                "environment": {"python": platform.python_version(), "platform": platform.platform()},
+            }, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+import os
+import time
+import logging
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import Filter, FieldCondition, MatchAny, SetPayload, SetPayloadOperation
+
+from gravrag.gravrag_projection import VectorLayout
+
+logger = logging.getLogger(__name__)
+
+# Top-level payload keys holding a memory's nearest neighbours, best first, and their cosine similarities
+NEIGHBORS_FIELD = "neighbors"
+NEIGHBOR_SCORES_FIELD = "neighbor_scores"
+GRAPH_K = int(os.getenv("GRAVRAG_GRAPH_K", 0))  # Neighbours linked on insert; 0 (default) leaves the graph to repair_graph
+DEFAULT_K = GRAPH_K or 8  # Neighbours per memory kept by repair_graph
+DEFAULT_BATCH_SIZE = 256
+REPAIR_INTERVAL_SECONDS = float(os.getenv("GRAVRAG_GRAPH_REPAIR_INTERVAL_SECONDS", 300))  # Background repair; 0 disables
+
+
+def neighbor_payload(hits, k: int, exclude_id: Any = None) -> Dict[str, list]:
+    """ Neighbour payload fields from search hits (already sorted best first), skipping `exclude_id`. """
+    hits = [hit for hit in hits if hit.id != exclude_id][:k]
+    return {NEIGHBORS_FIELD: [hit.id for hit in hits], NEIGHBOR_SCORES_FIELD: [float(hit.score) for hit in hits]}
+
+
+def _insert_neighbor(payload: Dict[str, Any], point_id: Any, score: float, k: int) -> Optional[Dict[str, list]]:
+    """ The neighbour fields of `payload` with `point_id` merged in, or None when it does not make the top k. """
+    neighbors = list(payload.get(NEIGHBORS_FIELD) or [])
+    scores = list(payload.get(NEIGHBOR_SCORES_FIELD) or [])
+    if point_id in neighbors or (len(neighbors) >= k and scores and score <= scores[-1]):
+        return None
+    position = next((i for i, existing in enumerate(scores) if score > existing), len(scores))
+    neighbors.insert(position, point_id)
+    scores.insert(position, score)
+    return {NEIGHBORS_FIELD: neighbors[:k], NEIGHBOR_SCORES_FIELD: scores[:k]}
+
+
+def link_new_point(qdrant_client: QdrantClient, collection_name: str, point_id: Any, hits, k: int = DEFAULT_K) -> int:
+    """
+    Add the reverse edges of a freshly inserted point: every neighbour found by its insert-time search
+    gets the new point in its own list when it ranks in that neighbour's top k. All updates go out in one
+    batch call. Concurrent inserts may overwrite each other's reverse edges; repair_graph restores them.
+    Returns the number of neighbours updated.
+    """
+    operations = []
+    for hit in hits:
+        if hit.id == point_id:
+            continue
+        updated = _insert_neighbor(hit.payload or {}, point_id, float(hit.score), k)
+        if updated is not None:
+            operations.append(SetPayloadOperation(set_payload=SetPayload(payload=updated, points=[hit.id])))
+    if operations:
+        qdrant_client.batch_update_points(collection_name=collection_name, update_operations=operations)
+    return len(operations)
+
+
+def _dangling(qdrant_client: QdrantClient, collection_name: str, points) -> set:
+    """ IDs of points in the page whose neighbour lists reference deleted points. """
+    referenced = {neighbor for point in points for neighbor in (point.payload or {}).get(NEIGHBORS_FIELD) or []}
+    if not referenced:
+        return set()
+    existing = {point.id for point in qdrant_client.retrieve(
+        collection_name=collection_name, ids=list(referenced), with_payload=False, with_vectors=False
+    )}
+    missing = referenced - existing
+    return {point.id for point in points if missing.intersection((point.payload or {}).get(NEIGHBORS_FIELD) or [])}
+
+
+def _reverse_edges(qdrant_client: QdrantClient, collection_name: str, linked: List[Tuple[Any, list]],
+                   lists: Dict[Any, Dict[str, list]], k: int) -> Dict[Any, Dict[str, list]]:
+    """
+    The reverse edges of points linked for the first time, as link_new_point adds them on insert: each
+    (point ID, hits) pair puts the point into the lists of its hits where it ranks in their top k. `lists`
+    holds the neighbour fields already computed in this page; other hits are fetched in one retrieve.
+    Returns the updated neighbour fields by point ID.
+    """
+    targets = {hit.id for point_id, hits in linked for hit in hits if hit.id != point_id} - lists.keys()
+    current = dict(lists)
+    if targets:
+        current.update((point.id, point.payload or {}) for point in qdrant_client.retrieve(
+            collection_name=collection_name, ids=list(targets),
+            with_payload=[NEIGHBORS_FIELD, NEIGHBOR_SCORES_FIELD], with_vectors=False
+        ))
+    changed = {}
+    for point_id, hits in linked:
+        for hit in hits:
+            if hit.id == point_id or hit.id not in current:
+                continue
+            updated = _insert_neighbor(current[hit.id], point_id, float(hit.score), k)
+            if updated is not None:
+                current[hit.id] = changed[hit.id] = updated
+    return changed
+
+
+def repair_graph(qdrant_client: QdrantClient, collection_name: str, k: int = DEFAULT_K,
+                 batch_size: int = DEFAULT_BATCH_SIZE, full: bool = False,
+                 layout: Optional[VectorLayout] = None) -> Dict[str, Any]:
+    """
+    Recompute neighbour lists that insert-time maintenance left incomplete or stale: points with fewer than k
+    neighbours (e.g. imported or consolidated memories, or early inserts into a small collection) and points
+    whose neighbours have since been deleted. `full` recomputes every point. Points linked for the first time
+    are also added to their neighbours' lists, so memories created with insert-time maintenance off become
+    reachable from older ones. Each page of points is searched with one search_batch call and written back
+    with one batch_update_points call.
+    """
+    start = time.perf_counter()
+    layout = layout or VectorLayout()
+    scanned = repaired = reverse_linked = 0
+    offset = None
+    while True:
+        points, offset = qdrant_client.scroll(
+            collection_name=collection_name,
+            limit=batch_size,
+            offset=offset,
+            with_payload=[NEIGHBORS_FIELD],
+            with_vectors=layout.with_vectors(full=False)
+        )
+        scanned += len(points)
+        if full:
+            stale = points
+        else:
+            stale_ids = _dangling(qdrant_client, collection_name, points)
+            stale = [
+                point for point in points
+                if point.id in stale_ids or len((point.payload or {}).get(NEIGHBORS_FIELD) or []) < k
+            ]
+
+        if stale:
+            requests = [
+                layout.stored_search_request(layout.extract(point, full=False), k + 1)  # +1: a point finds itself
+                for point in stale
+            ]
+            responses = qdrant_client.search_batch(collection_name=collection_name, requests=requests)
+            lists = {point.id: neighbor_payload(hits, k, point.id) for point, hits in zip(stale, responses)}
+            if not full:
+                linked = [(point.id, hits) for point, hits in zip(stale, responses)
+                          if not (point.payload or {}).get(NEIGHBORS_FIELD)]
+                reverse = _reverse_edges(qdrant_client, collection_name, linked, lists, k)
+                reverse_linked += len(reverse.keys() - lists.keys())
+                lists.update(reverse)
+            operations = [
+                SetPayloadOperation(set_payload=SetPayload(payload=fields, points=[point_id]))
+                for point_id, fields in lists.items()
+            ]
+            qdrant_client.batch_update_points(collection_name=collection_name, update_operations=operations)
+            repaired += len(stale)
+            logger.info(f"Graph repair: {repaired} neighbour lists rebuilt after scanning {scanned} memories.")
+        if offset is None:
+            break
+
+    elapsed = time.perf_counter() - start
+    return {"scanned": scanned, "repaired": repaired, "reverse_linked": reverse_linked, "k": k,
+            "seconds": round(elapsed, 3)}
+
+
+def unlink_points(qdrant_client: QdrantClient, collection_name: str, point_ids: List[Any],
+                  batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Remove deleted points from the neighbour lists that reference them, found with a filter on the neighbour
+    field, so traversals stop following them. The shortened lists are refilled by repair_graph. Returns the
+    number of neighbour lists updated.
+    """
+    deleted = set(point_ids)
+    conditions = [
+        FieldCondition(key=NEIGHBORS_FIELD, match=MatchAny(any=ids))
+        for ids in ([i for i in deleted if isinstance(i, int)], [i for i in deleted if isinstance(i, str)]) if ids
+    ]
+    if not conditions:
+        return 0
+    updated, offset = 0, None
+    while True:
+        points, offset = qdrant_client.scroll(
+            collection_name=collection_name,
+            scroll_filter=Filter(should=conditions),
+            limit=batch_size,
+            offset=offset,
+            with_payload=[NEIGHBORS_FIELD, NEIGHBOR_SCORES_FIELD],
+            with_vectors=False
+        )
+        operations = []
+        for point in points:
+            if point.id in deleted:
+                continue
+            payload = point.payload or {}
+            kept = [(neighbor, score) for neighbor, score in zip(payload.get(NEIGHBORS_FIELD) or [],
+                                                                 payload.get(NEIGHBOR_SCORES_FIELD) or [])
+                    if neighbor not in deleted]
+            operations.append(SetPayloadOperation(set_payload=SetPayload(payload={
+                NEIGHBORS_FIELD: [neighbor for neighbor, _ in kept],
+                NEIGHBOR_SCORES_FIELD: [score for _, score in kept],
+            }, points=[point.id])))
+        if operations:
+            qdrant_client.batch_update_points(collection_name=collection_name, update_operations=operations)
+            updated += len(operations)
+        if offset is None:
+            return updated
+
+
+def beam_step(frontier: List[Tuple[Any, float, List[Any]]], payloads: Dict[Any, Dict[str, Any]],
+              visited: set) -> Dict[Any, Tuple[float, List[Any]]]:
+    """
+    Expand one hop: every unvisited neighbour of the frontier, with the best path score reaching it
+    (parent path score times edge similarity) and that path. Frontier entries are (id, path score, path).
+    """
+    candidates: Dict[Any, Tuple[float, List[Any]]] = {}
+    for node_id, path_score, path in frontier:
+        payload = payloads.get(node_id) or {}
+        for neighbor, edge in zip(payload.get(NEIGHBORS_FIELD) or [], payload.get(NEIGHBOR_SCORES_FIELD) or []):
+            if neighbor in visited:
+                continue
+            score = path_score * max(float(edge), 0.0)
+            if neighbor not in candidates or score > candidates[neighbor][0]:
+                candidates[neighbor] = (score, path + [neighbor])
+    return candidates
+
+
+def top_beam(scores: np.ndarray, beam_width: int) -> List[int]:
+    """ Row positions of the `beam_width` best scores, best first. """
+    if len(scores) <= beam_width:
+        return list(np.argsort(-scores))
+    best = np.argpartition(-scores, beam_width - 1)[:beam_width]
+    return list(best[np.argsort(-scores[best])])
@@ -0,0 +1,217 @@
+import os
+import json
+import time
+import contextlib
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct
+
+from gravrag.gravrag_projection import VectorLayout, collection_dim
+from gravrag.gravrag_bulk import BulkLoad
+from gravrag.gravrag_content import full_content, content_payload
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_PARALLEL = 4
+EXPORT_DIR = os.getenv("GRAVRAG_EXPORT_DIR", "exports")  # Where API exports and imports may read and write
+
+# Metadata keys written as typed Parquet columns. Anything else (or a core key holding an
+# unexpected type, e.g. an ISO timestamp string) goes into the `extra_metadata` JSON column.
+FLOAT_COLUMNS = ("timestamp", "memetic_similarity", "semantic_relativity", "gravitational_pull", "spacetime_coordinate")
+INT_COLUMNS = ("recall_count",)
+
+
+def resolve_export_path(path: str, export_dir: str = EXPORT_DIR) -> str:
+    """
+    `path` resolved inside `export_dir`. Raises ValueError for absolute paths, '..' components, and
+    paths that leave the directory through a symlink.
+    """
+    if not path or os.path.isabs(path) or ".." in path.replace("\\", "/").split("/"):
+        raise ValueError(f"Export paths must be relative to the export directory, without '..': {path!r}")
+    root = os.path.realpath(export_dir)
+    resolved = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, resolved]) != root:
+        raise ValueError(f"Export path leaves the export directory: {path!r}")
+    return resolved
+
+
+def memory_schema(dim: int) -> pa.Schema:
+    """ Arrow schema of an exported memory store with `dim`-dimensional vectors. """
+    fields = [
+        pa.field("id", pa.string(), nullable=False),
+        pa.field("vector", pa.list_(pa.float32(), dim), nullable=False),
+        pa.field("content", pa.string()),
+    ]
+    fields += [pa.field(name, pa.float64()) for name in FLOAT_COLUMNS]
+    fields += [pa.field(name, pa.int64()) for name in INT_COLUMNS]
+    fields += [pa.field("tags", pa.list_(pa.string())), pa.field("extra_metadata", pa.string())]
+    return pa.schema(fields)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _points_to_batch(points, schema: pa.Schema, dim: int) -> pa.RecordBatch:
+    """ Convert a page of scrolled points (with vectors) into one Arrow record batch. """
+    columns: Dict[str, list] = {name: [] for name in schema.names if name != "vector"}
+    vectors = np.empty((len(points), dim), dtype=np.float32)
+
+    for row, point in enumerate(points):
+        payload = point.payload or {}
+        metadata = dict(payload.get("metadata") or {})
+        # The payload keeps the raw embedding; Qdrant's cosine storage only has the normalized one
+        vectors[row] = payload["vector"]
+        columns["id"].append(str(point.id))
+        columns["content"].append(full_content(payload))  # Exports always hold the full text
+
+        for name in FLOAT_COLUMNS + INT_COLUMNS:
+            value = metadata.get(name)
+            if _is_number(value):
+                columns[name].append(int(value) if name in INT_COLUMNS else float(value))
+                del metadata[name]
+            else:
+                columns[name].append(None)
+
+        tags = metadata.get("tags")
+        if isinstance(tags, list) and all(isinstance(tag, str) for tag in tags):
+            columns["tags"].append(metadata.pop("tags"))
+        else:
+            columns["tags"].append(None)
+        columns["extra_metadata"].append(json.dumps(metadata) if metadata else None)
+
+    arrays = []
+    for field in schema:
+        if field.name == "vector":
+            arrays.append(pa.FixedSizeListArray.from_arrays(pa.array(vectors.ravel(), type=pa.float32()), dim))
+        else:
+            arrays.append(pa.array(columns[field.name], type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _batch_to_points(batch: pa.RecordBatch, layout: VectorLayout) -> List[PointStruct]:
+    """ Convert one Arrow record batch back into Qdrant points in the MemoryPacket payload layout. """
+    vector_column = batch.column(batch.schema.get_field_index("vector"))
+    dim = vector_column.type.list_size
+    vectors = vector_column.flatten().to_numpy(zero_copy_only=False).reshape(-1, dim)
+    rows = batch.to_pydict()
+    rows.pop("vector")
+    point_vectors = layout.point_vectors(vectors)
+
+    points = []
+    for row in range(batch.num_rows):
+        metadata = {name: rows[name][row] for name in FLOAT_COLUMNS + INT_COLUMNS if rows[name][row] is not None}
+        if rows["tags"][row] is not None:
+            metadata["tags"] = rows["tags"][row]
+        if rows["extra_metadata"][row]:
+            metadata.update(json.loads(rows["extra_metadata"][row]))
+
+        point_id = rows["id"][row]
+        vector = vectors[row].tolist()
+        points.append(PointStruct(
+            id=int(point_id) if point_id.isdigit() else point_id,
+            vector=point_vectors[row],
+            payload={"vector": vector, **content_payload(rows["content"][row] or ""), "metadata": metadata}
+        ))
+    return points
+
+
+def export_memories(qdrant_client: QdrantClient, collection_names: List[str], path: str,
+                    batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Stream every point of the collections (e.g. the hot and cold tiers, which share a vector size) into one
+    Parquet file through paginated scroll. Only the page being written and the page being prefetched are
+    held in memory. A memory caught mid-demotion may be written twice; importing keeps one copy.
+    """
+    start = time.perf_counter()
+    dim = collection_dim(qdrant_client, collection_names[0])
+    schema = memory_schema(dim)
+
+    def fetch(position):
+        index, offset = position
+        points, offset = qdrant_client.scroll(
+            collection_name=collection_names[index],
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=False  # The payload keeps the raw embedding
+        )
+        if offset is not None:
+            return points, (index, offset)
+        return points, (index + 1, None) if index + 1 < len(collection_names) else None
+
+    exported = 0
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer, ThreadPoolExecutor(max_workers=1) as prefetcher:
+        page = prefetcher.submit(fetch, (0, None))
+        while page is not None:
+            points, position = page.result()
+            # Fetch the next page while this one is converted and written
+            page = prefetcher.submit(fetch, position) if position is not None else None
+            if points:
+                writer.write_batch(_points_to_batch(points, schema, dim))
+                exported += len(points)
+                logger.info(f"Exported {exported} memories from {', '.join(collection_names)}.")
+
+    elapsed = time.perf_counter() - start
+    return {
+        "path": path,
+        "points": exported,
+        "seconds": round(elapsed, 3),
+        "points_per_second": round(exported / elapsed, 1) if elapsed > 0 else None
+    }
+
+
+def import_memories(qdrant_client: QdrantClient, collection_name: str, path: str,
+                    batch_size: int = DEFAULT_BATCH_SIZE, parallel: int = DEFAULT_PARALLEL,
+                    layout: Optional[VectorLayout] = None, bulk: bool = False) -> Dict[str, Any]:
+    """
+    Stream a Parquet export back into a collection with `parallel` concurrent batched upserts.
+    The collection is created from the file's vector size if it does not exist yet, in `layout`
+    (projected vectors are computed on the way in); an existing collection keeps its own layout.
+    With `bulk`, HNSW indexing is suspended during the upserts and the index is built once at the end.
+    """
+    start = time.perf_counter()
+    parquet_file = pq.ParquetFile(path)
+    dim = parquet_file.schema_arrow.field("vector").type.list_size
+
+    layout = layout or VectorLayout()
+    if qdrant_client.collection_exists(collection_name):
+        layout = VectorLayout.from_collection(qdrant_client, collection_name, layout.projection)
+    else:
+        logger.info(f"Creating collection '{collection_name}' for import.")
+        qdrant_client.create_collection(collection_name=collection_name, vectors_config=layout.vectors_config(dim))
+
+    def upsert(points: List[PointStruct]) -> int:
+        qdrant_client.upsert(collection_name=collection_name, points=points, wait=True)
+        return len(points)
+
+    imported = 0
+    bulk_load = BulkLoad(qdrant_client, [collection_name]) if bulk else contextlib.nullcontext()
+    with bulk_load, ThreadPoolExecutor(max_workers=parallel) as executor:
+        pending = set()
+        for batch in parquet_file.iter_batches(batch_size=batch_size):
+            # Bound in-flight batches so memory stays flat regardless of file size
+            if len(pending) >= parallel * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                imported += sum(future.result() for future in done)
+            pending.add(executor.submit(upsert, _batch_to_points(batch, layout)))
+        imported += sum(future.result() for future in pending)
+
+    elapsed = time.perf_counter() - start
+    logger.info(f"Imported {imported} memories into '{collection_name}' in {elapsed:.1f}s.")
+    result = {
+        "path": path,
+        "points": imported,
+        "seconds": round(elapsed, 3),
+        "points_per_second": round(imported / elapsed, 1) if elapsed > 0 else None
+    }
+    if bulk:
+        result["bulk_load"] = bulk_load.report()
+    return result
@@ -0,0 +1,306 @@
+import os
+import csv
+import contextlib
+import json
+import time
+import uuid
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import List, Dict, Any, Optional, Iterator, Callable, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SOURCE_FORMATS = ("jsonl", "csv", "parquet")
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_WORKERS = 2  # Encoder processes; 0 encodes in the loading process
+DEFAULT_PARALLEL = 4  # Concurrent upserts
+CHECKPOINT_SUFFIX = ".checkpoint.json"
+PROGRESS_INTERVAL_SECONDS = 10.0
+
+# (ids, contents, vectors, metadatas) -> number of memories stored
+StoreFn = Callable[[List[Any], List[str], np.ndarray, List[Dict[str, Any]]], int]
+
+
+def source_format(path: str, fmt: Optional[str] = None) -> str:
+    """ The format of a source file: `fmt` if given, otherwise taken from its extension. """
+    fmt = fmt or {".jsonl": "jsonl", ".ndjson": "jsonl", ".csv": "csv", ".parquet": "parquet"}.get(
+        os.path.splitext(path)[1].lower()
+    )
+    if fmt not in SOURCE_FORMATS:
+        raise ValueError(f"Cannot tell the format of '{path}'; pass one of {', '.join(SOURCE_FORMATS)}")
+    return fmt
+
+
+def read_records(path: str, fmt: str, skip: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the records of a JSONL, CSV or Parquet file one at a time, skipping the first `skip`.
+    Parquet is read a record batch at a time, and row groups wholly before `skip` are never decoded.
+    """
+    if fmt == "jsonl":
+        with open(path, encoding="utf-8") as f:
+            row = 0
+            for line in f:
+                if not line.strip():
+                    continue
+                if row >= skip:
+                    yield json.loads(line)
+                row += 1
+    elif fmt == "csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            for row, record in enumerate(csv.DictReader(f)):
+                if row >= skip:
+                    yield record
+    else:
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(path)
+        row_groups, skipped = [], 0
+        for group in range(parquet_file.num_row_groups):
+            group_rows = parquet_file.metadata.row_group(group).num_rows
+            if skipped + group_rows <= skip:
+                skipped += group_rows
+            else:
+                row_groups.append(group)
+        row = skipped
+        for batch in parquet_file.iter_batches(row_groups=row_groups):
+            for record in batch.to_pylist():
+                if row >= skip:
+                    yield record
+                row += 1
+
+
+def to_memory(record: Dict[str, Any], content_field: str = "content", metadata_field: str = "metadata",
+              id_field: str = "id") -> Tuple[Any, str, Dict[str, Any]]:
+    """
+    Split a source record into (source ID, content, metadata). Metadata is `metadata_field` (a dict or a JSON
+    string) when the record has it, otherwise every remaining column, as for a flat CSV. A comma-separated
+    `tags` string becomes a list, and the source ID is kept as `source_id`.
+    """
+    record = dict(record)
+    source_id = record.pop(id_field, None)
+    content = record.pop(content_field, None)
+    if content is None or not str(content).strip():
+        raise ValueError(f"Record has no '{content_field}'")
+    if metadata_field in record:
+        metadata = record.pop(metadata_field) or {}
+        if isinstance(metadata, str):
+            metadata = json.loads(metadata) if metadata.strip() else {}
+    else:
+        metadata = {key: value for key, value in record.items() if value not in (None, "")}
+    if isinstance(metadata.get("tags"), str):
+        metadata["tags"] = [tag.strip() for tag in metadata["tags"].split(",") if tag.strip()]
+    metadata = dict(metadata)
+    if source_id not in (None, ""):
+        metadata.setdefault("source_id", str(source_id))
+    return (source_id if source_id not in (None, "") else None), str(content), metadata
+
+
+def row_id(path: str, row: int) -> str:
+    """ Deterministic point ID of a source row without one, so a resumed load overwrites instead of duplicating. """
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{os.path.abspath(path)}#{row}"))
+
+
+def point_id(source_id: Any) -> Any:
+    """
+    A Qdrant point ID (unsigned integer or UUID) for a source record ID. Other IDs are mapped to a UUID derived
+    from them, so loading the same record twice still writes the same point.
+    """
+    if isinstance(source_id, int) and not isinstance(source_id, bool) and source_id >= 0:
+        return source_id
+    source_id = str(source_id)
+    if source_id.isdigit():
+        return int(source_id)
+    try:
+        return str(uuid.UUID(source_id))
+    except ValueError:
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, source_id))
+
+
+class Checkpoint:
+    """
+    Rows of a source file stored so far, kept in a small JSON file next to it. Saved atomically (write, then
+    rename), and only ever advanced to the end of the last batch whose predecessors are all stored.
+    """
+
+    def __init__(self, path: str, source: str):
+        self.path = path
+        self.source = os.path.abspath(source)
+        self.source_size = os.path.getsize(source)
+        self.rows = 0
+        self.loaded = 0
+        self.skipped = 0
+
+    def load(self) -> "Checkpoint":
+        if not os.path.exists(self.path):
+            return self
+        with open(self.path) as f:
+            state = json.load(f)
+        if state.get("source") != self.source or state.get("source_size") != self.source_size:
+            raise ValueError(f"Checkpoint '{self.path}' belongs to another version of the source; "
+                             f"delete it or pass --restart")
+        self.rows, self.loaded, self.skipped = state["rows"], state["loaded"], state.get("skipped", 0)
+        return self
+
+    def save(self):
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w") as f:
+            json.dump({
+                "source": self.source,
+                "source_size": self.source_size,
+                "rows": self.rows,
+                "loaded": self.loaded,
+                "skipped": self.skipped,
+                "updated_at": time.time(),
+            }, f)
+        os.replace(temporary, self.path)
+
+
+_worker_model = None
+
+
+def _init_worker(model_name: str):
+    global _worker_model
+    from sentence_transformers import SentenceTransformer
+    _worker_model = SentenceTransformer(model_name)
+
+
+def _encode_in_worker(texts: List[str]) -> np.ndarray:
+    return np.asarray(_worker_model.encode(texts, batch_size=len(texts)), dtype=np.float32)
+
+
+def load_memories(store: StoreFn, path: str, fmt: Optional[str] = None, model_name: Optional[str] = None,
+                  encode: Optional[Callable[[List[str]], np.ndarray]] = None,
+                  batch_size: int = DEFAULT_BATCH_SIZE, workers: int = DEFAULT_WORKERS,
+                  parallel: int = DEFAULT_PARALLEL, checkpoint_path: Optional[str] = None, restart: bool = False,
+                  content_field: str = "content", metadata_field: str = "metadata") -> Dict[str, Any]:
+    """
+    Bulk-load a JSONL, CSV or Parquet file of memories, streaming it batch by batch.
+
+    Batches are encoded across `workers` processes, each loading `model_name` once (or in this process
+    with `encode` when `workers` is 0), and handed to `store` with `parallel` upserts in flight. Progress
+    is checkpointed after every stored batch, so a crashed load started again with the same arguments
+    resumes at the first batch not yet stored. Rows without an ID get one derived from the file and row
+    number, which makes re-storing the batches in flight at a crash harmless. Records without content
+    are skipped and counted.
+    """
+    fmt = source_format(path, fmt)
+    if workers > 0 and not model_name:
+        raise ValueError("Encoding in worker processes needs a model name")
+    if workers <= 0 and encode is None:
+        raise ValueError("Encoding in-process needs an encode function")
+    checkpoint = Checkpoint(checkpoint_path or f"{path}{CHECKPOINT_SUFFIX}", path)
+    if restart and os.path.exists(checkpoint.path):
+        os.remove(checkpoint.path)
+    checkpoint.load()
+    if checkpoint.rows:
+        logger.info(f"Resuming load of '{path}' after row {checkpoint.rows} ({checkpoint.loaded} memories stored).")
+
+    start = time.perf_counter()
+    resumed_rows, resumed_loaded = checkpoint.rows, checkpoint.loaded
+    encoder = ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker, initargs=(model_name,)
+    ) if workers > 0 else None
+    upserter = ThreadPoolExecutor(max_workers=parallel)
+
+    def batches() -> Iterator[Tuple[int, List[Any], List[str], List[Dict[str, Any]], int]]:
+        """ (end row, ids, contents, metadatas, records skipped) per batch of `batch_size` source rows. """
+        ids, contents, metadatas, skipped = [], [], [], 0
+        row = checkpoint.rows
+        for row, record in enumerate(read_records(path, fmt, checkpoint.rows), start=checkpoint.rows):
+            try:
+                source_id, content, metadata = to_memory(record, content_field, metadata_field)
+            except ValueError as e:
+                skipped += 1
+                logger.warning(f"Skipping row {row} of '{path}': {str(e)}")
+            else:
+                ids.append(point_id(source_id) if source_id is not None else row_id(path, row))
+                contents.append(content)
+                metadatas.append(metadata)
+            if (row + 1 - checkpoint.rows) % batch_size == 0:
+                yield row + 1, ids, contents, metadatas, skipped
+                ids, contents, metadatas, skipped = [], [], [], 0
+        if ids or skipped:
+            yield row + 1, ids, contents, metadatas, skipped
+
+    # Batches are stored out of order; the checkpoint only moves past a batch once all before it are stored
+    encoding: deque = deque()
+    storing: Dict[Future, int] = {}
+    stored: Dict[int, Tuple[int, int, int]] = {}  # sequence -> (end row, stored, skipped)
+    next_to_checkpoint = 0
+    last_report = start
+
+    def collect(done):
+        nonlocal next_to_checkpoint, last_report
+        error = None
+        for future in done:
+            sequence = storing.pop(future)
+            try:
+                stored[sequence] = future.result()
+            except Exception as e:
+                error = error or e
+        while next_to_checkpoint in stored:
+            end_row, count, skipped = stored.pop(next_to_checkpoint)
+            checkpoint.rows, checkpoint.loaded = end_row, checkpoint.loaded + count
+            checkpoint.skipped += skipped
+            next_to_checkpoint += 1
+            checkpoint.save()
+        now = time.perf_counter()
+        if now - last_report >= PROGRESS_INTERVAL_SECONDS:
+            last_report = now
+            rate = (checkpoint.loaded - resumed_loaded) / (now - start)
+            logger.info(f"Loaded {checkpoint.loaded} memories ({checkpoint.rows} rows) at {rate:.1f} docs/sec.")
+        if error is not None:
+            raise error
+
+    def store_batch(end_row, ids, contents, metadatas, skipped, vectors) -> Tuple[int, int, int]:
+        return end_row, (store(ids, contents, vectors, metadatas) if ids else 0), skipped
+
+    def hand_off(sequence, end_row, ids, contents, metadatas, skipped, vectors):
+        # Bound batches waiting on Qdrant so memory stays flat regardless of file size
+        if len(storing) >= parallel * 2:
+            collect(wait(storing, return_when=FIRST_COMPLETED)[0])
+        storing[upserter.submit(store_batch, end_row, ids, contents, metadatas, skipped, vectors)] = sequence
+
+    try:
+        for sequence, (end_row, ids, contents, metadatas, skipped) in enumerate(batches()):
+            if encoder is None:
+                vectors = np.asarray(encode(contents), dtype=np.float32) if contents else None
+                hand_off(sequence, end_row, ids, contents, metadatas, skipped, vectors)
+                continue
+            future = encoder.submit(_encode_in_worker, contents) if contents else None
+            encoding.append((sequence, end_row, ids, contents, metadatas, skipped, future))
+            # Keep every worker busy with one batch queued behind it; hand finished batches on in order
+            while len(encoding) > workers * 2 or (encoding and (encoding[0][-1] is None or encoding[0][-1].done())):
+                *batch, future = encoding.popleft()
+                hand_off(*batch, future.result() if future is not None else None)
+        while encoding:
+            *batch, future = encoding.popleft()
+            hand_off(*batch, future.result() if future is not None else None)
+        collect(wait(storing)[0])
+    finally:
+        upserter.shutdown(wait=True)
+        if storing:
+            # A batch failed: checkpoint the batches stored before it, then let the first error propagate
+            with contextlib.suppress(Exception):
+                collect(list(storing))
+        if encoder is not None:
+            encoder.shutdown(wait=True, cancel_futures=True)
+
+    elapsed = time.perf_counter() - start
+    loaded = checkpoint.loaded - resumed_loaded
+    logger.info(f"Loaded {checkpoint.loaded} memories from '{path}' in {elapsed:.1f}s.")
+    return {
+        "path": path,
+        "rows": checkpoint.rows,
+        "loaded": loaded,
+        "total_loaded": checkpoint.loaded,
+        "skipped": checkpoint.skipped,
+        "resumed_from_row": resumed_rows,
+        "seconds": round(elapsed, 3),
+        "docs_per_second": round(loaded / elapsed, 1) if elapsed > 0 else None,
+        "checkpoint": checkpoint.path,
+    }
@@ -0,0 +1,124 @@
+import os
+import math
+import logging
+import threading
+from functools import lru_cache
+from collections import OrderedDict
+from typing import List, Tuple, Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TOKENIZER_NAME = os.getenv("GRAVRAG_TOKENIZER")  # Hugging Face tokenizer to count with; default: the embedding model's
+PACK_OVERSAMPLE = int(os.getenv("GRAVRAG_PACK_OVERSAMPLE", 3))  # Candidates searched per packed memory (top_k)
+MMR_LAMBDA = float(os.getenv("GRAVRAG_MMR_LAMBDA", 0.7))  # 1 ranks by gravity alone, 0 by diversity alone
+DUPLICATE_THRESHOLD = float(os.getenv("GRAVRAG_DUPLICATE_THRESHOLD", 0.95))  # Cosine above which a candidate is a near-duplicate
+TOKEN_CACHE_SIZE = int(os.getenv("GRAVRAG_TOKEN_CACHE_SIZE", 4096))
+SEPARATOR = "\n\n"  # Between packed memories in the context
+CHARS_PER_TOKEN = 4  # Estimate when no tokenizer is available
+
+
+@lru_cache(maxsize=None)
+def load_tokenizer(name: str):
+    """ A Hugging Face tokenizer, loaded once per process. """
+    from transformers import AutoTokenizer
+    return AutoTokenizer.from_pretrained(name)
+
+
+class TokenCounter:
+    """
+    Token counts of texts with a Hugging Face tokenizer, batched and kept in an LRU cache so memories recalled
+    again are not re-tokenized. Without a tokenizer, counts are estimated at CHARS_PER_TOKEN characters a token.
+    """
+
+    def __init__(self, tokenizer: Any = None, cache_size: int = TOKEN_CACHE_SIZE):
+        self.tokenizer = tokenizer
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[int, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _count(self, texts: List[str]) -> List[int]:
+        if self.tokenizer is None:
+            return [math.ceil(len(text) / CHARS_PER_TOKEN) for text in texts]
+        encoded = self.tokenizer(texts, add_special_tokens=False, verbose=False)["input_ids"]
+        return [len(ids) for ids in encoded]
+
+    def count_many(self, texts: List[str]) -> List[int]:
+        keys = [hash(text) for text in texts]
+        counts: List[Optional[int]] = [None] * len(texts)
+        with self._lock:
+            for row, key in enumerate(keys):
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    counts[row] = self._cache[key]
+        missing = [row for row, count in enumerate(counts) if count is None]
+        if missing:
+            for row, count in zip(missing, self._count([texts[row] for row in missing])):
+                counts[row] = count
+            with self._lock:
+                for row in missing:
+                    self._cache[keys[row]] = counts[row]
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return counts
+
+
+def configured_token_counter(model: Any) -> TokenCounter:
+    """ TokenCounter for GRAVRAG_TOKENIZER, or else for the embedding model's own tokenizer. """
+    tokenizer = load_tokenizer(TOKENIZER_NAME) if TOKENIZER_NAME else getattr(model, "tokenizer", None)
+    if tokenizer is None:
+        logger.warning(f"No tokenizer available; estimating {CHARS_PER_TOKEN} characters per token.")
+    return TokenCounter(tokenizer)
+
+
+def mmr_order(vectors: np.ndarray, relevance: np.ndarray, mmr_lambda: float = MMR_LAMBDA,
+              duplicate_threshold: float = DUPLICATE_THRESHOLD) -> Tuple[List[int], List[int]]:
+    """
+    Maximal marginal relevance order of candidates: each step takes the candidate maximising
+    mmr_lambda * relevance - (1 - mmr_lambda) * (its highest cosine similarity to those already taken), with
+    relevance min-max scaled to [0, 1]. Candidates at `duplicate_threshold` or above to a taken one are
+    dropped as near-duplicates. The pairwise similarities come from one matrix product. Returns the
+    order (row indices) and the dropped rows.
+    """
+    count = len(vectors)
+    if count == 0:
+        return [], []
+    vectors = np.asarray(vectors, dtype=np.float64)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    unit = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+    similarity = unit @ unit.T
+    relevance = np.asarray(relevance, dtype=np.float64)
+    span = relevance.max() - relevance.min()
+    scaled = (relevance - relevance.min()) / span if span > 0 else np.ones(count)
+
+    available = np.ones(count, dtype=bool)
+    closest = np.zeros(count)
+    order, duplicates = [], []
+    while available.any():
+        scores = np.where(available, mmr_lambda * scaled - (1 - mmr_lambda) * closest, -np.inf)
+        pick = int(np.argmax(scores))
+        order.append(pick)
+        available[pick] = False
+        dropped = available & (similarity[pick] >= duplicate_threshold)
+        duplicates.extend(np.flatnonzero(dropped).tolist())
+        available &= ~dropped
+        closest = np.maximum(closest, similarity[pick])
+    return order, duplicates
+
+
+def pack(token_counts: List[int], token_budget: int, max_items: int, separator_tokens: int) -> Tuple[List[int], int]:
+    """
+    Greedily take items in order while they fit in `token_budget`, counting `separator_tokens` between items;
+    an item too large for the remaining budget is skipped for the next ones. Returns the taken indices
+    and the tokens used.
+    """
+    taken, used = [], 0
+    for index, tokens in enumerate(token_counts):
+        if len(taken) == max_items:
+            break
+        cost = tokens + (separator_tokens if taken else 0)
+        if used + cost <= token_budget:
+            taken.append(index)
+            used += cost
+    return taken, used
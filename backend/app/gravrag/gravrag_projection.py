@@ -0,0 +1,246 @@
+import os
+import json
+import time
+import logging
+from typing import List, Dict, Any, Optional, Union
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    Distance, VectorParams, HnswConfigDiff, NamedVector, SearchRequest, SearchParams, QueryRequest, Prefetch, Filter
+)
+
+logger = logging.getLogger(__name__)
+
+PROJECTION_KINDS = ("pca", "truncate")
+FULL_VECTOR = "full"  # Name of the original embedding in a projected collection
+DEFAULT_SAMPLE_SIZE = 20000
+DEFAULT_OVERSAMPLE = 4  # First-stage candidates per requested result
+
+
+class Projection:
+    """
+    A fitted, versioned map from full embeddings to a smaller vector used for first-stage search.
+
+    'pca' centres vectors on the sample mean and projects them onto the top principal components;
+    'truncate' keeps the leading dimensions (Matryoshka-style, only meaningful for embeddings trained
+    that way). Outputs are L2-normalized, so cosine distance on the small vector stays well defined.
+    Stored as a single .npz file so a deployment can pin exactly the projection a collection was built with.
+    """
+
+    def __init__(self, kind: str, dim: int, version: int, mean: Optional[np.ndarray] = None,
+                 components: Optional[np.ndarray] = None, source_dim: Optional[int] = None,
+                 info: Optional[Dict[str, Any]] = None):
+        if kind not in PROJECTION_KINDS:
+            raise ValueError(f"kind must be one of {PROJECTION_KINDS}, got '{kind}'")
+        self.kind = kind
+        self.dim = dim
+        self.version = version
+        self.mean = mean
+        self.components = components  # (dim, source_dim) for PCA
+        self.source_dim = source_dim
+        self.info = info or {}
+
+    @property
+    def vector_name(self) -> str:
+        """ Named vector holding this projection, so several versions can coexist in one collection. """
+        return f"{self.kind}{self.dim}_v{self.version}"
+
+    def apply(self, vectors: Union[np.ndarray, List[List[float]]]) -> np.ndarray:
+        """ Project a (n, source_dim) batch (or a single vector) and L2-normalize each row. """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        single = vectors.ndim == 1
+        vectors = np.atleast_2d(vectors)
+        if self.kind == "pca":
+            projected = (vectors - self.mean) @ self.components.T
+        else:
+            projected = vectors[:, :self.dim]
+        norms = np.linalg.norm(projected, axis=1, keepdims=True)
+        projected = projected / np.where(norms > 0, norms, 1.0)
+        return projected[0] if single else projected
+
+    def save(self, path: str):
+        arrays = {"mean": self.mean, "components": self.components} if self.kind == "pca" else {}
+        header = {"kind": self.kind, "dim": self.dim, "version": self.version, "source_dim": self.source_dim, **self.info}
+        np.savez(path, header=np.array(json.dumps(header)), **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "Projection":
+        with np.load(path) as data:
+            header = json.loads(str(data["header"]))
+            mean = data["mean"] if "mean" in data else None
+            components = data["components"] if "components" in data else None
+        kind, dim, version, source_dim = (header.pop(key) for key in ("kind", "dim", "version", "source_dim"))
+        return cls(kind, dim, version, mean, components, source_dim, info=header)
+
+
+def fit_projection(vectors: np.ndarray, kind: str, dim: int, version: int) -> Projection:
+    """ Fit a projection on a sample of full embeddings; PCA keeps the top `dim` principal components. """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if dim >= vectors.shape[1]:
+        raise ValueError(f"dim must be smaller than the embedding size {vectors.shape[1]}")
+    info = {"fitted_at": time.time(), "sample_size": len(vectors)}
+    if kind == "truncate":
+        return Projection(kind, dim, version, source_dim=vectors.shape[1], info=info)
+    if len(vectors) < dim:
+        raise ValueError(f"PCA to {dim} dimensions needs at least {dim} sample vectors, got {len(vectors)}")
+
+    mean = vectors.mean(axis=0)
+    # Right singular vectors of the centred sample are the principal axes, largest variance first
+    _, singular_values, axes = np.linalg.svd(vectors - mean, full_matrices=False)
+    variance = singular_values ** 2
+    info["explained_variance"] = float(variance[:dim].sum() / variance.sum())
+    return Projection(kind, dim, version, mean, axes[:dim].astype(np.float32), vectors.shape[1], info)
+
+
+def sample_vectors(qdrant_client: QdrantClient, collection_name: str, sample_size: int = DEFAULT_SAMPLE_SIZE,
+                   batch_size: int = 1000) -> np.ndarray:
+    """ The raw embeddings of up to `sample_size` memories, read from the payload with paginated scroll. """
+    vectors, offset = [], None
+    while len(vectors) < sample_size:
+        points, offset = qdrant_client.scroll(
+            collection_name=collection_name,
+            limit=min(batch_size, sample_size - len(vectors)),
+            offset=offset,
+            with_payload=["vector"],
+            with_vectors=False
+        )
+        vectors.extend(point.payload["vector"] for point in points if (point.payload or {}).get("vector"))
+        if offset is None:
+            break
+    return np.asarray(vectors, dtype=np.float32)
+
+
+class VectorLayout:
+    """
+    How a collection's points carry their embeddings, so search and upsert code does not care:
+    a single unnamed vector (the original layout), or the full embedding under FULL_VECTOR plus a
+    projected vector. With a projection, searches run on the small vector and the candidates are
+    rescored server-side against the full one; the full vector lives on disk without an HNSW graph.
+    """
+
+    def __init__(self, projection: Optional[Projection] = None, oversample: int = DEFAULT_OVERSAMPLE):
+        self.projection = projection
+        self.oversample = oversample
+
+    @property
+    def full_name(self) -> Optional[str]:
+        return FULL_VECTOR if self.projection else None
+
+    @property
+    def search_name(self) -> Optional[str]:
+        """ Vector used for candidate generation (recommend, graph repair). """
+        return self.projection.vector_name if self.projection else None
+
+    def vectors_config(self, dim: int):
+        if not self.projection:
+            return VectorParams(size=dim, distance=Distance.COSINE)
+        return {
+            FULL_VECTOR: VectorParams(size=dim, distance=Distance.COSINE, on_disk=True, hnsw_config=HnswConfigDiff(m=0)),
+            self.projection.vector_name: VectorParams(size=self.projection.dim, distance=Distance.COSINE),
+        }
+
+    def point_vector(self, vector: List[float]) -> Union[List[float], Dict[str, List[float]]]:
+        """ The `vector` argument of a PointStruct for one full embedding. """
+        if not self.projection:
+            return vector
+        return {FULL_VECTOR: vector, self.projection.vector_name: self.projection.apply(vector).tolist()}
+
+    def point_vectors(self, vectors: np.ndarray) -> List[Union[List[float], Dict[str, List[float]]]]:
+        """ point_vector for a batch, projecting all rows at once. """
+        if not self.projection:
+            return [row.tolist() for row in np.asarray(vectors)]
+        projected = self.projection.apply(vectors)
+        return [
+            {FULL_VECTOR: full.tolist(), self.projection.vector_name: small.tolist()}
+            for full, small in zip(np.asarray(vectors), projected)
+        ]
+
+    def search_vector(self, vector: List[float]) -> List[float]:
+        """ The search-space copy of a full embedding, unit length like the vectors Qdrant stores for cosine. """
+        vector = self.projection.apply(vector) if self.projection else np.asarray(vector, dtype=np.float64)
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm > 0 else vector).tolist()
+
+    def with_vectors(self, full: bool = True) -> Union[bool, List[str]]:
+        """ `with_vectors` selector fetching only the full or only the search vector. """
+        if not self.projection:
+            return True
+        return [FULL_VECTOR] if full else [self.projection.vector_name]
+
+    def extract(self, point, full: bool = True) -> Optional[List[float]]:
+        """ The full or the search vector of a point fetched with `with_vectors(full)`. """
+        vector = point.vector
+        if isinstance(vector, dict):
+            return vector.get(FULL_VECTOR if full else self.search_name)
+        return vector
+
+    def search_request(self, query_vector: List[float], query_filter: Optional[Filter], limit: int,
+                       with_payload: Any = True) -> Union[SearchRequest, QueryRequest]:
+        if not self.projection:
+            return SearchRequest(vector=query_vector, filter=query_filter, limit=limit, with_payload=with_payload)
+        return QueryRequest(
+            prefetch=Prefetch(
+                query=self.projection.apply(query_vector).tolist(),
+                using=self.projection.vector_name,
+                filter=query_filter,
+                limit=limit * self.oversample
+            ),
+            query=query_vector,
+            using=FULL_VECTOR,
+            filter=query_filter,
+            limit=limit,
+            offset=0,
+            with_payload=with_payload
+        )
+
+    def stored_search_request(self, vector: List[float], limit: int) -> SearchRequest:
+        """ First-stage-only search with a vector already in search space (see extract(point, full=False)). """
+        if not self.projection:
+            return SearchRequest(vector=vector, limit=limit, with_payload=False)
+        return SearchRequest(vector=NamedVector(name=self.search_name, vector=vector), limit=limit, with_payload=False)
+
+    def exact_search_request(self, query_vector: List[float], limit: int) -> SearchRequest:
+        """ Brute-force search on the full vectors, the ground truth for recall measurements. """
+        vector = NamedVector(name=FULL_VECTOR, vector=query_vector) if self.projection else query_vector
+        return SearchRequest(vector=vector, limit=limit, with_payload=False, params=SearchParams(exact=True))
+
+    def run_batch(self, qdrant_client: QdrantClient, collection_name: str, requests: list) -> list:
+        """ Run requests built by search_request; returns one hit list per request. """
+        if not requests:
+            return []
+        if not self.projection:
+            return qdrant_client.search_batch(collection_name=collection_name, requests=requests)
+        responses = qdrant_client.query_batch_points(collection_name=collection_name, requests=requests)
+        return [response.points for response in responses]
+
+    @classmethod
+    def from_collection(cls, qdrant_client: QdrantClient, collection_name: str,
+                        projection: Optional[Projection] = None) -> "VectorLayout":
+        """
+        The layout an existing collection was created with. A projection is only used when the collection
+        has its named vector; otherwise the collection keeps being served from its full vectors.
+        """
+        vectors = qdrant_client.get_collection(collection_name).config.params.vectors
+        if not isinstance(vectors, dict):
+            if projection:
+                logger.warning(f"Collection '{collection_name}' has a single unnamed vector; "
+                               f"ignoring projection '{projection.vector_name}'. Rebuilds keep this layout; export it and "
+                               f"import into a new collection with the projection to use it.")
+            return cls()
+        if projection is None or projection.vector_name not in vectors:
+            raise ValueError(f"Collection '{collection_name}' has projected vectors {sorted(vectors)}; "
+                             f"load the matching projection (GRAVRAG_PROJECTION)")
+        return cls(projection)
+
+
+def load_configured_projection() -> Optional[Projection]:
+    """ The projection named by GRAVRAG_PROJECTION (path to a .npz written by `python -m gravrag fit-projection`). """
+    path = os.getenv("GRAVRAG_PROJECTION")
+    return Projection.load(path) if path else None
+
+
+def collection_dim(qdrant_client: QdrantClient, collection_name: str) -> int:
+    """ Size of the full embedding, in either layout. """
+    vectors = qdrant_client.get_collection(collection_name).config.params.vectors
+    return vectors[FULL_VECTOR].size if isinstance(vectors, dict) else vectors.size
@@ -0,0 +1,178 @@
+"""
+Memory, throughput and recall@10 of reduced-dimension first-stage search.
+
+For each setting ("full" or "<kind>:<dim>", e.g. pca:64, truncate:128) a collection is built from the
+same synthetic corpus, a projection is fitted on a sample of it, and a fixed query set is run through
+the same two-stage search MemoryManager uses (small-vector candidates, full-vector rescoring). recall@10
+is measured against exact cosine top-10 on the full vectors, computed in numpy.
+
+Vector memory is estimated from the layout (Qdrant does not report it per vector): vectors kept in RAM
+plus HNSW links (m=16), with full vectors of projected collections counted as on-disk. Points carry the
+same payload["vector"] copy of the full embedding that MemoryManager writes; its size is measured as the
+JSON bytes upserted and counted on disk (Qdrant's default on_disk_payload). A projection does not
+shrink it. Local mode (the default) searches by brute force; pass --qdrant-url for representative QPS.
+
+Usage (from backend/app):
+    python -m gravrag.gravrag_projection_benchmark --corpus-size 50000 --settings full,pca:128,pca:64,truncate:64
+"""
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+from typing import List, Dict, Any
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct
+
+from gravrag.gravrag_benchmark import HashingEncoder, synthetic_text, DEFAULT_DIM
+from gravrag.gravrag_projection import VectorLayout, fit_projection, PROJECTION_KINDS
+
+logger = logging.getLogger(__name__)
+
+HNSW_M = 16  # Qdrant default; each point keeps ~2*m links of 4 bytes on layer 0
+UPSERT_BATCH_SIZE = 1000
+
+
+def parse_settings(settings: str) -> List[Dict[str, Any]]:
+    parsed = []
+    for item in settings.split(","):
+        item = item.strip()
+        if item == "full":
+            parsed.append({"name": "full", "kind": None, "dim": None})
+            continue
+        kind, _, dim = item.partition(":")
+        if kind not in PROJECTION_KINDS or not dim.isdigit():
+            raise ValueError(f"Settings are 'full' or '<kind>:<dim>' with kind in {PROJECTION_KINDS}, got '{item}'")
+        parsed.append({"name": item, "kind": kind, "dim": int(dim)})
+    return parsed
+
+
+def build_corpus(encoder, corpus_size: int, queries: int, seed: int):
+    rng = random.Random(seed)
+    texts = [synthetic_text(rng) for _ in range(corpus_size + queries)]
+    vectors = np.asarray(encoder.encode(texts), dtype=np.float32)
+    return vectors[:corpus_size], vectors[corpus_size:]
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """ Ground-truth cosine top-k row indices per query. """
+    unit = corpus / np.maximum(np.linalg.norm(corpus, axis=1, keepdims=True), 1e-12)
+    scores = queries @ unit.T
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(top, np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1), axis=1)
+
+
+def vector_memory(setting: Dict[str, Any], corpus_size: int, full_dim: int, payload_bytes: int) -> Dict[str, int]:
+    links = corpus_size * 2 * HNSW_M * 4
+    if setting["kind"] is None:
+        ram, disk = corpus_size * full_dim * 4 + links, 0
+    else:
+        ram, disk = corpus_size * setting["dim"] * 4 + links, corpus_size * full_dim * 4
+    return {"ram_bytes": ram, "disk_bytes": disk + payload_bytes, "payload_bytes": payload_bytes}
+
+
+def run_setting(client: QdrantClient, setting: Dict[str, Any], corpus: np.ndarray, queries: np.ndarray,
+                truth: np.ndarray, sample_size: int, oversample: int, k: int) -> Dict[str, Any]:
+    projection = None
+    if setting["kind"] is not None:
+        projection = fit_projection(corpus[:sample_size], setting["kind"], setting["dim"], version=1)
+    layout = VectorLayout(projection, oversample=oversample)
+    collection_name = f"projection_bench_{setting['name'].replace(':', '_')}"
+    if client.collection_exists(collection_name):
+        client.delete_collection(collection_name)
+    client.create_collection(collection_name=collection_name, vectors_config=layout.vectors_config(corpus.shape[1]))
+
+    start = time.perf_counter()
+    payload_bytes = 0
+    for batch_start in range(0, len(corpus), UPSERT_BATCH_SIZE):
+        batch = corpus[batch_start:batch_start + UPSERT_BATCH_SIZE]
+        payloads = [{"vector": vector.tolist()} for vector in batch]
+        payload_bytes += sum(len(json.dumps(payload, separators=(",", ":"))) for payload in payloads)
+        client.upsert(collection_name=collection_name, wait=True, points=[
+            PointStruct(id=batch_start + row, vector=vector, payload=payloads[row])
+            for row, vector in enumerate(layout.point_vectors(batch))
+        ])
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    found = []
+    for query in queries:
+        hits = layout.run_batch(client, collection_name, [layout.search_request(query.tolist(), None, k, with_payload=False)])[0]
+        found.append({hit.id for hit in hits})
+    elapsed = time.perf_counter() - start
+    recall = np.mean([len(hits & set(expected.tolist())) / k for hits, expected in zip(found, truth)])
+
+    client.delete_collection(collection_name)
+    return {
+        "setting": setting["name"],
+        "search_dim": setting["dim"] or corpus.shape[1],
+        **vector_memory(setting, len(corpus), corpus.shape[1], payload_bytes),
+        "qps": round(len(queries) / elapsed, 1),
+        f"recall_at_{k}": round(float(recall), 4),
+        "load_seconds": round(load_seconds, 3),
+        "explained_variance": projection.info.get("explained_variance") if projection else None,
+    }
+
+
+def format_report(rows: List[Dict[str, Any]], k: int) -> str:
+    lines = [f"{'setting':<14}{'dim':>6}{'RAM MiB':>10}{'disk MiB':>10}{'payload MiB':>13}{'QPS':>10}{f'recall@{k}':>11}"]
+    for row in rows:
+        lines.append(
+            f"{row['setting']:<14}{row['search_dim']:>6}{row['ram_bytes'] / 2 ** 20:>10.1f}"
+            f"{row['disk_bytes'] / 2 ** 20:>10.1f}{row['payload_bytes'] / 2 ** 20:>13.1f}"
+            f"{row['qps']:>10}{row[f'recall_at_{k}']:>11}"
+        )
+    return "\n".join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark reduced-dimension first-stage search.")
+    parser.add_argument("--corpus-size", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--settings", default="full,pca:128,pca:64,pca:32,truncate:64")
+    parser.add_argument("--sample-size", type=int, default=10000, help="Vectors the projection is fitted on")
+    parser.add_argument("--oversample", type=int, default=4, help="First-stage candidates per result")
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--encoder", choices=("hash", "model"), default="hash")
+    parser.add_argument("--qdrant-url", help="Benchmark against this Qdrant server instead of local mode")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON results here")
+    return parser
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.WARNING)
+    args = build_parser().parse_args(argv)
+    settings = parse_settings(args.settings)
+
+    if args.encoder == "model":
+        from sentence_transformers import SentenceTransformer
+        encoder = SentenceTransformer("all-MiniLM-L6-v2")
+    else:
+        encoder = HashingEncoder(DEFAULT_DIM)
+    corpus, queries = build_corpus(encoder, args.corpus_size, args.queries, args.seed)
+    truth = exact_top_k(corpus, queries, args.k)
+
+    client = QdrantClient(location=args.qdrant_url or ":memory:")
+    rows = [
+        run_setting(client, setting, corpus, queries, truth, args.sample_size, args.oversample, args.k)
+        for setting in settings
+    ]
+    print(format_report(rows, args.k))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "config": vars(args),
+                "results": rows,
+                "environment": {"python": platform.python_version(), "platform": platform.platform()},
+            }, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
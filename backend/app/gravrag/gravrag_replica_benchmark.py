@@ -0,0 +1,180 @@
+"""
+Recall latency with read replicas, least-outstanding-requests balancing, hedging and circuit breaking.
+
+Every replica is an in-process Qdrant stand-in (local mode, loaded with the same small synthetic corpus) whose
+reads get injected latency: a base delay plus, with some probability, a long stall like the one a segment merge
+causes on a real server. Local mode is not thread-safe, so each stand-in runs one search at a time after its
+injected delay; the corpus is kept small so that the injected latency, not local search, dominates. Scenarios
+run the same concurrent search workload and report p50/p95/p99:
+
+    single      one endpoint, the current deployment
+    balanced    two replicas, least-outstanding-requests, no hedging
+    hedged      two replicas, hedged after --hedge-delay-ms
+    failover    two replicas, one failing every read (the breaker opens and traffic moves to the other)
+
+Usage (from backend/app):
+    python -m gravrag.gravrag_replica_benchmark --requests 2000 --concurrency 16 --stall-probability 0.02
+"""
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct, SearchRequest, VectorParams, Distance
+
+from gravrag.gravrag_benchmark import HashingEncoder, synthetic_text
+from gravrag.gravrag_replicas import ReplicatedQdrantClient, READ_METHODS
+from gravrag.gravrag_metrics import HEDGED_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "replica_bench"
+
+
+class SlowClient:
+    """ Qdrant stand-in injecting latency (and optionally failures) into reads. """
+
+    def __init__(self, client: QdrantClient, base_latency: float, stall_probability: float, stall_seconds: float,
+                 fail: bool = False, seed: int = 0):
+        self.client = client
+        self.base_latency = base_latency
+        self.stall_probability = stall_probability
+        self.stall_seconds = stall_seconds
+        self.fail = fail
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._search_lock = threading.Lock()
+
+    def __getattr__(self, name: str):
+        method = getattr(self.client, name)
+        if name not in READ_METHODS:
+            return method
+
+        def slow(*args, **kwargs):
+            with self._lock:
+                stalled = self._rng.random() < self.stall_probability
+                jitter = self._rng.uniform(0.5, 1.5)
+            time.sleep(self.base_latency * jitter + (self.stall_seconds if stalled else 0.0))
+            if self.fail:
+                raise ConnectionError("injected replica failure")
+            with self._search_lock:
+                return method(*args, **kwargs)
+
+        return slow
+
+
+def build_replica(vectors: np.ndarray) -> QdrantClient:
+    client = QdrantClient(location=":memory:")
+    client.create_collection(COLLECTION, vectors_config=VectorParams(size=vectors.shape[1], distance=Distance.COSINE))
+    for start in range(0, len(vectors), 1000):
+        client.upsert(COLLECTION, points=[
+            PointStruct(id=start + row, vector=vector.tolist()) for row, vector in enumerate(vectors[start:start + 1000])
+        ])
+    return client
+
+
+def run_scenario(client, queries: np.ndarray, requests: int, concurrency: int, top_k: int) -> Dict[str, Any]:
+    hedges_sent = HEDGED_REQUESTS.labels(outcome="sent")._value.get()
+    hedges_won = HEDGED_REQUESTS.labels(outcome="won")._value.get()
+
+    def one(index: int):
+        query = queries[index % len(queries)].tolist()
+        start = time.perf_counter()
+        try:
+            client.search_batch(collection_name=COLLECTION, requests=[SearchRequest(vector=query, limit=top_k)])
+            return time.perf_counter() - start, None
+        except Exception as e:
+            return time.perf_counter() - start, str(e)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(one, range(requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array([latency for latency, error in results if error is None]) * 1000
+    return {
+        "requests": requests,
+        "errors": sum(1 for _, error in results if error is not None),
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2) if len(latencies) else None,
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2) if len(latencies) else None,
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2) if len(latencies) else None,
+        "hedges_sent": int(HEDGED_REQUESTS.labels(outcome="sent")._value.get() - hedges_sent),
+        "hedges_won": int(HEDGED_REQUESTS.labels(outcome="won")._value.get() - hedges_won),
+    }
+
+
+def format_report(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'scenario':<10}{'errors':>8}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'hedges':>8}{'won':>6}"]
+    for row in rows:
+        lines.append(
+            f"{row['scenario']:<10}{row['errors']:>8}{row['throughput_rps']:>9}{row['p50_ms']:>9}"
+            f"{row['p95_ms']:>9}{row['p99_ms']:>9}{row['hedges_sent']:>8}{row['hedges_won']:>6}"
+        )
+    return "\n".join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark hedged, load-balanced reads across Qdrant replicas.")
+    parser.add_argument("--corpus-size", type=int, default=1000)
+    parser.add_argument("--dim", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--base-latency-ms", type=float, default=5.0, help="Injected latency of every read")
+    parser.add_argument("--stall-probability", type=float, default=0.02, help="Chance a read hits a stall")
+    parser.add_argument("--stall-ms", type=float, default=250.0, help="Injected stall duration")
+    parser.add_argument("--hedge-delay-ms", type=float, default=20.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON results here")
+    return parser
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.ERROR)
+    args = build_parser().parse_args(argv)
+    rng = random.Random(args.seed)
+    encoder = HashingEncoder(args.dim)
+    vectors = np.asarray(encoder.encode([synthetic_text(rng) for _ in range(args.corpus_size)]), dtype=np.float32)
+    queries = np.asarray(encoder.encode([synthetic_text(rng) for _ in range(200)]), dtype=np.float32)
+    replicas = [build_replica(vectors), build_replica(vectors)]
+
+    def slow(index: int, fail: bool = False) -> SlowClient:
+        return SlowClient(replicas[index], args.base_latency_ms / 1000, args.stall_probability, args.stall_ms / 1000,
+                          fail=fail, seed=args.seed + index)
+
+    scenarios = {
+        "single": lambda: slow(0),
+        "balanced": lambda: ReplicatedQdrantClient(replicas[0], [("a", slow(0)), ("b", slow(1))], hedge_delay=0),
+        "hedged": lambda: ReplicatedQdrantClient(
+            replicas[0], [("a", slow(0)), ("b", slow(1))], hedge_delay=args.hedge_delay_ms / 1000
+        ),
+        "failover": lambda: ReplicatedQdrantClient(
+            replicas[0], [("a", slow(0)), ("b", slow(1, fail=True))], hedge_delay=args.hedge_delay_ms / 1000
+        ),
+    }
+    rows = []
+    for name, build in scenarios.items():
+        rows.append({"scenario": name, **run_scenario(build(), queries, args.requests, args.concurrency, args.k)})
+    print(format_report(rows))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "config": vars(args),
+                "results": rows,
+                "environment": {"python": platform.python_version(), "platform": platform.platform()},
+            }, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
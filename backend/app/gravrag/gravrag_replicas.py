@@ -0,0 +1,204 @@
+import os
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import List, Dict, Any, Optional, Tuple
+
+from qdrant_client import QdrantClient
+
+from gravrag.gravrag_metrics import REPLICA_REQUESTS, HEDGED_REQUESTS, BREAKER_STATE
+
+logger = logging.getLogger(__name__)
+
+# Idempotent hot-path reads; everything else (writes, scrolls of admin jobs, collection management) uses the primary
+READ_METHODS = (
+    "search", "search_batch", "query_points", "query_batch_points", "recommend", "recommend_batch", "retrieve"
+)
+DEFAULT_HEDGE_DELAY = float(os.getenv("GRAVRAG_HEDGE_DELAY_MS", 50)) / 1000  # 0 disables hedging
+DEFAULT_FAILURE_THRESHOLD = int(os.getenv("GRAVRAG_BREAKER_FAILURES", 5))
+DEFAULT_RESET_TIMEOUT = float(os.getenv("GRAVRAG_BREAKER_RESET_SECONDS", 30))
+BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+class CircuitBreaker:
+    """
+    Stops sending reads to an endpoint after `failure_threshold` consecutive failures. After `reset_timeout`
+    seconds one trial request is let through (half-open); its success closes the breaker, its failure re-opens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_pending = False
+        self._lock = threading.Lock()
+        self._gauge = BREAKER_STATE.labels(endpoint=name)
+        self._gauge.set(BREAKER_STATES["closed"])
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def allow(self) -> bool:
+        """ Whether a request may go to this endpoint now; claims the single half-open trial slot. """
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self.trial_pending:
+                self.trial_pending = True
+                self._gauge.set(BREAKER_STATES["half_open"])
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info(f"Circuit breaker for '{self.name}' closed.")
+            self.failures = 0
+            self.opened_at = None
+            self.trial_pending = False
+            self._gauge.set(BREAKER_STATES["closed"])
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            # A failed trial re-opens the breaker; late failures of requests sent before it opened do not extend it
+            if self.trial_pending or (self.opened_at is None and self.failures >= self.failure_threshold):
+                logger.warning(f"Circuit breaker for '{self.name}' opened after {self.failures} failures.")
+                self.opened_at = time.monotonic()
+                self.trial_pending = False
+                self._gauge.set(BREAKER_STATES["open"])
+
+
+class ReadEndpoint:
+    """ One read replica: its client, in-flight request count and circuit breaker. """
+
+    def __init__(self, name: str, client: QdrantClient, breaker: Optional[CircuitBreaker] = None):
+        self.name = name
+        self.client = client
+        self.breaker = breaker or CircuitBreaker(name)
+        self.outstanding = 0
+
+
+class ReplicatedQdrantClient:
+    """
+    Drop-in stand-in for QdrantClient that spreads hot-path reads (READ_METHODS) across read replicas and sends
+    everything else to the primary. Each read goes to the healthy replica with the fewest outstanding requests
+    (random among ties). If it has not answered after `hedge_delay` seconds, a duplicate goes to the next best
+    replica and the first answer wins, so one replica stalling on a segment merge does not set p99. A failed
+    read is retried on another replica at once; replicas whose breakers are open are skipped, and reads fall
+    back to the primary when no replica is available. Replicas may lag the primary slightly behind writes.
+    """
+
+    def __init__(self, primary: QdrantClient, replicas: List[Tuple[str, QdrantClient]],
+                 hedge_delay: float = DEFAULT_HEDGE_DELAY, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT, max_workers: Optional[int] = None):
+        self.primary = primary
+        self.endpoints = [
+            ReadEndpoint(name, client, CircuitBreaker(name, failure_threshold, reset_timeout))
+            for name, client in replicas
+        ]
+        self.hedge_delay = hedge_delay
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or 16 * max(len(self.endpoints), 1), thread_name_prefix="gravrag-read"
+        )
+
+    def __getattr__(self, name: str):
+        # Only reached for attributes not defined here: writes and admin calls go to the primary
+        if name in READ_METHODS:
+            return lambda *args, **kwargs: self._read(name, args, kwargs)
+        return getattr(self.primary, name)
+
+    def _choose(self, exclude) -> Optional[ReadEndpoint]:
+        """ The healthy endpoint with the fewest outstanding requests, skipping those in `exclude`. """
+        with self._lock:
+            candidates = [endpoint for endpoint in self.endpoints if endpoint not in exclude]
+            random.shuffle(candidates)
+            candidates.sort(key=lambda endpoint: endpoint.outstanding)
+        for endpoint in candidates:
+            if endpoint.breaker.allow():
+                return endpoint
+        return None
+
+    def _submit(self, endpoint: ReadEndpoint, method: str, args, kwargs) -> Future:
+        with self._lock:
+            endpoint.outstanding += 1
+
+        def call():
+            try:
+                result = getattr(endpoint.client, method)(*args, **kwargs)
+            except Exception:
+                endpoint.breaker.record_failure()
+                REPLICA_REQUESTS.labels(endpoint=endpoint.name, outcome="error").inc()
+                raise
+            finally:
+                with self._lock:
+                    endpoint.outstanding -= 1
+            endpoint.breaker.record_success()
+            REPLICA_REQUESTS.labels(endpoint=endpoint.name, outcome="success").inc()
+            return result
+
+        return self._executor.submit(call)
+
+    def _read(self, method: str, args, kwargs):
+        first = self._choose(exclude=())
+        if first is None:
+            REPLICA_REQUESTS.labels(endpoint="primary", outcome="fallback").inc()
+            return getattr(self.primary, method)(*args, **kwargs)
+
+        pending: Dict[Future, ReadEndpoint] = {self._submit(first, method, args, kwargs): first}
+        tried = {first}
+        hedged = False
+        backups = set()
+        while pending:
+            timeout = self.hedge_delay if self.hedge_delay > 0 and not hedged else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                hedged = True
+                backup = self._choose(exclude=tried)
+                if backup is not None:
+                    HEDGED_REQUESTS.labels(outcome="sent").inc()
+                    pending[self._submit(backup, method, args, kwargs)] = backup
+                    tried.add(backup)
+                    backups.add(backup)
+                continue
+            for future in done:
+                endpoint = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.warning(f"Read '{method}' failed on '{endpoint.name}': {str(e)}")
+                    continue
+                if endpoint in backups:
+                    HEDGED_REQUESTS.labels(outcome="won").inc()
+                return result
+            if not pending:
+                # Everything in flight failed: fail over to the next replica, then to the primary
+                retry = self._choose(exclude=tried)
+                if retry is not None:
+                    pending[self._submit(retry, method, args, kwargs)] = retry
+                    tried.add(retry)
+
+        REPLICA_REQUESTS.labels(endpoint="primary", outcome="fallback").inc()
+        return getattr(self.primary, method)(*args, **kwargs)
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [
+            {"endpoint": endpoint.name, "outstanding": endpoint.outstanding,
+             "breaker": endpoint.breaker.state, "failures": endpoint.breaker.failures}
+            for endpoint in self.endpoints
+        ]
+
+
+def configured_read_urls() -> List[str]:
+    """ Read replica URLs from GRAVRAG_READ_URLS (comma-separated). """
+    return [url.strip() for url in os.getenv("GRAVRAG_READ_URLS", "").split(",") if url.strip()]
@@ -0,0 +1,136 @@
+import os
+import time
+import logging
+import threading
+from collections import defaultdict
+from typing import List, Dict, Any, Optional
+
+from qdrant_client import QdrantClient
+
+logger = logging.getLogger(__name__)
+
+STATS_PAYLOAD = ["metadata.objective_id", "metadata.tags", "metadata.gravitational_pull"]
+MAX_AGE_SECONDS = float(os.getenv("GRAVRAG_STATS_MAX_AGE_SECONDS", 3600))  # Full rescan at least this often
+SCAN_BATCH_SIZE = 1000
+
+
+def _facet() -> Dict[str, List[float]]:
+    return defaultdict(lambda: [0, 0.0])  # key -> [memories, summed gravitational pull]
+
+
+def _summary(count: int, pull: float) -> Dict[str, Any]:
+    return {"count": count, "avg_gravitational_pull": pull / count if count else None}
+
+
+class StatsTable:
+    """
+    Per-objective and per-tag memory counts and gravitational pull sums, kept in memory for dashboards.
+
+    The table is built by one scroll over the collections, fetching only the three payload keys it needs,
+    and then kept current by writes: create_memory adds its memory, while bulk writes (loads, imports,
+    deletes, patches, consolidation) mark it stale so it gets rescanned. It is also rescanned once it is
+    `max_age_seconds` old, which bounds drift from writes made outside this process. Objectives are keyed by
+    their string form, so 42 and "42" share a row.
+    """
+
+    def __init__(self, max_age_seconds: float = MAX_AGE_SECONDS):
+        self.max_age_seconds = max_age_seconds
+        self.total = [0, 0.0]
+        self.objectives = _facet()
+        self.tags = _facet()
+        self.built_at: Optional[float] = None
+        self.stale = True
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self._pending: Optional[List[Dict[str, Any]]] = None  # Additions made while a rescan is running
+
+    @staticmethod
+    def _add(metadata: Dict[str, Any], total: List[float], objectives, tags):
+        pull = float(metadata.get("gravitational_pull") or 0.0)
+        total[0] += 1
+        total[1] += pull
+        if metadata.get("objective_id") not in (None, ""):
+            entry = objectives[str(metadata["objective_id"])]
+            entry[0] += 1
+            entry[1] += pull
+        for tag in set(metadata.get("tags") or []):
+            entry = tags[tag]
+            entry[0] += 1
+            entry[1] += pull
+
+    def add(self, metadata: Dict[str, Any]):
+        """ Count a newly created memory. """
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(metadata)
+            if not self.stale:
+                self._add(metadata, self.total, self.objectives, self.tags)
+
+    def invalidate(self):
+        with self._lock:
+            self.stale = True
+
+    def reset(self):
+        """ Empty the table, for a purge. """
+        with self._lock:
+            self.total, self.objectives, self.tags = [0, 0.0], _facet(), _facet()
+            self.built_at, self.stale = time.time(), False
+
+    def needs_rebuild(self) -> bool:
+        return self.stale or self.built_at is None or time.time() - self.built_at > self.max_age_seconds
+
+    def rebuild(self, qdrant_client: QdrantClient, collection_names: List[str], batch_size: int = SCAN_BATCH_SIZE):
+        """
+        Rescan the collections into a new table and swap it in. Memories created during the scan are counted
+        once more afterwards; one the scan also saw is counted twice until the next rescan.
+        """
+        with self._rebuild_lock:
+            if not self.needs_rebuild():  # Another caller rebuilt it while this one waited
+                return
+            with self._lock:
+                self._pending = []
+                self.stale = False  # Invalidations from here on apply to the new table
+            started = time.perf_counter()
+            total, objectives, tags = [0, 0.0], _facet(), _facet()
+            try:
+                for collection_name in collection_names:
+                    offset = None
+                    while True:
+                        points, offset = qdrant_client.scroll(
+                            collection_name=collection_name, limit=batch_size, offset=offset,
+                            with_payload=STATS_PAYLOAD, with_vectors=False
+                        )
+                        for point in points:
+                            self._add((point.payload or {}).get("metadata") or {}, total, objectives, tags)
+                        if offset is None:
+                            break
+            except Exception:
+                with self._lock:
+                    self._pending, self.stale = None, True
+                raise
+            with self._lock:
+                for metadata in self._pending:
+                    self._add(metadata, total, objectives, tags)
+                self._pending = None
+                self.total, self.objectives, self.tags = total, objectives, tags
+                self.built_at = time.time()
+            logger.info(f"Stats table rebuilt over {total[0]} memories in {time.perf_counter() - started:.2f}s.")
+
+    def snapshot(self, limit: int = 100) -> Dict[str, Any]:
+        """ Totals plus the `limit` largest objectives and tags, by memory count. """
+        with self._lock:
+            def top(facet, key: str) -> List[Dict[str, Any]]:
+                ranked = sorted(facet.items(), key=lambda item: (-item[1][0], item[0]))[:limit]
+                return [{key: name, **_summary(count, pull)} for name, (count, pull) in ranked if count]
+
+            return {
+                "total": _summary(*self.total),
+                "objectives": top(self.objectives, "objective_id"),
+                "tags": top(self.tags, "tag"),
+                "objective_count": sum(1 for count, _ in self.objectives.values() if count),
+                "tag_count": sum(1 for count, _ in self.tags.values() if count),
+                "refreshed_at": self.built_at,
+                "age_seconds": round(time.time() - self.built_at, 3) if self.built_at else None,
+                "stale": self.stale,  # Bulk writes since the last rescan are not reflected yet
+                "refreshing": self._pending is not None,
+            }
@@ -0,0 +1,222 @@
+import os
+import time
+import uuid
+import asyncio
+import logging
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from gravrag.gravrag_metrics import SUBSCRIPTIONS, SUBSCRIPTION_EVENTS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 0.5  # Cosine similarity a new memory needs to match a standing query
+MAX_SUBSCRIPTIONS = int(os.getenv("GRAVRAG_MAX_SUBSCRIPTIONS", 1000))
+QUEUE_SIZE = int(os.getenv("GRAVRAG_SUBSCRIPTION_QUEUE", 256))  # Undelivered events kept per consumer
+IDLE_SECONDS = float(os.getenv("GRAVRAG_SUBSCRIPTION_IDLE_SECONDS", 3600))  # Dropped after this long unconsumed
+
+
+class Subscription:
+    """
+    A standing query and the bounded queues of matches waiting for its consumers. Every attached consumer
+    gets its own queue and so sees every event; matches arriving while none is attached wait in a backlog
+    that the next consumer receives.
+    """
+
+    def __init__(self, query: str, threshold: float, tags: Optional[List[str]] = None, queue_size: int = QUEUE_SIZE):
+        self.id = str(uuid.uuid4())
+        self.query = query
+        self.threshold = threshold
+        self.tags = set(tags or [])
+        self.queue_size = queue_size
+        self.backlog: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.queues: List[asyncio.Queue] = []  # One per attached consumer
+        self.created_at = time.time()
+        self.last_seen = self.created_at  # Last time a consumer was attached
+        self.matched = 0
+        self.dropped = 0
+
+    @property
+    def consumers(self) -> int:
+        return len(self.queues)
+
+    def _put(self, queue: asyncio.Queue, event: Dict[str, Any]):
+        if queue.full():
+            queue.get_nowait()
+            self.dropped += 1
+            SUBSCRIPTION_EVENTS.labels(outcome="dropped").inc()
+        queue.put_nowait(event)
+        SUBSCRIPTION_EVENTS.labels(outcome="queued").inc()
+
+    def offer(self, event: Dict[str, Any]):
+        """ Queue an event for every consumer without blocking; a lagging consumer's oldest event makes room. """
+        for queue in self.queues or [self.backlog]:
+            self._put(queue, event)
+        self.matched += 1
+
+    async def next_event(self, queue: asyncio.Queue, timeout: float) -> Optional[Dict[str, Any]]:
+        """ The next event on a consumer's queue, or None after `timeout` seconds without one (time for a keepalive). """
+        try:
+            return await asyncio.wait_for(queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def attach(self) -> asyncio.Queue:
+        """ A new consumer's queue; the first consumer also takes over the backlog. """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        if not self.queues:
+            while not self.backlog.empty():
+                queue.put_nowait(self.backlog.get_nowait())
+        self.queues.append(queue)
+        self.last_seen = time.time()
+        return queue
+
+    def detach(self, queue: asyncio.Queue):
+        self.queues.remove(queue)
+        self.last_seen = time.time()
+
+    def close(self):
+        """ Wake attached consumers with a final 'closed' event once the subscription is removed. """
+        for queue in self.queues or [self.backlog]:
+            while queue.full():
+                queue.get_nowait()
+            queue.put_nowait({"subscription_id": self.id, "event": "closed"})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "query": self.query,
+            "threshold": self.threshold,
+            "tags": sorted(self.tags),
+            "created_at": self.created_at,
+            "consumers": self.consumers,
+            "pending": max([queue.qsize() for queue in self.queues] or [self.backlog.qsize()]),
+            "matched": self.matched,
+            "dropped": self.dropped,
+        }
+
+
+class SubscriptionRegistry:
+    """
+    Standing queries held as one (n, dim) matrix of unit query vectors, so each new memory is scored against
+    every subscription with a single matrix-vector product instead of clients polling recall. Thresholds live
+    in a parallel array; tag filters are only checked for the rows that pass. The matrix is rebuilt when a
+    subscription is added or removed, which is rare next to memory creation. Not thread-safe: use it from the
+    event loop that serves the subscriptions.
+    """
+
+    def __init__(self, max_subscriptions: int = MAX_SUBSCRIPTIONS, idle_seconds: float = IDLE_SECONDS):
+        self.max_subscriptions = max_subscriptions
+        self.idle_seconds = idle_seconds
+        self.subscriptions: Dict[str, Subscription] = {}
+        self._order: List[str] = []  # Subscription ID of each matrix row
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._thresholds = np.zeros(0, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.subscriptions)
+
+    def get(self, subscription_id: str) -> Subscription:
+        """ Raises KeyError for an unknown (or expired) subscription. """
+        if subscription_id not in self.subscriptions:
+            raise KeyError(f"Subscription not found: {subscription_id}")
+        return self.subscriptions[subscription_id]
+
+    def add(self, query: str, vector, threshold: float = DEFAULT_THRESHOLD,
+            tags: Optional[List[str]] = None) -> Subscription:
+        """ Register a standing query; raises RuntimeError once `max_subscriptions` are registered. """
+        self.expire_idle()
+        if len(self.subscriptions) >= self.max_subscriptions:
+            raise RuntimeError(f"At most {self.max_subscriptions} subscriptions can be registered")
+        subscription = Subscription(query, threshold, tags)
+        self.subscriptions[subscription.id] = subscription
+        self._rebuild({subscription.id: np.asarray(vector, dtype=np.float32)})
+        return subscription
+
+    def remove(self, subscription_id: str) -> Subscription:
+        subscription = self.get(subscription_id)
+        del self.subscriptions[subscription_id]
+        self._rebuild()
+        subscription.close()
+        return subscription
+
+    def expire_idle(self, now: Optional[float] = None) -> int:
+        """ Drop subscriptions nobody consumed for `idle_seconds`; returns how many were dropped. """
+        now = now or time.time()
+        idle = [
+            subscription_id for subscription_id, subscription in self.subscriptions.items()
+            if subscription.consumers == 0 and now - subscription.last_seen > self.idle_seconds
+        ]
+        for subscription_id in idle:
+            self.subscriptions.pop(subscription_id).close()
+        if idle:
+            logger.info(f"Expired {len(idle)} idle subscriptions.")
+            self._rebuild()
+        return len(idle)
+
+    def reencode(self, vectors: Dict[str, Any]) -> int:
+        """
+        Replace the query vectors of the given subscriptions, after the embedding model changed. Subscriptions
+        left out whose vectors no longer fit the new dimension are closed. Returns how many were closed.
+        """
+        vectors = {
+            subscription_id: np.asarray(vector, dtype=np.float32) for subscription_id, vector in vectors.items()
+            if subscription_id in self.subscriptions
+        }
+        if not vectors:
+            return 0
+        dim = next(iter(vectors.values())).shape[0]
+        stale = [] if self._matrix.shape[1] == dim else [sid for sid in self._order if sid not in vectors]
+        for subscription_id in stale:
+            self.subscriptions.pop(subscription_id).close()
+        if stale:
+            logger.warning(f"Closed {len(stale)} subscriptions whose query vectors no longer fit the model.")
+        self._rebuild(vectors)
+        return len(stale)
+
+    def _rebuild(self, new_vectors: Optional[Dict[str, np.ndarray]] = None):
+        rows = {subscription_id: self._matrix[row] for row, subscription_id in enumerate(self._order)}
+        rows.update(new_vectors or {})
+        self._order = [subscription_id for subscription_id in rows if subscription_id in self.subscriptions]
+        if self._order:
+            matrix = np.stack([rows[subscription_id] for subscription_id in self._order]).astype(np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            self._matrix = matrix / np.where(norms > 0, norms, 1.0)
+        else:
+            self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._thresholds = np.array([self.subscriptions[sid].threshold for sid in self._order], dtype=np.float32)
+        SUBSCRIPTIONS.set(len(self._order))
+
+    def publish(self, vector, point_id: Any, content: str, metadata: Dict[str, Any]) -> int:
+        """
+        Score a new memory against every standing query at once and queue an event for each match.
+        Returns the number of subscriptions matched; a vector from another model than the queries matches none.
+        """
+        if not self._order:
+            return 0
+        vector = np.asarray(vector, dtype=np.float32)
+        if vector.shape[0] != self._matrix.shape[1]:
+            logger.warning(f"Skipped publishing {point_id}: its vector has {vector.shape[0]} dimensions, the "
+                           f"standing queries {self._matrix.shape[1]}.")
+            return 0
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return 0
+        scores = self._matrix @ (vector / norm)
+        memory_tags = set(metadata.get("tags") or [])
+        matched = 0
+        for row in np.flatnonzero(scores >= self._thresholds):
+            subscription = self.subscriptions[self._order[row]]
+            if subscription.tags and not subscription.tags & memory_tags:
+                continue
+            subscription.offer({
+                "subscription_id": subscription.id,
+                "event": "memory",
+                "id": str(point_id),
+                "score": float(scores[row]),
+                "content": content,
+                "metadata": metadata,
+            })
+            matched += 1
+        return matched
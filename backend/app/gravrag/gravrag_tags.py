@@ -0,0 +1,88 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+
+class TagIndex:
+    """
+    Packs tag sets into fixed-width bitsets for batched Jaccard similarity.
+
+    With every tag set of a candidate batch packed into a (n, words) uint64 matrix, Jaccard
+    similarity for the whole batch is a bitwise AND/OR plus a popcount instead of two Python
+    sets per memory. Tags are numbered per batch, so the bitset width is bounded by the tags
+    of that batch rather than by every tag ever seen.
+    """
+
+    @staticmethod
+    def vocabulary(*batches: Sequence[Optional[Iterable[Any]]]) -> Dict[str, int]:
+        """ Dense integer IDs for the distinct tags of one or more batches of tag lists. """
+        ids: Dict[str, int] = {}
+        for batch in batches:
+            for tags in batch:
+                for tag in tags or []:
+                    ids.setdefault(str(tag), len(ids))
+        return ids
+
+    @staticmethod
+    def encode(tag_lists: Sequence[Optional[Iterable[Any]]], ids: Dict[str, int],
+               words: Optional[int] = None) -> np.ndarray:
+        """
+        Pack a batch of tag lists into a (len(tag_lists), words) uint64 bitset matrix using `ids`
+        (see vocabulary). Missing (None) tag lists are encoded as empty sets.
+        """
+        id_lists = [[ids[str(tag)] for tag in (tags or [])] for tags in tag_lists]
+        if words is None:
+            words = max(1, (len(ids) + 63) // 64)
+
+        bits = np.zeros((len(id_lists), words), dtype=np.uint64)
+        rows = [row for row, tag_ids in enumerate(id_lists) for _ in tag_ids]
+        if rows:
+            flat = np.fromiter((tag_id for tag_ids in id_lists for tag_id in tag_ids), dtype=np.int64, count=len(rows))
+            np.bitwise_or.at(
+                bits,
+                (np.asarray(rows), flat // 64),
+                np.left_shift(np.uint64(1), (flat % 64).astype(np.uint64)),
+            )
+        return bits
+
+    @staticmethod
+    def popcount(bits: np.ndarray) -> np.ndarray:
+        """ Count set bits per row of a uint64 bitset matrix. """
+        return np.unpackbits(np.ascontiguousarray(bits).view(np.uint8), axis=-1).sum(axis=-1)
+
+    def jaccard(
+        self,
+        tag_lists: Sequence[Optional[Iterable[Any]]],
+        reference_tags: Sequence[Optional[Iterable[Any]]],
+    ) -> np.ndarray:
+        """
+        Row-wise Jaccard similarity between two batches of tag lists, in one vectorized pass.
+
+        `reference_tags` is either one list per row or a single-element batch that is broadcast
+        against every row. Rows where either side is empty score 1.0, matching
+        MemoryPacket.calculate_memetic_similarity.
+        """
+        # Number the tags of both batches together so both matrices share the same width.
+        ids = self.vocabulary(tag_lists, reference_tags)
+        words = max(1, (len(ids) + 63) // 64)
+
+        a = self.encode(tag_lists, ids, words)
+        b = self.encode(reference_tags, ids, words)
+
+        intersection = self.popcount(a & b)
+        union = self.popcount(a | b)
+        empty = (self.popcount(a) == 0) | (self.popcount(b) == 0)
+
+        scores = np.ones(len(a), dtype=np.float64)
+        valid = ~empty & (union > 0)
+        scores[valid] = intersection[valid] / union[valid]
+        return scores
+
+
+def normalize_tags(tags: Optional[Iterable[Any]]) -> List[str]:
+    """ Coerce a tag collection into the de-duplicated list of strings stored in the payload. """
+    if not tags:
+        return []
+    if isinstance(tags, str):
+        tags = [tags]
+    return list(dict.fromkeys(str(tag) for tag in tags))
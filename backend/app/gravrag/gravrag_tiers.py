@@ -0,0 +1,120 @@
+import os
+import time
+import logging
+from typing import Dict, Any, Optional
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    Filter, FieldCondition, Range, PointStruct, PointIdsList, HnswConfigDiff,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType
+)
+
+from gravrag.gravrag_projection import VectorLayout
+from gravrag.gravrag_aliases import create_aliased
+from gravrag.gravrag_consolidate import _spacetime_now
+from gravrag.gravrag_graph import NEIGHBORS_FIELD, NEIGHBOR_SCORES_FIELD
+
+logger = logging.getLogger(__name__)
+
+HOT, COLD = "hot", "cold"
+COLD_SUFFIX = "_cold"
+DEFAULT_CONFIDENCE = float(os.getenv("GRAVRAG_TIER_CONFIDENCE", 0.5))  # Best hot cosine that skips the cold tier
+DEFAULT_SPACETIME_THRESHOLD = float(os.getenv("GRAVRAG_TIER_SPACETIME_THRESHOLD", 1e-6))
+DEFAULT_MIN_AGE_SECONDS = float(os.getenv("GRAVRAG_TIER_MIN_AGE_SECONDS", 24 * 3600))
+DEFAULT_INTERVAL_SECONDS = float(os.getenv("GRAVRAG_TIER_INTERVAL_SECONDS", 600))
+DEFAULT_BATCH_SIZE = 1000
+
+
+def tiering_enabled() -> bool:
+    """ Whether GRAVRAG_TIERING turns hot/cold tiering on. """
+    return os.getenv("GRAVRAG_TIERING", "").lower() in ("1", "true", "yes", "on")
+
+
+def cold_collection_name(collection_name: str) -> str:
+    return f"{collection_name}{COLD_SUFFIX}"
+
+
+def ensure_cold_collection(qdrant_client: QdrantClient, collection_name: str, layout: VectorLayout, dim: int):
+    """
+    Create the cold tier unless it exists: the hot tier's vector layout with original vectors, HNSW graph and
+    payload on disk, and int8 scalar-quantized vectors in RAM. Searches run on the quantized copy and rescore
+    the best candidates from disk, so a large cold tier costs roughly a quarter of the hot tier's vector memory.
+    """
+    if qdrant_client.collection_exists(collection_name):
+        return
+    vectors_config = layout.vectors_config(dim)
+    if isinstance(vectors_config, dict):
+        vectors_config = {name: params.model_copy(update={"on_disk": True}) for name, params in vectors_config.items()}
+    else:
+        vectors_config = vectors_config.model_copy(update={"on_disk": True})
+    logger.info(f"Creating cold tier collection '{collection_name}'.")
+    create_aliased(
+        qdrant_client, collection_name,
+        vectors_config=vectors_config,
+        hnsw_config=HnswConfigDiff(on_disk=True),
+        quantization_config=ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        ),
+        on_disk_payload=True
+    )
+
+
+def needs_cold(hits, limit: int, confidence: float) -> bool:
+    """ A hot-tier answer is not confident when it is short of `limit` hits or its best score is below `confidence`. """
+    return len(hits) < limit or max((float(hit.score) for hit in hits), default=0.0) < confidence
+
+
+def demote_memories(qdrant_client: QdrantClient, hot_collection: str, cold_collection: str,
+                    layout: Optional[VectorLayout] = None,
+                    spacetime_threshold: float = DEFAULT_SPACETIME_THRESHOLD,
+                    min_age_seconds: float = DEFAULT_MIN_AGE_SECONDS,
+                    batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Move memories whose spacetime coordinate, decayed to now, fell below `spacetime_threshold` from the hot
+    tier to the cold tier. The timestamp index pre-filters memories older than `min_age_seconds`; each page is
+    upserted into the cold tier before it is deleted from the hot one, so a memory is never missing from both
+    (recall de-duplicates the brief overlap). Demoted memories leave the memory graph: their neighbour fields
+    are dropped, and hot neighbour lists pointing at them are fixed by the next graph repair.
+    """
+    start = time.perf_counter()
+    layout = layout or VectorLayout()
+    now = time.time()
+    age_filter = Filter(must=[FieldCondition(key="metadata.timestamp", range=Range(lte=now - min_age_seconds))])
+    scanned = demoted = 0
+    offset = None
+    while True:
+        points, offset = qdrant_client.scroll(
+            collection_name=hot_collection,
+            scroll_filter=age_filter,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=False
+        )
+        scanned += len(points)
+        cold = [
+            point for point in points
+            if point.payload.get("vector")
+            and _spacetime_now(point.payload.get("metadata", {}), now) < spacetime_threshold
+        ]
+        if cold:
+            qdrant_client.upsert(collection_name=cold_collection, wait=True, points=[
+                PointStruct(
+                    id=point.id,
+                    vector=layout.point_vector(point.payload["vector"]),
+                    payload={key: value for key, value in point.payload.items()
+                             if key not in (NEIGHBORS_FIELD, NEIGHBOR_SCORES_FIELD)}
+                )
+                for point in cold
+            ])
+            qdrant_client.delete(
+                collection_name=hot_collection,
+                points_selector=PointIdsList(points=[point.id for point in cold])
+            )
+            demoted += len(cold)
+            logger.info(f"Tier mover: {demoted} memories demoted after scanning {scanned}.")
+        if offset is None:
+            break
+
+    elapsed = time.perf_counter() - start
+    return {"scanned": scanned, "demoted": demoted, "seconds": round(elapsed, 3)}
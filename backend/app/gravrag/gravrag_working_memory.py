@@ -0,0 +1,184 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+from qdrant_client.models import ScoredPoint
+
+WORKING = "working"
+SESSION_KEYS = ("session_id", "objective_id")  # Metadata keys a memory's session is taken from, in order
+DEFAULT_CAPACITY = int(os.getenv("GRAVRAG_WORKING_MEMORY_SIZE", 256))  # Memories kept per session
+DEFAULT_MAX_SESSIONS = int(os.getenv("GRAVRAG_WORKING_MEMORY_SESSIONS", 1024))
+DEFAULT_TTL_SECONDS = float(os.getenv("GRAVRAG_WORKING_MEMORY_TTL_SECONDS", 3600))
+DEFAULT_CONFIDENCE = float(os.getenv("GRAVRAG_WORKING_MEMORY_CONFIDENCE", 0.75))  # k-th best cosine to skip Qdrant
+
+
+def session_key(metadata: Optional[Dict[str, Any]]) -> Optional[str]:
+    """ The working-memory session of a memory: its `session_id`, else its `objective_id`. """
+    for key in SESSION_KEYS:
+        value = (metadata or {}).get(key)
+        if value not in (None, ""):
+            return str(value)
+    return None
+
+
+class SessionMemory:
+    """
+    The most recently written or recalled memories of one session: their unit vectors in a preallocated
+    (capacity, dim) matrix, and their payloads. When full, the least recently used memory's row is reused.
+    """
+
+    def __init__(self, capacity: int, dim: int):
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.entries: List[Optional[Dict[str, Any]]] = [None] * capacity
+        self.slots: "OrderedDict[Any, int]" = OrderedDict()  # point ID -> row, least recently used first
+
+    def add(self, point_id: Any, vector: np.ndarray, payload: Dict[str, Any], now: float):
+        if point_id in self.slots:
+            slot = self.slots[point_id]
+            self.slots.move_to_end(point_id)
+        elif len(self.slots) < len(self.entries):
+            slot = len(self.slots)
+            self.slots[point_id] = slot
+        else:
+            _, slot = self.slots.popitem(last=False)
+            self.slots[point_id] = slot
+        norm = np.linalg.norm(vector)
+        self.vectors[slot] = vector / norm if norm > 0 else vector
+        self.entries[slot] = {"id": point_id, "payload": payload, "added_at": now}
+
+    def remove(self, point_id: Any):
+        """ Drop a memory, moving the last row into its place so the used rows stay contiguous. """
+        slot = self.slots.pop(point_id, None)
+        if slot is None:
+            return
+        last = len(self.slots)
+        if slot != last:
+            moved = self.entries[last]
+            self.vectors[slot], self.entries[slot] = self.vectors[last], moved
+            self.slots[moved["id"]] = slot
+        self.entries[last] = None
+
+
+class WorkingMemory:
+    """
+    In-process tier of recent memories per session, searched before Qdrant on recalls that name a session.
+
+    Each session keeps up to `capacity` of the memories it wrote in the last `ttl_seconds` as a small NumPy
+    matrix, so a recall is one matrix-vector product; the least recently written or recalled memory makes
+    room for a new one. Sessions are evicted least recently used beyond `max_sessions`. The tier only caches
+    memories that are also in Qdrant; entries go stale when memories change in Qdrant without going through
+    the MemoryManager, and the TTL bounds how long for.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, max_sessions: int = DEFAULT_MAX_SESSIONS,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS, confidence: float = DEFAULT_CONFIDENCE):
+        self.capacity = capacity
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.confidence = confidence
+        self.sessions: "OrderedDict[str, SessionMemory]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(session.slots) for session in self.sessions.values())
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0 and self.max_sessions > 0
+
+    def add(self, session: Optional[str], point_id: Any, payload: Dict[str, Any]):
+        """ Remember a memory (payload with 'vector', 'content' and 'metadata') for its session. """
+        if not self.enabled or session is None:
+            return
+        vector = np.asarray(payload["vector"], dtype=np.float32)
+        with self._lock:
+            memory = self.sessions.get(session)
+            if memory is None or memory.vectors.shape[1] != len(vector):
+                memory = self.sessions[session] = SessionMemory(self.capacity, len(vector))
+            self.sessions.move_to_end(session)
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+            memory.add(point_id, vector, payload, time.time())
+
+    def search(self, session: Optional[str], query_vector, limit: int, tags: Optional[List[str]] = None,
+               since: Optional[float] = None, until: Optional[float] = None) -> List[ScoredPoint]:
+        """
+        The session's best `limit` memories by cosine similarity, as scored points carrying a copy of the
+        payload. With `tags`, only memories sharing one of them; `since`/`until` bound the timestamp.
+        Expired memories are dropped on the way.
+        """
+        if not self.enabled or session is None:
+            return []
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        now = time.time()
+        with self._lock:
+            memory = self.sessions.get(session)
+            if memory is None or memory.vectors.shape[1] != len(query):
+                return []
+            self.sessions.move_to_end(session)
+            for entry in [entry for entry in memory.entries[:len(memory.slots)]
+                          if now - entry["added_at"] > self.ttl_seconds]:
+                memory.remove(entry["id"])
+            used = len(memory.slots)
+            if not used:
+                return []
+            scores = memory.vectors[:used] @ (query / norm)
+            wanted = set(tags or [])
+            hits = []
+            for row in np.argsort(-scores):
+                entry = memory.entries[row]
+                metadata = entry["payload"].get("metadata") or {}
+                if wanted and not wanted & set(metadata.get("tags") or []):
+                    continue
+                timestamp = metadata.get("timestamp", 0.0)
+                if (since is not None and timestamp < since) or (until is not None and timestamp > until):
+                    continue
+                hits.append(ScoredPoint(id=entry["id"], version=0, score=float(scores[row]), payload={
+                    **entry["payload"], "metadata": dict(metadata)  # Re-ranking rewrites metadata in place
+                }))
+                if len(hits) == limit:
+                    break
+            for hit in hits:
+                memory.slots.move_to_end(hit.id)
+        return hits
+
+    def confident(self, hits: List[ScoredPoint], limit: int) -> bool:
+        """ Whether working-memory hits answer a recall alone: `limit` of them, the weakest above `confidence`. """
+        return len(hits) >= limit > 0 and min(hit.score for hit in hits[:limit]) >= self.confidence
+
+    def discard(self, point_ids: List[Any]):
+        """ Forget memories deleted from Qdrant. """
+        point_ids = set(point_ids)
+        with self._lock:
+            for memory in self.sessions.values():
+                for point_id in point_ids & memory.slots.keys():
+                    memory.remove(point_id)
+
+    def discard_matching(self, criteria: Dict[str, Any]):
+        """
+        Forget memories whose metadata matches `criteria` the way Qdrant's exact-match conditions do: each value
+        (each element of a list value) must equal the key's value or be one of its elements.
+        """
+        def matches(metadata: Dict[str, Any]) -> bool:
+            for key, value in criteria.items():
+                stored = metadata.get(key)
+                for item in (value if isinstance(value, list) else [value]):
+                    if not (stored == item or (isinstance(stored, list) and item in stored)):
+                        return False
+            return True
+
+        with self._lock:
+            for memory in self.sessions.values():
+                for entry in [entry for entry in memory.entries[:len(memory.slots)]
+                              if matches(entry["payload"].get("metadata") or {})]:
+                    memory.remove(entry["id"])
+
+    def clear(self):
+        with self._lock:
+            self.sessions.clear()
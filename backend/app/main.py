@@ -1,5 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import make_asgi_app
 import uvicorn
 
 # Importing Routers
@@ -18,6 +19,10 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
+# Prometheus metrics
+metrics_app = make_asgi_app()
+app.mount("/metrics", metrics_app)
+
 # Include routers for each module
 # app.include_router(agentchef_router, prefix="/agentchef", tags=["AgentChef API"])
 app.include_router(gravrag_router, prefix="/gravrag", tags=["GravRAG API"])
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
 import logging
-from models.gravrag import MemoryManager
+from app.services.gravrag import MemoryManager
+from app.core.metrics import track_endpoint
 
 # from fastapi import APIRouter, HTTPException
 # from pydantic import BaseModel
@@ -10,7 +11,7 @@ from models.gravrag import MemoryManager
 # import logging
 # from models.gravrag import MemoryManager
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(track_endpoint)])
 logger = logging.getLogger(__name__)
 memory_manager = MemoryManager()
 
@@ -27,11 +28,14 @@ class PruneRequest(BaseModel):
 
 class RecallWithMetadataRequest(BaseModel):
     query: str
-    metadata: str
+    metadata: Dict[str, Any]
     top_k: Optional[int] = 10
 
 class DeleteByMetadataRequest(BaseModel):
-    metadata: str
+    metadata: Dict[str, Any]
+
+class MigrateMetadataRequest(BaseModel):
+    batch_size: Optional[int] = 500
 
 @router.post("/create_memory")
 async def create_memory(memory_request: MemoryRequest):
@@ -115,4 +119,16 @@ async def delete_by_metadata(delete_request: DeleteByMetadataRequest):
         return {"message": "Memory deletion by metadata completed successfully"}
     except Exception as e:
         logger.error(f"Error deleting memories by metadata: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Error deleting memories: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error deleting memories: {str(e)}")
+
+@router.post("/migrate_metadata")
+async def migrate_metadata(migrate_request: MigrateMetadataRequest):
+    """
+    Rewrite memories stored with JSON-string metadata into native payloads so metadata filters can use the payload indexes.
+    """
+    try:
+        result = await memory_manager.migrate_string_metadata(batch_size=migrate_request.batch_size or 500)
+        return {"message": "Metadata migration completed successfully", **result}
+    except Exception as e:
+        logger.error(f"Error migrating metadata: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error migrating metadata: {str(e)}")
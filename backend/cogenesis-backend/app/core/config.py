@@ -10,6 +10,11 @@ class Settings(BaseSettings):
     JWT_SECRET_KEY: str = "your-secret-key"
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    PASSWORD_HASH_WORKERS: int = 2
+    LOGIN_MAX_PENDING: int = 16
+    LOGIN_RETRY_AFTER_SECONDS: int = 1
+    TOKEN_CACHE_TTL_SECONDS: int = 60
+    TOKEN_CACHE_MAX_SIZE: int = 10000
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,74 @@
+import math
+import time
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from fastapi import Request
+from prometheus_client import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+# Endpoint of the request being served; MemoryManager stages inherit it as their label.
+# Metric names match backend/app/gravrag so both deployments share dashboards.
+current_endpoint: ContextVar[str] = ContextVar("gravrag_endpoint", default="internal")
+
+STAGE_SECONDS = Histogram(
+    "gravrag_stage_seconds",
+    "Time spent in each GravRAG stage (encode, qdrant_search, qdrant_upsert, rerank, serialize).",
+    ["endpoint", "stage"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+MEMORIES_TOTAL = Counter(
+    "gravrag_memories_total",
+    "Memories created, pruned or deleted.",
+    ["event"],
+)
+COLLECTION_POINTS = Gauge(
+    "gravrag_collection_points",
+    "Approximate number of points in a GravRAG collection, read from Qdrant at scrape time.",
+    ["collection"],
+)
+POOL_QUEUE_DEPTH = Gauge(
+    "gravrag_pool_queue_depth",
+    "Requests currently admitted or waiting in a GravRAG worker pool.",
+    ["pool"],
+)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """ Record the duration of a hot-path stage under the current endpoint label. """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(endpoint=current_endpoint.get(), stage=stage).observe(time.perf_counter() - start)
+
+
+def track_collection_size(qdrant_client, collection_name: str):
+    """ Report the collection's point count lazily, on each Prometheus scrape. """
+    def count() -> float:
+        try:
+            return qdrant_client.count(collection_name, exact=False).count
+        except Exception as e:
+            logger.warning(f"Could not count collection '{collection_name}': {str(e)}")
+            return math.nan
+
+    COLLECTION_POINTS.labels(collection=collection_name).set_function(count)
+
+
+async def track_endpoint(request: Request):
+    """
+    Router dependency that labels every stage recorded while serving the request with its endpoint
+    and counts the request in the 'requests' pool while it is in flight.
+    """
+    # Each request runs in its own task context, so the label does not leak between requests
+    route = request.scope.get("route")
+    current_endpoint.set(route.path if route is not None else request.url.path)
+    in_flight = POOL_QUEUE_DEPTH.labels(pool="requests")
+    in_flight.inc()
+    try:
+        yield
+    finally:
+        in_flight.dec()
@@ -1,6 +1,11 @@
-
+import hmac
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
@@ -8,10 +13,17 @@ from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel
 
 from app.core.config import settings
+from app.core.metrics import POOL_QUEUE_DEPTH
+
+logger = logging.getLogger(__name__)
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# bcrypt is deliberately CPU-expensive; it runs here so it never blocks the event loop
+password_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_pending_logins = 0
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -19,12 +31,85 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     username: Optional[str] = None
 
+class VerifiedTokenCache:
+    """
+    Short-TTL LRU cache of decoded tokens, keyed by the token's signature segment.
+    An entry is only returned for the exact token it was stored for, and never outlives the token's 'exp'.
+    """
+
+    def __init__(self, ttl_seconds: int, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[str, TokenData, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> Optional[TokenData]:
+        signature = token.rpartition(".")[2]
+        entry = self._entries.get(signature)
+        if entry is None:
+            return None
+        cached_token, token_data, expires_at = entry
+        if expires_at <= time.time() or not hmac.compare_digest(cached_token, token):
+            self._entries.pop(signature, None)
+            return None
+        self._entries.move_to_end(signature)
+        return token_data
+
+    def put(self, token: str, token_data: TokenData, exp: Optional[float] = None):
+        expires_at = time.time() + self.ttl_seconds
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+        if expires_at <= time.time() or self.max_size <= 0:
+            return
+        signature = token.rpartition(".")[2]
+        self._entries[signature] = (token, token_data, expires_at)
+        self._entries.move_to_end(signature)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+token_cache = VerifiedTokenCache(settings.TOKEN_CACHE_TTL_SECONDS, settings.TOKEN_CACHE_MAX_SIZE)
+
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password, hashed_password):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, pwd_context.verify, plain_password, hashed_password)
+
+async def get_password_hash_async(password):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, pwd_context.hash, password)
+
+async def admit_login():
+    """
+    Dependency for login routes. Bounds how many logins may wait on the password executor;
+    a burst beyond LOGIN_MAX_PENDING is turned away with 429 instead of queueing unboundedly.
+    """
+    global _pending_logins
+    if _pending_logins >= settings.LOGIN_MAX_PENDING:
+        logger.warning(f"Rejecting login: {_pending_logins} logins already pending.")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts in progress, retry shortly.",
+            headers={"Retry-After": str(settings.LOGIN_RETRY_AFTER_SECONDS)},
+        )
+    _pending_logins += 1
+    depth = POOL_QUEUE_DEPTH.labels(pool="login")
+    depth.inc()
+    try:
+        yield
+    finally:
+        _pending_logins -= 1
+        depth.dec()
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -36,6 +121,10 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 async def get_current_user(token: str = Depends(oauth2_scheme)):
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -49,4 +138,5 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         token_data = TokenData(username=username)
     except JWTError:
         raise credentials_exception
-    return token_data
\ No newline at end of file
+    token_cache.put(token, token_data, exp=payload.get("exp"))
+    return token_data
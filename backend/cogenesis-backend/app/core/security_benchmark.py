@@ -0,0 +1,175 @@
+"""
+Authenticated recall throughput benchmark for the cogenesis security path.
+
+Serves a bearer-protected recall route and a login route in-process (httpx ASGI transport), then
+drives concurrent authenticated recalls while a burst of logins arrives. The same workload runs
+against the legacy path (bcrypt and jwt.decode inline on the event loop) and the current one
+(bcrypt on the password executor, verified-token cache, login admission control), so the report
+shows how much recall throughput and tail latency a login burst costs in each.
+
+The recall handler ranks a seeded in-memory matrix with numpy as a stand-in for Qdrant, which
+keeps the measurement on the auth path rather than on the vector store.
+
+Usage (from cogenesis-backend):
+    python -m app.core.security_benchmark --duration 10 --concurrency 32 --login-burst 64 --output auth_bench.json
+"""
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import platform
+from typing import Dict, Any
+
+import numpy as np
+from fastapi import Depends, FastAPI, HTTPException, status
+from jose import JWTError, jwt
+from fastapi.security import OAuth2PasswordRequestForm
+
+from app.core import security
+from app.core.security import (
+    TokenData, oauth2_scheme, pwd_context, create_access_token, get_current_user,
+    verify_password_async, admit_login
+)
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+USERNAME = "bench"
+PASSWORD = "bench-password"
+
+
+def legacy_current_user(token: str = Depends(oauth2_scheme)) -> TokenData:
+    """ The original get_current_user: jwt.decode on every request, no cache. """
+    try:
+        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+    except JWTError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+    return TokenData(username=payload.get("sub"))
+
+
+def build_app(mode: str, corpus_size: int, dim: int, seed: int) -> FastAPI:
+    rng = np.random.default_rng(seed)
+    corpus = rng.standard_normal((corpus_size, dim)).astype(np.float32)
+    corpus /= np.linalg.norm(corpus, axis=1, keepdims=True)
+    hashed_password = pwd_context.hash(PASSWORD)
+
+    app = FastAPI()
+    current_user = get_current_user if mode == "optimized" else legacy_current_user
+
+    @app.post("/recall")
+    async def recall(body: Dict[str, Any], user: TokenData = Depends(current_user)):
+        query = np.asarray(body["vector"], dtype=np.float32)
+        scores = corpus @ query
+        top = np.argpartition(-scores, 5)[:5]
+        return {"user": user.username, "ids": top.tolist()}
+
+    if mode == "optimized":
+        @app.post("/token", dependencies=[Depends(admit_login)])
+        async def login(form: OAuth2PasswordRequestForm = Depends()):
+            if not await verify_password_async(form.password, hashed_password):
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect username or password")
+            return {"access_token": create_access_token({"sub": form.username}), "token_type": "bearer"}
+    else:
+        @app.post("/token")
+        async def login(form: OAuth2PasswordRequestForm = Depends()):
+            # bcrypt inline: blocks the event loop for every login
+            if not pwd_context.verify(form.password, hashed_password):
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect username or password")
+            return {"access_token": create_access_token({"sub": form.username}), "token_type": "bearer"}
+
+    return app
+
+
+def percentiles(latencies) -> Dict[str, float]:
+    if not latencies:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None}
+    values = np.percentile(np.asarray(latencies) * 1000, [50, 95, 99])
+    return {"p50_ms": round(float(values[0]), 2), "p95_ms": round(float(values[1]), 2), "p99_ms": round(float(values[2]), 2)}
+
+
+async def run_workload(app: FastAPI, duration: float, concurrency: int, login_burst: int, dim: int, seed: int) -> Dict[str, Any]:
+    import httpx
+
+    rng = np.random.default_rng(seed + 1)
+    queries = rng.standard_normal((256, dim)).astype(np.float32).tolist()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.post("/token", data={"username": USERNAME, "password": PASSWORD})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        recall_latencies = []
+        login_statuses: Dict[int, int] = {}
+        deadline = time.perf_counter() + duration
+
+        async def recaller(worker: int):
+            i = worker
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                r = await client.post("/recall", json={"vector": queries[i % len(queries)]}, headers=headers)
+                recall_latencies.append(time.perf_counter() - start)
+                r.raise_for_status()
+                i += concurrency
+
+        async def login_bursts():
+            # One burst per second for the whole run, like a fleet of clients re-authenticating together
+            while time.perf_counter() < deadline:
+                responses = await asyncio.gather(*[
+                    client.post("/token", data={"username": USERNAME, "password": PASSWORD}) for _ in range(login_burst)
+                ])
+                for r in responses:
+                    login_statuses[r.status_code] = login_statuses.get(r.status_code, 0) + 1
+                await asyncio.sleep(1.0)
+
+        start = time.perf_counter()
+        await asyncio.gather(login_bursts(), *[recaller(worker) for worker in range(concurrency)])
+        elapsed = time.perf_counter() - start
+
+    return {
+        "recall": {
+            "requests": len(recall_latencies),
+            "throughput_rps": round(len(recall_latencies) / elapsed, 1),
+            **percentiles(recall_latencies),
+        },
+        "logins": {str(code): count for code, count in sorted(login_statuses.items())},
+        "seconds": round(elapsed, 3),
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark authenticated recall throughput under login bursts.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per mode.")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent recall clients.")
+    parser.add_argument("--login-burst", type=int, default=64, help="Logins fired together once per second.")
+    parser.add_argument("--corpus-size", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--modes", default="legacy,optimized", help="Comma-separated subset of legacy,optimized.")
+    parser.add_argument("--output", help="Write the JSON results here.")
+    return parser
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.WARNING)
+    args = build_parser().parse_args(argv)
+
+    results: Dict[str, Any] = {"config": vars(args).copy()}
+    for mode in args.modes.split(","):
+        security.token_cache.clear()
+        app = build_app(mode, args.corpus_size, args.dim, args.seed)
+        results[mode] = asyncio.run(run_workload(app, args.duration, args.concurrency, args.login_burst, args.dim, args.seed))
+        recall = results[mode]["recall"]
+        print(f"{mode:>10}: {recall['throughput_rps']:>8} recall/s  p50 {recall['p50_ms']} ms  "
+              f"p95 {recall['p95_ms']} ms  p99 {recall['p99_ms']} ms  logins {results[mode]['logins']}")
+    results["environment"] = {"python": platform.python_version(), "platform": platform.platform()}
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
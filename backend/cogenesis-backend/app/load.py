@@ -0,0 +1,64 @@
+"""
+Bulk-load memories into the cogenesis store from a JSONL, CSV or Parquet file, resuming from its checkpoint.
+
+Usage (from backend/cogenesis-backend):
+    python -m app.load memories.jsonl --workers 4 --parallel 4
+
+The loader itself is GravRAG's (backend/app/gravrag/gravrag_load.py), imported from GRAVRAG_ROOT, the directory
+holding the gravrag package (default: backend/app next to this checkout).
+"""
+import os
+import sys
+import json
+import logging
+import argparse
+
+GRAVRAG_ROOT = os.getenv("GRAVRAG_ROOT") or os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, "app")
+)
+if GRAVRAG_ROOT not in sys.path:
+    sys.path.append(GRAVRAG_ROOT)
+
+from gravrag import gravrag_load as loader  # noqa: E402
+
+logging.basicConfig(level=logging.INFO)
+
+MODEL_NAME = "all-MiniLM-L6-v2"  # The model MemoryManager encodes with
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Bulk-load a JSONL, CSV or Parquet file of memories, resumably.")
+    parser.add_argument("path")
+    parser.add_argument("--collection", default="Mind", help="Collection name")
+    parser.add_argument("--format", choices=loader.SOURCE_FORMATS, help="Default: from the file extension")
+    parser.add_argument("--batch-size", type=int, default=loader.DEFAULT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=loader.DEFAULT_WORKERS,
+                        help="Encoder processes (0 encodes in this process)")
+    parser.add_argument("--parallel", type=int, default=loader.DEFAULT_PARALLEL, help="Concurrent upserts")
+    parser.add_argument("--checkpoint", help=f"Checkpoint file (default: <path>{loader.CHECKPOINT_SUFFIX})")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    parser.add_argument("--content-field", default="content")
+    parser.add_argument("--metadata-field", default="metadata")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    from app.core.config import settings
+    from app.services.gravrag import MemoryManager
+    memory_manager = MemoryManager(
+        qdrant_host=settings.QDRANT_HOST, qdrant_port=settings.QDRANT_PORT, collection_name=args.collection
+    )
+    result = loader.load_memories(
+        memory_manager.store_memories, args.path, args.format, MODEL_NAME,
+        encode=lambda texts: memory_manager.model.encode(texts, batch_size=args.batch_size),
+        batch_size=args.batch_size, workers=args.workers, parallel=args.parallel,
+        checkpoint_path=args.checkpoint, restart=args.restart,
+        content_field=args.content_field, metadata_field=args.metadata_field
+    )
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
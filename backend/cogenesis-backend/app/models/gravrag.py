@@ -16,11 +16,11 @@ from datetime import datetime
 
 class MemoryPacket(BaseModel):
     vector: List[float]
-    metadata: str
+    metadata: Dict[str, Any]
 
 class MemoryRequest(BaseModel):
     content: str
-    metadata: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None
 
 class RecallRequest(BaseModel):
     query: str
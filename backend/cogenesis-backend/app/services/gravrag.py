@@ -1,6 +1,7 @@
 
 import json
 from app.core.config import settings
+from app.core.metrics import stage_timer, track_collection_size, MEMORIES_TOTAL
 from app.models.gravrag import MemoryPacket
 import time
 import math
@@ -9,7 +10,10 @@ import logging
 from typing import List, Dict, Any, Optional
 from sentence_transformers import SentenceTransformer
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client.models import (
+    Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue, FilterSelector, PayloadSchemaType,
+    IsEmptyCondition, PayloadField, SetPayload, SetPayloadOperation
+)
 from sklearn.metrics.pairwise import cosine_similarity
 from datetime import datetime
 
@@ -20,11 +24,53 @@ logger = logging.getLogger(__name__)
 # Gravitational constants and thresholds
 GRAVITATIONAL_THRESHOLD = 1e-5  # This can be adjusted based on system requirements
 
+# Nested metadata keys with a Qdrant payload index, so metadata filters run server-side
+PAYLOAD_INDEXES = {
+    "metadata.objective_id": PayloadSchemaType.KEYWORD,
+    "metadata.task_id": PayloadSchemaType.KEYWORD,
+    "metadata.tags": PayloadSchemaType.KEYWORD,
+    "metadata.timestamp": PayloadSchemaType.FLOAT,
+}
+
+def parse_metadata(metadata: Any) -> Dict[str, Any]:
+    """ Metadata as a dict; points written before native payloads hold it as a JSON string. """
+    if not metadata:
+        return {}
+    if isinstance(metadata, str):
+        return json.loads(metadata)
+    return dict(metadata)
+
+def metadata_filter(metadata: Dict[str, Any]) -> Filter:
+    """
+    Qdrant filter matching memories whose metadata has every given key/value.
+    List values require every element to be present in the stored list.
+    """
+    conditions = []
+    for key, value in metadata.items():
+        values = value if isinstance(value, list) else [value]
+        conditions.extend(match_condition(f"metadata.{key}", item) for item in values)
+    return Filter(must=conditions)
+
+def match_condition(key: str, value: Any):
+    """
+    Exact match of one payload value. On keyword-indexed keys, an integer and its digit string match each
+    other ("42" finds objective_id 42 and the reverse), since clients store IDs both ways.
+    """
+    forms = [value]
+    if PAYLOAD_INDEXES.get(key) == PayloadSchemaType.KEYWORD:
+        if isinstance(value, str) and value.lstrip("-").isdigit():
+            forms.append(int(value))
+        elif isinstance(value, int) and not isinstance(value, bool):
+            forms.append(str(value))
+    if len(forms) == 1:
+        return FieldCondition(key=key, match=MatchValue(value=value))
+    return Filter(should=[FieldCondition(key=key, match=MatchValue(value=form)) for form in forms])
+
 class MemoryPacket:
-    def __init__(self, vector: List[float], content: str, metadata: str):
+    def __init__(self, vector: List[float], content: str, metadata: Dict[str, Any]):
         self.vector = vector  # Semantic vector (numeric representation)
         self.content = content  # Original content (human-readable text)
-        self.metadata = json.loads(metadata) if metadata else {}
+        self.metadata = parse_metadata(metadata)
 
         # Metadata defaults
         self.metadata.setdefault("timestamp", time.time())
@@ -115,7 +161,7 @@ class MemoryPacket:
         return {
             "vector": self.vector,  # Correctly storing the vector here
             "content": self.content,  # Storing the original content here
-            "metadata": json.dumps(self.metadata)  # Convert metadata to JSON string
+            "metadata": self.metadata  # Native nested payload, so Qdrant can index and filter it
         }
 
     @staticmethod
@@ -123,7 +169,7 @@ class MemoryPacket:
         """ Recreate a MemoryPacket from a payload, ensuring 'content' is handled correctly. """
         vector = payload.get("vector")
         content = payload.get("content", "")  # Ensure content is present, or provide a default value
-        metadata = payload.get("metadata", "{}")  # Get metadata as JSON string
+        metadata = payload.get("metadata", {})  # Native dict, or a JSON string on unmigrated points
         
         # Raise an error if vector is missing, as it is essential for MemoryPacket
         if not vector:
@@ -138,6 +184,7 @@ class MemoryManager:
         self.collection_name = collection_name
         self.model = SentenceTransformer('all-MiniLM-L6-v2')  # Semantic vector model
         self._setup_collection()
+        track_collection_size(self.qdrant_client, self.collection_name)
 
     def _setup_collection(self):
         """
@@ -152,54 +199,89 @@ class MemoryManager:
                 collection_name=self.collection_name,
                 vectors_config=VectorParams(size=self.model.get_sentence_embedding_dimension(), distance=Distance.COSINE)
             )
+        self._setup_payload_indexes()
+
+    def _setup_payload_indexes(self):
+        """
+        Create the payload indexes used for server-side metadata filtering. Creating an existing index is a no-op.
+        """
+        for field_name, field_schema in PAYLOAD_INDEXES.items():
+            try:
+                self.qdrant_client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name=field_name,
+                    field_schema=field_schema
+                )
+            except Exception as e:
+                logger.warning(f"Could not create payload index '{field_name}': {str(e)}")
 
     async def create_memory(self, content: str, metadata: Dict[str, Any]):
         """
         Create a memory from content, vectorize it, and store in Qdrant asynchronously.
         """
-        vector = self.model.encode(content).tolist()
-        metadata_json = json.dumps(metadata)
+        with stage_timer("encode"):
+            vector = self.model.encode(content).tolist()
         memory_packet = MemoryPacket(vector=vector, content=content, metadata=metadata)
         point_id = str(uuid.uuid4())
         
         # Insert the memory packet into the Qdrant collection
-        self.qdrant_client.upsert(
-            collection_name=self.collection_name,
-            points=[PointStruct(id=point_id, vector=vector, payload=memory_packet.to_payload())]
-        )
+        with stage_timer("qdrant_upsert"):
+            self.qdrant_client.upsert(
+                collection_name=self.collection_name,
+                points=[PointStruct(id=point_id, vector=vector, payload=memory_packet.to_payload())]
+            )
+        MEMORIES_TOTAL.labels(event="created").inc()
         logger.info(f"Memory created successfully with ID: {point_id}")
 
+    def store_memories(self, point_ids: List[Any], contents: List[str], vectors, metadatas: List[Dict[str, Any]]) -> int:
+        """
+        Store a batch of already-encoded memories in one upsert, for bulk loads (see app.load).
+        Existing IDs are overwritten. Safe to call from several threads at once.
+        """
+        points = []
+        for point_id, content, vector, metadata in zip(point_ids, contents, vectors, metadatas):
+            vector = [float(x) for x in vector]
+            memory_packet = MemoryPacket(vector=vector, content=content, metadata=metadata)
+            points.append(PointStruct(id=point_id, vector=vector, payload=memory_packet.to_payload()))
+        with stage_timer("qdrant_upsert"):
+            self.qdrant_client.upsert(collection_name=self.collection_name, points=points, wait=True)
+        MEMORIES_TOTAL.labels(event="created").inc(len(points))
+        return len(points)
+
     async def recall_memory(self, query_content: str, top_k: int = 5):
         """ Recall a memory based on query content and return the original content along with metadata. """
-        query_vector = self.model.encode(query_content).tolist()
+        with stage_timer("encode"):
+            query_vector = self.model.encode(query_content).tolist()
 
         # Perform semantic search with Qdrant (using the query vector and top_k limit)
-        results = self.qdrant_client.search(
-            collection_name=self.collection_name,
-            query_vector=query_vector,
-            limit=top_k
-        )
-
-        # Recreate MemoryPacket objects from the search results
-        memories = [MemoryPacket.from_payload(hit.payload) for hit in results]
-
-        # Update relevance for each memory
-        for memory in memories:
-            memory.update_relevance(query_vector)
-
-        # Rank memories based on combined relevance factors
-        ranked_memories = sorted(
-            memories,
-            key=lambda mem: (
-                mem.metadata['semantic_relativity'] * mem.metadata['memetic_similarity'] * mem.metadata['gravitational_pull']
-            ),
-            reverse=True
-        )
+        with stage_timer("qdrant_search"):
+            results = self.qdrant_client.search(
+                collection_name=self.collection_name,
+                query_vector=query_vector,
+                limit=top_k
+            )
+
+        with stage_timer("rerank"):
+            # Recreate MemoryPacket objects from the search results
+            memories = [MemoryPacket.from_payload(hit.payload) for hit in results]
+
+            # Update relevance for each memory
+            for memory in memories:
+                memory.update_relevance(query_vector)
+
+            # Rank memories based on combined relevance factors
+            ranked_memories = sorted(
+                memories,
+                key=lambda mem: (
+                    mem.metadata['semantic_relativity'] * mem.metadata['memetic_similarity'] * mem.metadata['gravitational_pull']
+                ),
+                reverse=True
+            )
 
         # Return original content and metadata for top K results
         return [{
             "content": memory.content,  # Return the original content
-            "metadata": json.loads(memory.metadata)  # Convert JSON string to dict for output
+            "metadata": memory.metadata
         } for memory in ranked_memories[:top_k]]
 
     async def prune_memories(self):
@@ -208,12 +290,16 @@ class MemoryManager:
         """
         total_points = self.qdrant_client.count(self.collection_name).count
         if total_points > 1000000:  # Arbitrary limit
-            points = self.qdrant_client.scroll(self.collection_name, limit=1000)
-            low_relevance_points = [
-                p.id for p in points if p.payload['metadata']['gravitational_pull'] < GRAVITATIONAL_THRESHOLD
-            ]
+            points, _ = self.qdrant_client.scroll(self.collection_name, limit=1000, with_vectors=False)
+            low_relevance_points = []
+            for p in points:
+                # Points not migrated yet hold their metadata as a JSON string
+                pull = parse_metadata(p.payload.get("metadata")).get("gravitational_pull")
+                if pull is not None and pull < GRAVITATIONAL_THRESHOLD:
+                    low_relevance_points.append(p.id)
             if low_relevance_points:
                 self.qdrant_client.delete(self.collection_name, points_selector=low_relevance_points)
+                MEMORIES_TOTAL.labels(event="pruned").inc(len(low_relevance_points))
     
     async def purge_all_memories(self):
         """
@@ -232,31 +318,24 @@ class MemoryManager:
 
     async def recall_memory_with_metadata(self, query_content: str, search_metadata: Dict[str, Any], top_k: int = 10):
         """
-        Recall memories based on query content, and further filter by matching metadata.
+        Recall memories based on query content, restricted server-side to memories matching the metadata.
         """
         try:
-            # Step 1: Vector search for the top K most relevant memories based on semantic similarity
-            query_vector = self.model.encode(query_content).tolist()
-            results = self.qdrant_client.search(
-                collection_name=self.collection_name,
-                query_vector=query_vector,
-                limit=top_k
-            )
-
-            # Step 2: Recreate MemoryPacket objects from the search results
-            memories = [MemoryPacket.from_payload(hit.payload) for hit in results]
-
-            # Step 3: Filter the top K results based on metadata
-            matching_memories = []
-            for memory in memories:
-                memory_metadata = json.loads(memory.metadata)  # Parse JSON string to dict
-
-                # Check if all search metadata keys/values match the memory metadata
-                if all(memory_metadata.get(key) == value for key, value in search_metadata.items()):
-                    matching_memories.append({
-                        "content": memory.content,
-                        "metadata": memory_metadata
-                    })
+            # Vector search over only the memories whose metadata matches, using the payload indexes
+            with stage_timer("encode"):
+                query_vector = self.model.encode(query_content).tolist()
+            with stage_timer("qdrant_search"):
+                results = self.qdrant_client.search(
+                    collection_name=self.collection_name,
+                    query_vector=query_vector,
+                    query_filter=metadata_filter(search_metadata),
+                    limit=top_k
+                )
+
+            matching_memories = [{
+                "content": hit.payload.get("content", ""),
+                "metadata": parse_metadata(hit.payload.get("metadata"))
+            } for hit in results]
 
             if not matching_memories:
                 return {"message": "No matching memories found"}
@@ -273,34 +352,56 @@ class MemoryManager:
         Delete memories where the metadata matches the given metadata criteria.
         """
         try:
-            # Scroll through all memories in the collection
-            scroll_result = self.qdrant_client.scroll(self.collection_name, limit=1000)
+            selector = metadata_filter(metadata)
+            matching = self.qdrant_client.count(self.collection_name, count_filter=selector, exact=True).count
 
-            # Check if result is a list of points, otherwise handle it as a tuple
-            if isinstance(scroll_result, tuple):
-                points = scroll_result[0]
-            else:
-                points = scroll_result
-            
-            # List to store the IDs of memories to be deleted
-            memories_to_delete = []
-            
-            for point in points:
-                if isinstance(point, dict) and 'payload' in point:
-                    point_metadata = json.loads(point['payload']['metadata'])  # Parse JSON string to dict
-                    
-                    # Check if the point's metadata matches the provided metadata
-                    if all(point_metadata.get(key) == value for key, value in metadata.items()):
-                        memories_to_delete.append(point["id"])
-            
             # Delete the memories that match the metadata criteria
-            if memories_to_delete:
-                self.qdrant_client.delete(self.collection_name, points_selector=memories_to_delete)
-                logger.info(f"Deleted {len(memories_to_delete)} memories matching the metadata.")
+            if matching:
+                self.qdrant_client.delete(self.collection_name, points_selector=FilterSelector(filter=selector))
+                MEMORIES_TOTAL.labels(event="deleted").inc(matching)
+                logger.info(f"Deleted {matching} memories matching the metadata.")
             else:
                 logger.info("No memories found matching the specified metadata.")
         except Exception as e:
             logger.error(f"Error deleting memories by metadata: {str(e)}")
             raise e
 
-memory_manager = MemoryManager()
\ No newline at end of file
+    async def migrate_string_metadata(self, batch_size: int = 500) -> Dict[str, int]:
+        """
+        Rewrite points whose metadata is still a JSON string into native nested payloads, in batches.
+        Legacy points are selected server-side: a JSON string has no 'metadata.timestamp' key to index.
+        """
+        legacy_filter = Filter(must=[IsEmptyCondition(is_empty=PayloadField(key="metadata.timestamp"))])
+        scanned = migrated = failed = 0
+        offset = None
+        while True:
+            points, offset = self.qdrant_client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=legacy_filter,
+                limit=batch_size,
+                offset=offset,
+                with_payload=["metadata"],
+                with_vectors=False
+            )
+            operations = []
+            for point in points:
+                scanned += 1
+                metadata = point.payload.get("metadata")
+                if not isinstance(metadata, str):
+                    continue
+                try:
+                    parsed = parse_metadata(metadata)
+                except ValueError:
+                    failed += 1
+                    logger.warning(f"Point {point.id} has unparseable metadata; left unchanged.")
+                    continue
+                operations.append(SetPayloadOperation(set_payload=SetPayload(payload={"metadata": parsed}, points=[point.id])))
+
+            if operations:
+                self.qdrant_client.batch_update_points(collection_name=self.collection_name, update_operations=operations)
+                migrated += len(operations)
+                logger.info(f"Migrated {migrated} memories to native metadata payloads.")
+            if offset is None:
+                break
+
+        return {"scanned": scanned, "migrated": migrated, "failed": failed}
@@ -1,8 +1,16 @@
+import asyncio
 import pytest
+from unittest import mock
 from fastapi.testclient import TestClient
-from app.main import app
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, VectorParams, PointStruct
 import logging
 
+# The API module builds its MemoryManager at import; keep that from loading the model and connecting to Qdrant
+with mock.patch("app.services.gravrag.MemoryManager"):
+    from app.main import app
+    from app.api import gravrag as gravrag_api
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -10,12 +18,14 @@ logger = logging.getLogger(__name__)
 client = TestClient(app)
 
 @pytest.fixture
-def mock_memory_manager(mocker):
-    return mocker.patch('app.services.gravrag.MemoryManager')
+def mock_memory_manager(monkeypatch):
+    manager = mock.AsyncMock()  # Its methods return awaitables, like the real coroutines
+    monkeypatch.setattr(gravrag_api, "memory_manager", manager)
+    return manager
 
 # Test for creating a memory
 def test_create_memory(mock_memory_manager):
-    mock_memory_manager.return_value.create_memory.return_value = None
+    mock_memory_manager.create_memory.return_value = None
 
     payload = {
         "content": "This is a test memory",
@@ -33,7 +43,7 @@ def test_create_memory(mock_memory_manager):
 
 # Test for creating another memory
 def test_create_memory_2(mock_memory_manager):
-    mock_memory_manager.return_value.create_memory.return_value = None
+    mock_memory_manager.create_memory.return_value = None
 
     payload = {
         "content": "This is another test memory",
@@ -60,7 +70,7 @@ def test_create_invalid_memory(mock_memory_manager):
 
 # Test for recalling memory
 def test_recall_memory(mock_memory_manager):
-    mock_memory_manager.return_value.recall_memory.return_value = [
+    mock_memory_manager.recall_memory.return_value = [
         {
             "content": "This is a test memory",
             "metadata": {
@@ -83,7 +93,7 @@ def test_recall_memory(mock_memory_manager):
 
 # Test for memory pruning
 def test_prune_memories(mock_memory_manager):
-    mock_memory_manager.return_value.prune_memories.return_value = None
+    mock_memory_manager.prune_memories.return_value = None
 
     response = client.post("/gravrag/prune_memories", json={})
     logger.info(f"Prune Memories Response: {response.status_code}")
@@ -92,7 +102,7 @@ def test_prune_memories(mock_memory_manager):
 
 # Test for memory recall using metadata
 def test_recall_memory_with_metadata(mock_memory_manager):
-    mock_memory_manager.return_value.recall_memory.return_value = [
+    mock_memory_manager.recall_memory_with_metadata.return_value = {"memories": [
         {
             "content": "This is a test memory",
             "metadata": {
@@ -105,7 +115,7 @@ def test_recall_memory_with_metadata(mock_memory_manager):
                 "timestamp": 1728026867
             }
         }
-    ]
+    ]}
 
     payload = {
         "query": "test memory",
@@ -119,7 +129,7 @@ def test_recall_memory_with_metadata(mock_memory_manager):
 
 # Test for deleting memory by metadata
 def test_delete_by_metadata(mock_memory_manager):
-    mock_memory_manager.return_value.delete_memories_by_metadata.return_value = None
+    mock_memory_manager.delete_memories_by_metadata.return_value = None
 
     payload = {"metadata": {"objective_id": "obj_123", "task_id": "task_123"}}
     response = client.post("/gravrag/delete_by_metadata", json=payload)
@@ -129,9 +139,95 @@ def test_delete_by_metadata(mock_memory_manager):
 
 # Test for purging all memories
 def test_purge_memories(mock_memory_manager):
-    mock_memory_manager.return_value.purge_all_memories.return_value = None
+    mock_memory_manager.purge_all_memories.return_value = None
 
     response = client.post("/gravrag/purge_memories")
     logger.info(f"Purge Memories Response: {response.status_code}")
     assert response.status_code == 200
     assert response.json() == {"message": "All memories have been purged successfully"}
+
+# Test for migrating JSON-string metadata to native payloads
+def test_migrate_metadata(mock_memory_manager):
+    mock_memory_manager.migrate_string_metadata.return_value = {"scanned": 2, "migrated": 2, "failed": 0}
+
+    response = client.post("/gravrag/migrate_metadata", json={"batch_size": 100})
+    logger.info(f"Migrate Metadata Response: {response.status_code}")
+    assert response.status_code == 200
+    assert response.json()["message"] == "Metadata migration completed successfully"
+
+# Test that legacy JSON-string metadata is still readable
+def test_legacy_string_metadata():
+    from app.services.gravrag import MemoryPacket
+
+    payload = {"vector": [0.1, 0.2], "content": "legacy memory", "metadata": '{"objective_id": "obj_123", "timestamp": 1728026867}'}
+    memory = MemoryPacket.from_payload(payload)
+    assert memory.metadata["objective_id"] == "obj_123"
+    assert isinstance(memory.to_payload()["metadata"], dict)
+
+# Test migrating JSON-string metadata against an in-memory Qdrant
+def test_migrate_string_metadata():
+    from app.services.gravrag import MemoryManager
+
+    manager = MemoryManager.__new__(MemoryManager)  # Without __init__: no model and no Qdrant server
+    manager.qdrant_client = QdrantClient(":memory:")
+    manager.collection_name = "Mind"
+    manager.qdrant_client.create_collection("Mind", vectors_config=VectorParams(size=2, distance=Distance.COSINE))
+    native = {"objective_id": "obj_456", "timestamp": 1728026867}
+    manager.qdrant_client.upsert("Mind", points=[
+        PointStruct(id=1, vector=[0.1, 0.2], payload={"content": "legacy memory", "metadata": '{"objective_id": "obj_123", "timestamp": 1728026867}'}),
+        PointStruct(id=2, vector=[0.2, 0.1], payload={"content": "broken memory", "metadata": "{not json"}),
+        PointStruct(id=3, vector=[0.3, 0.1], payload={"content": "native memory", "metadata": native}),
+    ])
+
+    result = asyncio.run(manager.migrate_string_metadata(batch_size=1))
+    assert result == {"scanned": 2, "migrated": 1, "failed": 1}
+
+    payloads = {point.id: point.payload for point in manager.qdrant_client.retrieve("Mind", ids=[1, 2, 3])}
+    assert payloads[1]["metadata"] == {"objective_id": "obj_123", "timestamp": 1728026867}
+    assert payloads[2]["metadata"] == "{not json"
+    assert payloads[3]["metadata"] == native
+
+    # Migrated points no longer match the legacy filter; the unparseable one is reported again
+    assert asyncio.run(manager.migrate_string_metadata()) == {"scanned": 1, "migrated": 0, "failed": 1}
+
+def in_memory_manager(points):
+    from app.services.gravrag import MemoryManager, PAYLOAD_INDEXES
+
+    manager = MemoryManager.__new__(MemoryManager)  # Without __init__: no model and no Qdrant server
+    manager.qdrant_client = QdrantClient(":memory:")
+    manager.collection_name = "Mind"
+    manager.qdrant_client.create_collection("Mind", vectors_config=VectorParams(size=2, distance=Distance.COSINE))
+    for field_name, field_schema in PAYLOAD_INDEXES.items():
+        manager.qdrant_client.create_payload_index("Mind", field_name=field_name, field_schema=field_schema)
+    manager.qdrant_client.upsert("Mind", points=points)
+    return manager
+
+# Test that pruning reads both native and legacy JSON-string metadata
+def test_prune_memories_reads_legacy_metadata():
+    manager = in_memory_manager([
+        PointStruct(id=1, vector=[0.1, 0.2], payload={"content": "faded", "metadata": '{"gravitational_pull": 0.0}'}),
+        PointStruct(id=2, vector=[0.2, 0.1], payload={"content": "faded too", "metadata": {"gravitational_pull": 0.0}}),
+        PointStruct(id=3, vector=[0.3, 0.1], payload={"content": "strong", "metadata": {"gravitational_pull": 5.0}}),
+        PointStruct(id=4, vector=[0.1, 0.3], payload={"content": "no pull", "metadata": {}}),
+    ])
+
+    with mock.patch.object(manager.qdrant_client, "count", return_value=mock.Mock(count=2_000_000)):
+        asyncio.run(manager.prune_memories())
+
+    remaining = {point.id for point in manager.qdrant_client.scroll("Mind")[0]}
+    assert remaining == {3, 4}
+
+# Test that an objective ID matches memories storing it as an integer or as a string
+def test_metadata_filter_matches_int_and_str_ids():
+    from app.services.gravrag import metadata_filter
+
+    manager = in_memory_manager([
+        PointStruct(id=1, vector=[0.1, 0.2], payload={"content": "int", "metadata": {"objective_id": 42}}),
+        PointStruct(id=2, vector=[0.2, 0.1], payload={"content": "str", "metadata": {"objective_id": "42"}}),
+        PointStruct(id=3, vector=[0.3, 0.1], payload={"content": "other", "metadata": {"objective_id": "obj_1"}}),
+    ])
+
+    for objective_id in (42, "42"):
+        count = manager.qdrant_client.count("Mind", count_filter=metadata_filter({"objective_id": objective_id}))
+        assert count.count == 2
+    assert manager.qdrant_client.count("Mind", count_filter=metadata_filter({"objective_id": "obj_1"})).count == 1
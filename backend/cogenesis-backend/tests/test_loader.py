@@ -0,0 +1,93 @@
+import csv
+import json
+
+import numpy as np
+import pytest
+
+from app.load import loader
+
+
+def fake_encode(texts):
+    return np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+
+
+class FakeStore:
+    def __init__(self, fail_on_call=None):
+        self.points = {}
+        self.calls = 0
+        self.fail_on_call = fail_on_call
+
+    def __call__(self, ids, contents, vectors, metadatas):
+        self.calls += 1
+        if self.calls == self.fail_on_call:
+            raise RuntimeError("store crashed")
+        for point_id, content, metadata in zip(ids, contents, metadatas):
+            self.points[point_id] = (content, metadata)
+        return len(ids)
+
+
+def write_jsonl(path, rows):
+    with open(path, "w") as f:
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+
+
+# Test that a JSONL file is loaded in full and records without content are skipped
+def test_load_jsonl(tmp_path):
+    path = tmp_path / "memories.jsonl"
+    write_jsonl(path, [{"content": f"memory {i}", "metadata": {"tags": ["a"]}} for i in range(10)] + [{"content": ""}])
+    store = FakeStore()
+
+    result = loader.load_memories(store, str(path), encode=fake_encode, workers=0, batch_size=3, parallel=2)
+
+    assert result["loaded"] == 10
+    assert result["skipped"] == 1
+    assert result["rows"] == 11
+    assert len(store.points) == 10
+
+# Test that a crashed load resumes from its checkpoint without duplicating memories
+def test_load_resumes_after_crash(tmp_path):
+    path = tmp_path / "memories.jsonl"
+    write_jsonl(path, [{"content": f"memory {i}"} for i in range(20)])
+    store = FakeStore(fail_on_call=3)
+
+    with pytest.raises(RuntimeError):
+        loader.load_memories(store, str(path), encode=fake_encode, workers=0, batch_size=4, parallel=1)
+    checkpoint = json.loads((tmp_path / f"memories.jsonl{loader.CHECKPOINT_SUFFIX}").read_text())
+    assert checkpoint["rows"] == 8
+
+    store.fail_on_call = None
+    result = loader.load_memories(store, str(path), encode=fake_encode, workers=0, batch_size=4, parallel=1)
+
+    assert result["resumed_from_row"] == 8
+    assert result["loaded"] == 12
+    assert result["total_loaded"] == 20
+    assert len(store.points) == 20
+
+# Test that CSV columns become metadata and source IDs map to stable point IDs
+def test_load_csv_metadata_and_ids(tmp_path):
+    path = tmp_path / "memories.csv"
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "content", "tags", "task_id"])
+        writer.writerow(["doc-1", "first", "x, y", "t1"])
+        writer.writerow(["42", "second", "", "t2"])
+    store = FakeStore()
+
+    loader.load_memories(store, str(path), encode=fake_encode, workers=0)
+
+    assert store.points[42] == ("second", {"task_id": "t2", "source_id": "42"})
+    content, metadata = store.points[loader.point_id("doc-1")]
+    assert content == "first"
+    assert metadata == {"tags": ["x", "y"], "task_id": "t1", "source_id": "doc-1"}
+
+# Test that a checkpoint for a different source file is rejected
+def test_checkpoint_rejects_changed_source(tmp_path):
+    path = tmp_path / "memories.jsonl"
+    write_jsonl(path, [{"content": "memory"}])
+    loader.load_memories(FakeStore(), str(path), encode=fake_encode, workers=0)
+    write_jsonl(path, [{"content": "memory"}, {"content": "another memory"}])
+
+    with pytest.raises(ValueError):
+        loader.load_memories(FakeStore(), str(path), encode=fake_encode, workers=0)
+
@@ -0,0 +1,46 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import security
+from app.core.security import VerifiedTokenCache, TokenData, create_access_token, get_current_user, admit_login
+
+# Test that a verified token is served from the cache
+def test_token_cache_hit():
+    security.token_cache.clear()
+    token = create_access_token({"sub": "alice"})
+
+    first = asyncio.run(get_current_user(token))
+    assert first.username == "alice"
+    assert security.token_cache.get(token) == first
+
+# Test that a cached signature is not reused for a different token
+def test_token_cache_requires_exact_token():
+    cache = VerifiedTokenCache(ttl_seconds=60, max_size=10)
+    cache.put("header.payload.sig", TokenData(username="alice"))
+
+    assert cache.get("header.forged.sig") is None
+    assert cache.get("header.payload.sig") is None  # The mismatch evicts the entry
+
+# Test that entries never outlive the token's expiry
+def test_token_cache_respects_exp():
+    cache = VerifiedTokenCache(ttl_seconds=60, max_size=10)
+    cache.put("a.b.c", TokenData(username="alice"), exp=time.time() - 1)
+    assert cache.get("a.b.c") is None
+
+# Test that a login burst beyond the pending limit is rejected with Retry-After
+def test_login_admission_rejects_burst(monkeypatch):
+    monkeypatch.setattr(security.settings, "LOGIN_MAX_PENDING", 1)
+    admitted = admit_login()
+    asyncio.run(admitted.__anext__())
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(admit_login().__anext__())
+    assert exc_info.value.status_code == 429
+    assert "Retry-After" in exc_info.value.headers
+
+    with pytest.raises(StopAsyncIteration):
+        asyncio.run(admitted.__anext__())
+    assert security._pending_logins == 0